@@ -0,0 +1,119 @@
+# coding=utf-8
+"""
+Benchmarks of LIVVkit itself, run end-to-end and for each of its hot functions
+on synthetic CISM_glissade bundles (see ``synthetic.py``), to catch performance
+regressions before a release. Compare against a saved run with
+``--benchmark-autosave`` and ``--benchmark-compare``.
+
+The benchmarks require pytest-benchmark, which is installed with LIVVkit's
+``develop`` extra (``pip install -e .[develop]``); without it, they are skipped.
+Run them with::
+
+    pytest benchmarks/bench_livvkit.py
+"""
+
+import os
+import glob
+import shutil
+
+import pytest
+
+import livvkit
+from livvkit import elements
+from livvkit.util import functions
+
+import synthetic
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.fixture
+def output_dir(tmpdir):
+    livvkit.output_dir = str(tmpdir)
+    return str(tmpdir)
+
+
+def _config(component, case):
+    return functions.read_json(
+            os.path.join(livvkit.bundle_dir, synthetic.BUNDLE, component + '.json'))[case]
+
+
+def _run_files(bundle, case, ext):
+    return sorted(glob.glob(os.path.join(bundle, '**', case, '**', '*' + ext), recursive=True))
+
+
+@pytest.mark.parametrize('pool_size', [0, 2])
+def test_bench_main(benchmark, bundles, tmpdir, pool_size):
+    from livvkit.__main__ import main
+
+    out_dir = str(tmpdir.join('vv_out'))
+
+    def clean():
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    benchmark.pedantic(main, args=(['-v', bundles[0], bundles[1], '-o', out_dir,
+                                    '-p', str(pool_size)],),
+                       setup=clean, rounds=3)
+
+
+def test_bench_collect_cases(benchmark, bundles):
+    cases = benchmark(functions.collect_cases, bundles[0])
+    assert cases
+
+
+def test_bench_bit_for_bit(benchmark, bundles, output_dir):
+    from livvkit.components import verification
+    config = _config('verification', 'dome')
+    test, bench = _run_files(bundles[0], 'dome', '.out.nc'), _run_files(bundles[1], 'dome', '.out.nc')
+    result = benchmark(lambda: [verification.bit_for_bit(t, b, config) for t, b in zip(test, bench)])
+    assert all(isinstance(r, elements.BitForBit) for r in result)
+
+
+def test_bench_plot_bit_for_bit(benchmark, bundles, output_dir):
+    import numpy as np
+    from netCDF4 import Dataset
+    from livvkit.components import verification
+    with Dataset(_run_files(bundles[0], 'dome', '.out.nc')[-1]) as data:
+        model = data.variables['velnorm'][:]
+    benchmark(verification.plot_bit_for_bit, 'dome', 'velnorm', model, model + 1.0,
+              np.ones_like(model))
+
+
+def test_bench_parse_gptl(benchmark, bundles):
+    from livvkit.components import performance
+    config = _config('performance', 'dome')
+    timing_files = _run_files(bundles[0], 'dome', config['timing_ext'])
+    stats = benchmark(performance.generate_timing_stats, timing_files, config['timing_vars'])
+    assert stats
+
+
+def test_bench_file_diff(benchmark, bundles):
+    test, bench = _run_files(bundles[0], 'dome', '.config'), _run_files(bundles[1], 'dome', '.config')
+    benchmark(lambda: [elements.FileDiff('Configuration Comparison', b, t) for t, b in zip(test, bench)])
+
+
+def test_bench_get_plot_data(benchmark, bundles):
+    from livvkit.components.numerics_tests import ismip
+    from livvkit.bundles.CISM_glissade import numerics
+    ismip.set_up()
+    config = _config('numerics', 'ismip-hom-a')
+    config['name'] = 'ismip-hom-a'
+    test = _run_files(bundles[0], 'ismip-hom-a', '.out.nc')
+    bench = _run_files(bundles[1], 'ismip-hom-a', '.out.nc')
+    if not test:
+        pytest.skip('The synthetic bundles have no ISMIP-HOM A runs')
+    benchmark(lambda: [numerics.get_plot_data(t, b, ismip.setup['ismip-hom-a'], config)
+                       for t, b in zip(test, bench)])
+
+
+def test_bench_write_json(benchmark, bundles, output_dir):
+    from livvkit.components import verification
+    config = _config('verification', 'dome')
+    test, bench = _run_files(bundles[0], 'dome', '.out.nc'), _run_files(bundles[1], 'dome', '.out.nc')
+    page = elements.Page('dome', config['description'],
+                         [verification.bit_for_bit(t, b, config) for t, b in zip(test, bench)])
+
+    def write():
+        with open(os.devnull, 'w', encoding='utf-8') as f:
+            page._write_json(f)
+    benchmark(write)
@@ -0,0 +1,40 @@
+# coding=utf-8
+"""
+Options and fixtures of the LIVVkit benchmarks, which are run with
+
+    python -m pytest benchmarks/bench_livvkit.py [--bench-cases N] [--bench-scales N]
+                                                 [--bench-procs P [P ...]]
+                                                 [--bench-variables N] [--bench-grid N]
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import synthetic  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('livvkit benchmarks', 'The scale of the synthetic bundles')
+    group.addoption('--bench-cases', type=int, default=None,
+                    help='Number of verification cases (default: all of them)')
+    group.addoption('--bench-scales', type=int, default=2, help='Resolutions per case')
+    group.addoption('--bench-procs', type=int, nargs='+', default=[1, 4], help='Processor counts')
+    group.addoption('--bench-variables', type=int, default=2,
+                    help='Extra variables in each output file')
+    group.addoption('--bench-grid', type=int, default=31, help='Grid size at the lowest resolution')
+
+
+@pytest.fixture(scope='session')
+def bundles(request, tmp_path_factory):
+    """ The paths to the synthetic test and benchmark bundles """
+    option = request.config.getoption
+    return synthetic.make_bundles(str(tmp_path_factory.mktemp('synthetic')),
+                                  cases=option('--bench-cases'),
+                                  scales=option('--bench-scales'),
+                                  procs=option('--bench-procs'),
+                                  variables=option('--bench-variables'),
+                                  grid=option('--bench-grid'))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Benchmark the JSON backends used to write LIVVkit reports.
+
+Builds a large synthetic verification report (many bit-for-bit tables with
+numpy float64 errors, plus tables of numpy arrays) and times writing it with
+each available backend in ``livvkit.util.json_backend``.
+
+Usage:
+    python benchmarks/json_backends.py [--cases N] [--rows N] [--repeat N]
+"""
+
+import os
+import io
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+import livvkit
+from livvkit import elements
+from livvkit.util import json_backend
+
+
+def synthetic_report(cases, rows):
+    """ Make a verification-like page with ``cases`` bit-for-bit tables of ``rows`` rows """
+    rng = np.random.default_rng(0)
+    tabs = {}
+    for case in range(cases):
+        variables = ['var{:04d}'.format(r) for r in range(rows)]
+        b4b = elements.BitForBit(
+                'Bit for bit',
+                {'Variable': variables,
+                 'Max Error': list(rng.random(rows)),
+                 'RMS Error': list(rng.random(rows)),
+                 'Plot': ['N/A'] * rows},
+                [elements.NAImage(v, 'No difference', livvkit.output_dir) for v in variables])
+        table = elements.Table('Timing', {'Time (s)': rng.random(rows), 'Processors': np.arange(rows)})
+        tabs['case{:03d}'.format(case)] = [elements.Section('Results', [b4b, table])]
+    return elements.Page('Synthetic', 'A synthetic verification report',
+                         [elements.Tabs(tabs)], references=None)
+
+
+def time_write(page, backend, compact, repeat):
+    json_backend.set_backend(backend)
+    best = float('inf')
+    for _ in range(repeat):
+        with open(os.devnull, 'w', encoding='utf-8') as f:
+            start = time.perf_counter()
+            page._write_json(f, compact=compact)
+            best = min(best, time.perf_counter() - start)
+    buffer = io.StringIO()
+    page._write_json(buffer, compact=compact)
+    return best, len(buffer.getvalue().encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cases', type=int, default=20, help='Number of bit-for-bit tables')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows per table')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions (the best is reported)')
+    args = parser.parse_args()
+
+    livvkit.output_dir = tempfile.gettempdir()
+    page = synthetic_report(args.cases, args.rows)
+
+    backends = [b for b in json_backend.BACKENDS if b != 'orjson' or json_backend.orjson is not None]
+    results = {}
+    print('{:<12} {:<9} {:>10} {:>10} {:>8}'.format('Backend', 'Layout', 'Time (s)', 'Size (MB)', 'Speedup'))
+    for compact in [False, True]:
+        for backend in reversed(backends):
+            seconds, size = time_write(page, backend, compact, args.repeat)
+            results[(backend, compact)] = seconds
+            speedup = results[('json_tricks', compact)] / seconds
+            print('{:<12} {:<9} {:>10.3f} {:>10.1f} {:>7.1f}x'.format(
+                backend, 'compact' if compact else 'indented', seconds, size / 1e6, speedup))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Generate synthetic CISM_glissade test and benchmark bundles.
+
+Builds a pair of CISM-like output trees, ``<out_dir>/test/CISM_glissade`` and
+``<out_dir>/bench/CISM_glissade``, which can be analyzed with
+``livv -v <out_dir>/test/CISM_glissade <out_dir>/bench/CISM_glissade``. Each
+of the bundle's verification cases has a run for every scale (s0, s1, ...) and
+processor count (p1, p4, ...), made up of a NetCDF output file, a ``.config``
+file, a ``.config.oe`` log and a GPTL ``.cism_timing_stats`` file. Some
+variables and configurations of the test runs differ from the benchmark runs,
+so both the bit-for-bit plots and the configuration diffs are exercised.
+
+Usage:
+    python benchmarks/synthetic.py OUT_DIR [--cases N] [--scales N] [--procs P [P ...]]
+                                           [--variables N] [--grid N]
+"""
+
+import os
+import argparse
+
+import numpy as np
+from netCDF4 import Dataset
+
+import livvkit
+from livvkit.util import functions
+
+BUNDLE = 'CISM_glissade'
+
+CONFIG_TEMPLATE = '[{name}]\n\n' \
+                  '[grid]\n' \
+                  'upn = {levels}\n' \
+                  'ewn = {grid}\n' \
+                  'nsn = {grid}\n' \
+                  'dew = {spacing}\n' \
+                  'dns = {spacing}\n\n' \
+                  '[time]\n' \
+                  'tstart = 0.\n' \
+                  'tend = {tend}\n' \
+                  'dt = 1.\n\n' \
+                  '[options]\n' \
+                  'dycore = 2\n' \
+                  'flow_law = 2\n'
+
+# The dimensions of the variables read by the bundle's analyses; any other
+# variable is a 3D field on the staggered grid
+VARIABLE_DIMS = {'thk': ('time', 'y1', 'x1'),
+                 'usurf': ('time', 'y1', 'x1'),
+                 'uvel_extend': ('time', 'level', 'y1', 'x1'),
+                 'vvel_extend': ('time', 'level', 'y1', 'x1'),
+                 'wvel_ho': ('time', 'level', 'y1', 'x1')}
+
+# The variables the numerics analyses of the ISMIP-HOM cases read, and the
+# domain length (km) of each case, which names the reference data it's
+# compared to (a domain length of 0 is ISMIP-HOM F's no-slip experiment)
+ISMIP_VARIABLES = ['usurf', 'uvel_extend', 'vvel_extend', 'uvel', 'vvel', 'wvel_ho']
+ISMIP_LENGTHS = {'ismip-hom-a': 80, 'ismip-hom-c': 80, 'ismip-hom-f': 0}
+
+GPTL_HEADER = 'Stats for thread 0:\n' \
+              '  Called  Recurse Wallclock max       min\n'
+
+
+def _bundle_config(name):
+    return functions.read_json(os.path.join(livvkit.bundle_dir, BUNDLE, name + '.json'))
+
+
+def write_output(path, grid, levels, variables, rng, perturbed=(), length=100.0):
+    """
+    Write a CISM-like NetCDF output file.
+
+    Args:
+        path: The path of the file
+        grid: The number of (unstaggered) grid cells in each direction
+        levels: The number of vertical levels
+        variables: The names of the variables (see ``VARIABLE_DIMS``)
+        rng: The random number generator of the run, which is shared by the
+            test and benchmark runs so that they have the same data
+        perturbed: The variables to perturb, so they aren't bit-for-bit
+        length: The domain length (km)
+    """
+    spacing = length * 1000.0 / grid
+    with Dataset(path, 'w') as data:
+        data.createDimension('time', 2)
+        data.createDimension('level', levels)
+        data.createDimension('y1', grid)
+        data.createDimension('x1', grid)
+        data.createDimension('y0', grid - 1)
+        data.createDimension('x0', grid - 1)
+        data.createVariable('time', 'f8', ('time',))[:] = [0.0, 1.0]
+        for dim in ['x1', 'y1']:
+            data.createVariable(dim, 'f8', (dim,))[:] = (np.arange(grid) + 0.5) * spacing
+        for dim in ['x0', 'y0']:
+            data.createVariable(dim, 'f8', (dim,))[:] = (np.arange(grid - 1) + 1.0) * spacing
+        for var in variables:
+            dims = VARIABLE_DIMS.get(var, ('time', 'level', 'y0', 'x0'))
+            values = rng.random([len(data.dimensions[d]) for d in dims])
+            if var in perturbed:
+                values[-1].flat[0] += 1.0
+            data.createVariable(var, 'f8', dims)[:] = values
+
+
+def write_log(path, procs, steps=5):
+    """ Write a CISM-like standard output log """
+    with open(path, 'w') as f:
+        f.write(' CISM dycore type (0=Glide, 1=Glam, 2=Glissade, 3=AlbanyFelix, 4=BISICLES) = 2\n')
+        f.write(' total procs = {}\n'.format(procs))
+        for step in range(steps):
+            f.write(' Compute ice velocities, time = {:.1f}\n'.format(float(step)))
+            for iteration in range(1, 4):
+                f.write(' *** Nonlinear Solver Step {}\n'.format(iteration))
+                f.write('  {} 1.0e-{:02d}\n'.format(iteration, iteration + 2))
+            f.write(' Solver status "SOLVE_STATUS_CONVERGED" in {} iterations\n'.format(3))
+
+
+def write_timing(path, procs, scale, timing_vars, rng):
+    """ Write a GPTL timing file, with a line for each timing variable (in order) """
+    with open(path, 'w') as f:
+        f.write(GPTL_HEADER)
+        for var in timing_vars:
+            wallclock = (2.0**scale) / procs * (1.0 + 0.1 * rng.random())
+            f.write('  {:<30} -  {:8d} - {:12.3f} {:10.3f} {:10.3f}\n'.format(
+                var, 1, wallclock, wallclock, wallclock))
+
+
+def make_bundles(out_dir, cases=None, scales=2, procs=(1, 4), variables=2, grid=31,
+                 levels=3, seed=0):
+    """
+    Generate a synthetic test and benchmark bundle.
+
+    Args:
+        out_dir: The directory to generate the bundles in
+        cases: The number of the bundle's verification cases to generate; if
+            None, every case is generated
+        scales: The number of resolutions of each case
+        procs: The processor counts of each resolution
+        variables: The number of extra (not bit-for-bit compared) variables
+            in each output file, which add to the volume of data
+        grid: The number of grid cells in each direction at the lowest
+            resolution; each scale doubles it
+        levels: The number of vertical levels
+        seed: The random seed
+
+    Returns:
+        The paths to the test and benchmark bundles
+    """
+    verification = _bundle_config('verification')
+    performance = _bundle_config('performance')
+    names = [c for c in verification if isinstance(verification[c], dict)]
+    names = names if cases is None else names[:cases]
+
+    bundles = [os.path.join(out_dir, model, BUNDLE) for model in ['test', 'bench']]
+    for ii, case in enumerate(names):
+        config = verification[case]
+        timing_vars = performance[case]['timing_vars'] if case in performance else []
+        compared = config['bit_for_bit_vars']
+        all_vars = compared + ['var{:02d}'.format(v) for v in range(variables)]
+        # NOTE: the ISMIP-HOM runs are also analyzed by the numerics
+        #       component, which expects a directory for the domain length
+        length = ISMIP_LENGTHS.get(case)
+        if length is not None:
+            all_vars += ISMIP_VARIABLES
+        for scale in range(scales):
+            size = grid * 2**scale
+            for proc in procs:
+                run_name = '{}.{:04d}.p{:03d}'.format(case, size, proc)
+                run_seed = [seed, ii, scale, proc]
+                for model, bundle in zip(['test', 'bench'], bundles):
+                    run_dir = os.path.join(bundle, config['data_dir'], case,
+                                           's{}'.format(scale), 'p{}'.format(proc))
+                    if length is not None:
+                        run_dir = os.path.join(run_dir, 'z{}'.format(length))
+                    os.makedirs(run_dir, exist_ok=True)
+                    run_file = os.path.join(run_dir, run_name)
+                    # NOTE: every other run of the test model isn't bit-for-bit
+                    #       and has a different configuration
+                    differs = model == 'test' and (scale + proc) % 2 == 1
+                    write_output(run_file + config['output_ext'], size, levels, all_vars,
+                                 np.random.default_rng(run_seed),
+                                 perturbed=compared[:1] if differs else (),
+                                 length=length or 100.0)
+                    with open(run_file + config['config_ext'], 'w') as f:
+                        f.write(CONFIG_TEMPLATE.format(name=case.upper(), levels=levels, grid=size,
+                                                       spacing=2000.0 / 2**scale,
+                                                       tend=10.0 if differs else 5.0))
+                    write_log(run_file + config['logfile_ext'], proc)
+                    if timing_vars:
+                        write_timing(run_file + performance[case]['timing_ext'], proc, scale,
+                                     timing_vars, np.random.default_rng(run_seed + [len(model)]))
+    return bundles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('out_dir', help='Directory to generate the bundles in')
+    parser.add_argument('--cases', type=int, default=None,
+                        help='Number of verification cases (default: all of them)')
+    parser.add_argument('--scales', type=int, default=2, help='Resolutions per case')
+    parser.add_argument('--procs', type=int, nargs='+', default=[1, 4], help='Processor counts')
+    parser.add_argument('--variables', type=int, default=2,
+                        help='Extra variables in each output file')
+    parser.add_argument('--grid', type=int, default=31, help='Grid size at the lowest resolution')
+    args = parser.parse_args()
+
+    test, bench = make_bundles(args.out_dir, args.cases, args.scales, args.procs,
+                               args.variables, args.grid)
+    print('livv -v {} {} -o {}'.format(test, bench, os.path.join(args.out_dir, 'vv_out')))
+
+
+if __name__ == '__main__':
+    main()
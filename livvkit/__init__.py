@@ -32,30 +32,23 @@ Storage for global variables.  These are set upon startup in the options module
 """
 import os
 import time
-import getpass
-import platform
-import socket
-
-from livvkit import bundles
-from livvkit import resources
 
 __version_info__ = (3, 0, 1)
 __version__ = '.'.join(str(vi) for vi in __version_info__)
 
 cwd = os.getcwd()
 timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-user = getpass.getuser()
-machine = socket.gethostname()
-os_type = platform.system() + " " + platform.release()
 
 comment = ""
 
-resource_dir = os.path.dirname(resources.__file__)
-bundle_dir = os.path.dirname(bundles.__file__)
+resource_dir = os.path.join(os.path.dirname(__file__), 'resources')
+bundle_dir = os.path.join(os.path.dirname(__file__), 'bundles')
 
 # directory vars -- filled in by options
 output_dir = None
 index_dir = None
+# where setup_output backed up the previous run's output, if anywhere
+previous_output_dir = None
 model_dir = None
 bench_dir = None
 
@@ -77,3 +70,44 @@ validation_model_configs = None
 verify = False
 validate = False
 pool_size = None
+start_method = None
+compact_json = False
+report_format = 'json'
+profile = False
+track_memory = False
+# the memory (MB) the concurrently running analyses may use, if limited
+memory_budget = None
+# the seconds an analysis may run for, if limited, and how many times it's retried
+task_timeout = None
+task_retries = 0
+# skip the analyses completed by the previous run in the output directory
+resume = False
+
+
+def _user():
+    import getpass
+    return getpass.getuser()
+
+
+def _machine():
+    import socket
+    return socket.gethostname()
+
+
+def _os_type():
+    import platform
+    return platform.system() + " " + platform.release()
+
+
+# NOTE: Information about the user and machine is only needed once a report is
+#       being generated, and looking it up is slow (relative to starting up),
+#       so these globals are set on first access instead of on import
+_lazy_globals = {'user': _user, 'machine': _machine, 'os_type': _os_type}
+
+
+def __getattr__(name):
+    try:
+        value = globals()[name] = _lazy_globals[name]()
+    except KeyError:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    return value
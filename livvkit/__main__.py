@@ -34,8 +34,6 @@ Management of the tests to be run is handled by the scheduler in livvkit.util
 
 import os
 import sys
-import http.server as server
-import socketserver as socket
 
 import livvkit
 from livvkit.util import options
@@ -74,45 +72,73 @@ def main(cl_args=None):
     from livvkit import elements
     from livvkit import scheduler
     from livvkit.util import functions
+    from livvkit.util import logs
+    from livvkit.util import progress
+    from livvkit.util import profiling
+    from livvkit.util import memory
+    from livvkit.util import journal
 
     summary_elements = []
 
-    if livvkit.verify or livvkit.validate:
-        functions.setup_output()
-
+    suites = []
     if livvkit.verify:
-        summary_elements.append(scheduler.run("numerics", numerics,
-                                              functions.read_json(livvkit.numerics_model_config)))
-        summary_elements.append(scheduler.run("verification", verification,
-                                              functions.read_json(livvkit.verification_model_config)))
-        summary_elements.append(scheduler.run("performance", performance,
-                                              functions.read_json(livvkit.performance_model_config)))
+        suites = [("numerics", numerics, functions.read_json(livvkit.numerics_model_config)),
+                  ("verification", verification, functions.read_json(livvkit.verification_model_config)),
+                  ("performance", performance, functions.read_json(livvkit.performance_model_config))]
+    validation_config = {}
     if livvkit.validate:
-        print(" -----------------------------------------------------------------")
-        print("   Beginning the validation test suite ")
-        print(" -----------------------------------------------------------------")
-        print("")
-        validation_config = {}
         for conf in livvkit.validation_model_configs:
             validation_config = functions.merge_dicts(validation_config,
                                                       functions.read_json(conf))
-        summary_elements.extend(scheduler.run_quiet("validation", validation, validation_config,
-                                                    group=False))
-        print(" -----------------------------------------------------------------")
-        print("   Validation test suite complete ")
-        print(" -----------------------------------------------------------------")
-        print("")
 
     if livvkit.verify or livvkit.validate:
-        result = elements.Page("Summary", "", summary_elements)
-        with open(os.path.join(livvkit.output_dir, 'index.json'), 'w') as index_data:
-            index_data.write(result._repr_json())
+        functions.setup_output()
+        log_dir = os.path.join(livvkit.index_dir, 'logs')
+        status = progress.ProgressHandler(os.path.join(livvkit.index_dir, progress.PROGRESS_FILE))
+        journal_file = os.path.join(livvkit.index_dir, journal.JOURNAL_FILE)
+        if livvkit.resume:
+            journal.load(journal_file)
+        handlers = [memory.MemoryHandler(log_dir), journal.JournalHandler(journal_file)]
+        if livvkit.profile:
+            handlers.append(profiling.ProfileHandler(log_dir))
+        logs.start(log_dir, livvkit.start_method, status, handlers)
+        tasks = [(run_type, t) for run_type, _, config in suites
+                 for t in scheduler.collect_tests(config)]
+        tasks += [('validation', t) for t in scheduler.collect_tests(validation_config)]
+        progress.add_tasks(sum(not journal.completed(*task) for task in tasks))
+
+    # NOTE: the report is written with whatever was summarized, even if the
+    #       run is interrupted (e.g., by a keyboard interrupt)
+    try:
+        for run_type, module, config in suites:
+            summary_elements.extend(scheduler.run(run_type, module, config))
+        if livvkit.validate:
+            print(" -----------------------------------------------------------------")
+            print("   Beginning the validation test suite ")
+            print(" -----------------------------------------------------------------")
+            print("")
+            summary_elements.extend(scheduler.run_quiet("validation", validation, validation_config,
+                                                        group=False))
+            print(" -----------------------------------------------------------------")
+            print("   Validation test suite complete ")
+            print(" -----------------------------------------------------------------")
+            print("")
+    finally:
+        if livvkit.verify or livvkit.validate:
+            result = elements.Page("Summary", "", summary_elements)
+            functions.write_index(result)
+            logs.stop()
+
+    if livvkit.verify or livvkit.validate:
         print("-------------------------------------------------------------------")
         print(" Done!  Results can be seen in a web browser at:")
         print("  " + os.path.join(livvkit.output_dir, 'index.html'))
         print("-------------------------------------------------------------------")
 
     if args.serve:
+        import http.server as server
+        import socketserver as socket
+
         httpd = socket.TCPServer(('', args.serve), server.SimpleHTTPRequestHandler)
 
         sa = httpd.socket.getsockname()
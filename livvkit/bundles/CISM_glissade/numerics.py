@@ -35,7 +35,10 @@ import math
 import numpy as np
 
 from netCDF4 import Dataset
-from scipy import interpolate
+
+from livvkit.util import progress
+from livvkit.util import profiling
+from livvkit.util import interpolation
 
 
 class DataGrid:
@@ -106,113 +109,183 @@ class RotatedGrid:
     This class converts the CISM_glissade coordinate system to the ISMIP-HOM
     coordinate system.
     """
-    def __init__(self, alpha, data):
+    def __init__(self, alpha, data, transect=None, halo=None):
+        """
+        Args:
+            alpha: The rotation angle (radians) of the ISMIP-HOM coordinate system
+            data: The CISM_glissade netCDF4 dataset
+            transect: The (rotated) x coordinates of the points which will be
+                interpolated to; used with halo to limit the rows read
+            halo: The number of extra rows to read on either side of the rows
+                which bracket the transect. If None, the full fields are read.
+        """
         self.alpha = alpha
         self.y0 = data.variables['y0'][:]
         self.x0 = data.variables['x0'][:]
 
-        self.usurf_ustag = data.variables['usurf'][-1,:,:]
-        self.usurf_stag = (  self.usurf_ustag[1: , 1: ] + self.usurf_ustag[1: , :-1]
-                           + self.usurf_ustag[:-1, :-1] + self.usurf_ustag[:-1, 1: ]) / 4.0
+        # NOTE: only the two unstaggered rows needed for the row 20 staggered
+        #       surface are read to determine the rotated coordinates.
+        usurf_coord = _stagger(data.variables['usurf'][-1, 20:22, :])[0, :]
+        self.x = (self.x0*math.cos(alpha)
+                  + (usurf_coord-7000.0)*math.sin(alpha)
+                  )/1000.0 - 50.0
+        self.y = self.y0/1000.0 - 50.0
+
+        if transect is None or halo is None:
+            self.rows = slice(None)
+            ustag_rows = slice(None)
+        else:
+            self.rows = row_band(self.x, transect, halo)
+            ustag_rows = slice(self.rows.start, self.rows.stop + 1)
+
+        self.usurf_ustag = data.variables['usurf'][-1, ustag_rows, :]
+        self.usurf_stag = _stagger(self.usurf_ustag)
 
         self.usurf = -(self.x0)*math.sin(alpha) + (self.usurf_stag-7000.0)*math.cos(alpha)
 
-        self.uvel_stag = data.variables['uvel'][-1,0,:,:]
-        self.vvel_stag = data.variables['uvel'][-1,0,:,:]
+        self.uvel_stag = data.variables['uvel'][-1, 0, self.rows, :]
+        self.vvel_stag = self.uvel_stag
 
         try:
-            self.wvel_ustag = data.variables['wvel_ho'][-1,0,:,:]
-        except:
-            self.wvel_ustag = data.variables['wvel'][-1,0,:,:]
-        self.wvel_stag = (  self.wvel_ustag[1: , 1: ] + self.wvel_ustag[1: , :-1]
-                          + self.wvel_ustag[:-1, :-1] + self.wvel_ustag[:-1, 1: ]) / 4.0
+            self.wvel_ustag = data.variables['wvel_ho'][-1, 0, ustag_rows, :]
+        except KeyError:
+            self.wvel_ustag = data.variables['wvel'][-1, 0, ustag_rows, :]
+        self.wvel_stag = _stagger(self.wvel_ustag)
 
         self.uvel =  self.uvel_stag*math.cos(alpha) + self.wvel_stag*math.sin(alpha)
         self.vvel = -self.uvel_stag*math.sin(alpha) + self.wvel_stag*math.cos(alpha)
 
-        self.x = (self.x0*math.cos(alpha)
-                  + (self.usurf_stag[20,:]-7000.0)*math.sin(alpha)
-                  )/1000.0 - 50.0
-        self.y = self.y0/1000.0 - 50.0
 
+def _stagger(field):
+    """ Average an unstaggered 2D field onto the staggered grid """
+    return (  field[1: , 1: ] + field[1: , :-1]
+            + field[:-1, :-1] + field[:-1, 1: ]) / 4.0
+
+
+def row_band(coords, points, halo=1):
+    """
+    Determine the band of grid rows needed to interpolate to a set of points.
+
+    Args:
+        coords: A 1D, monotonically increasing, array of the row coordinates
+        points: The row coordinates of the points which will be interpolated to
+        halo: The number of extra rows to include on either side of the rows
+            which bracket the points
+
+    Returns:
+        A slice of the rows which must be read
+    """
+    coords = np.asarray(coords)
+    lower = np.searchsorted(coords, np.min(points), side='right') - 1
+    upper = np.searchsorted(coords, np.max(points), side='left')
+    return slice(int(max(lower - halo, 0)), int(min(upper + halo, coords.size - 1)) + 1)
+
+
+def _interp_vars(data, var_list, rows=slice(None)):
+    """ Read the final time slice of each variable, on the first level if 3D """
+    fields = {}
+    for var in var_list:
+        if var == 'usurf':
+            fields[var] = data.variables[var][-1, rows, :]
+        else:
+            fields[var] = data.variables[var][-1, 0, rows, :]
+    return fields
 
+
+@profiling.timed
 def get_plot_data(test_file, bench_file, setup, config):
-    test_plot_data = {}
-    bench_plot_data = {}
     exp = config['name'].split('-')[-1]
     test_data = Dataset(test_file, 'r')
     bench_data = Dataset(bench_file, 'r')
 
-    test = DataGrid(test_data)
-    bench = DataGrid(bench_data)
-
     x_coord = setup['interp_points']
     y_coord = np.linspace(setup['y'][0], setup['y'][1], len(x_coord))
 
-    test_plot_data['y_hat'] = y_coord
-    test_plot_data['x_hat'] = x_coord
-    bench_plot_data['y_hat'] = y_coord
-    bench_plot_data['x_hat'] = x_coord
-
-    if exp in ['a', 'c']:
-        for var in config['interp_vars']:
-            if var == 'usurf':
-                # regular 2d linear interp. but faster.
-                test2plot = interpolate.RectBivariateSpline(test.y_hat, test.x_hat,
-                                                            test_data.variables[var][-1,:,:],
-                                                            kx=1, ky=1, s=0)
-                bench2plot = interpolate.RectBivariateSpline(bench.y_hat, bench.x_hat,
-                                                             bench_data.variables[var][-1,:,:],
-                                                             kx=1, ky=1, s=0)
-            else:
-                # regular 2d linear interp. but faster.
-                test2plot = interpolate.RectBivariateSpline(test.y_hat, test.x_hat,
-                                                            test_data.variables[var][-1,0,:,:],
-                                                            kx=1, ky=1, s=0)
-                bench2plot = interpolate.RectBivariateSpline(bench.y_hat, bench.x_hat,
-                                                             bench_data.variables[var][-1,0,:,:],
-                                                             kx=1, ky=1, s=0)
-
-            test_plot_data[var] = test2plot(y_coord, x_coord, grid=False)
-            bench_plot_data[var] = bench2plot(y_coord, x_coord, grid=False)
-
-        test_plot_data['velnorm_extend'] = \
-            np.linalg.norm(
-                np.array([test_plot_data['uvel_extend'],
-                          test_plot_data['vvel_extend'] ]),
-                axis=0)
-        bench_plot_data['velnorm_extend'] = \
+    # NOTE: Only a band of rows around the transect is needed for the
+    #       interpolation, so only that hyperslab is read if the bundle
+    #       configuration declares a halo around it.
+    halo = config.get('transect_halo')
+
+    plot_data = {}
+    for model, data in [('test', test_data), ('bench', bench_data)]:
+        if exp in ['a', 'c']:
+            grid = DataGrid(data)
+            rows = slice(None) if halo is None else row_band(grid.y_hat, y_coord, halo)
+            # NOTE: the operator only depends on the grid geometry, so it's
+            #       built once and shared by every variable (and usually by
+            #       both the test and bench data)
+            operator = interpolation.bilinear_operator(grid.y_hat[rows], grid.x_hat, y_coord, x_coord)
+            model_plot_data = interpolation.interpolate_fields(
+                    operator, _interp_vars(data, config['interp_vars'], rows))
+            velnorm = 'velnorm_extend'
+            uvel, vvel = 'uvel_extend', 'vvel_extend'
+            dx = float(grid.dx)
+        else:  # f
+            alpha = math.radians(-3.0)
+            rotated = RotatedGrid(alpha, data, transect=y_coord, halo=halo)
+            operator = interpolation.bilinear_operator(rotated.x[rotated.rows], rotated.y,
+                                                       y_coord, x_coord)
+            model_plot_data = interpolation.interpolate_fields(
+                    operator, {var: getattr(rotated, var) for var in config['interp_vars']})
+            velnorm = 'velnorm'
+            uvel, vvel = 'uvel', 'vvel'
+            dx = float(rotated.y[1] - rotated.y[0])
+
+        model_plot_data['y_hat'] = y_coord
+        model_plot_data['x_hat'] = x_coord
+        model_plot_data['dx'] = dx
+        model_plot_data[velnorm] = \
             np.linalg.norm(
-                np.array([bench_plot_data['uvel_extend'],
-                          bench_plot_data['vvel_extend'] ]),
+                np.array([model_plot_data[uvel],
+                          model_plot_data[vvel]]),
                 axis=0)
-    else:  # f
-        alpha = math.radians(-3.0)
+        plot_data[model] = model_plot_data
 
-        test_rotated = RotatedGrid(alpha, test_data)
-        bench_rotated = RotatedGrid(alpha, bench_data)
+    test_data.close()
+    bench_data.close()
 
-        for var in config['interp_vars']:
-            # regular 2d linear interp. but faster.
-            test2plot = interpolate.RectBivariateSpline(test_rotated.x, test_rotated.y,
-                                                        getattr(test_rotated, var),
-                                                        kx=1, ky=1, s=0)
-            bench2plot = interpolate.RectBivariateSpline(bench_rotated.x, bench_rotated.y,
-                                                         getattr(bench_rotated, var),
-                                                         kx=1, ky=1, s=0)
+    return plot_data
 
-            test_plot_data[var] = test2plot(y_coord, x_coord, grid=False)
-            bench_plot_data[var] = bench2plot(y_coord, x_coord, grid=False)
 
-        test_plot_data['velnorm'] = \
-            np.linalg.norm(
-                np.array([test_plot_data['uvel'],
-                          test_plot_data['vvel'] ]),
-                axis=0)
-        bench_plot_data['velnorm'] = \
-            np.linalg.norm(
-                np.array([bench_plot_data['uvel'],
-                          bench_plot_data['vvel'] ]),
-                axis=0)
-
-    return {'test': test_plot_data, 'bench': bench_plot_data}
+def get_field_data(test_file, bench_file, setup, config):
+    """
+    Read the final time slice of a variable, and its grid, for comparison to an
+    analytic solution.
+
+    Args:
+        test_file: The path to the test model output
+        bench_file: The path to the benchmark model output, or an empty string
+            if there isn't a matching benchmark
+        setup: The numerics test setup for this case (unused)
+        config: The numerics configuration for this case; the ``variable``
+            key names the variable to read
+
+    Returns:
+        A dictionary of the form {'test': field_data, 'bench': field_data}
+        where field_data contains the coordinate arrays 'x' and 'y', the grid
+        spacings 'dx' and 'dy', the model 'time', and the variable itself.
+        The 'bench' entry is omitted if there is no benchmark file.
+    """
+    field_data = {}
+    for model, data_file in [('test', test_file), ('bench', bench_file)]:
+        if not data_file:
+            continue
+        with Dataset(data_file, 'r') as data:
+            var = data.variables[config['variable']]
+            # NOTE: the variable is defined on either the staggered (x0, y0) or
+            #       unstaggered (x1, y1) grid, which are named by its dimensions
+            y = data.variables[var.dimensions[-2]][:]
+            x = data.variables[var.dimensions[-1]][:]
+            if var.ndim == 4:
+                field = var[-1, 0, :, :]
+            else:
+                field = var[-1, :, :]
+            progress.read_netcdf(data_file, np.asarray(field).nbytes + x.nbytes + y.nbytes)
+
+            field_data[model] = {'x': np.asarray(x),
+                                 'y': np.asarray(y),
+                                 'dx': float(x[1] - x[0]),
+                                 'dy': float(y[1] - y[0]),
+                                 'time': float(data.variables['time'][-1]),
+                                 config['variable']: field}
+    return field_data
@@ -35,9 +35,13 @@ import importlib
 
 import livvkit
 from livvkit.util import functions
+from livvkit.util import logs
+from livvkit.util import profiling
 from livvkit import elements
+from livvkit import scheduler
 
 
+@profiling.timed
 def run_suite(case, config):
     """ Run the full suite of numerics tests """
     m = importlib.import_module(config['module'])
@@ -53,6 +57,8 @@ def run_suite(case, config):
     model_cases = functions.collect_cases(model_dir)
     bench_cases = functions.collect_cases(bench_dir)
 
+    case_names = []
+    case_args = []
     for mscale in sorted(model_cases):
         bscale = bench_cases[mscale] if mscale in bench_cases else []
         for mproc in model_cases[mscale]:
@@ -62,29 +68,47 @@ def run_suite(case, config):
             mpath = os.path.join(model_dir, mscale, mproc.replace("-", os.path.sep))
             model_data = functions.find_file(mpath, "*" + config["output_ext"])
             bench_data = functions.find_file(bpath, "*" + config["output_ext"])
-            analysis_data[full_name] = bundle.get_plot_data(model_data,
-                                                            bench_data,
-                                                            m.setup[case],
-                                                            config)
+            case_names.append(full_name)
+            case_args.append((model_data, bench_data, m.setup[case], config))
+
+    # NOTE: numerics tests can name the bundle function used to read their data,
+    #       which defaults to the bundle's get_plot_data
+    get_data = getattr(bundle, getattr(m, 'data_hook', 'get_plot_data'))
+    plot_data = scheduler.pool_map(_read_case, [(get_data, name, args)
+                                                for name, args in zip(case_names, case_args)])
+    for full_name, data in zip(case_names, plot_data):
+        analysis_data[full_name] = data
+
+    # NOTE: numerics tests can compute the results shared by their plots and
+    #       summary once, with an analyze function, and these are passed on to
+    #       their run and summarize_result functions
+    shared = (m.analyze(config, analysis_data),) if hasattr(m, 'analyze') else ()
+
     try:
-        el = m.run(config, analysis_data)
+        el = [m.run(config, analysis_data, *shared)]
     except KeyError:
-        el = elements.Error("Numerics Plots", "Missing data")
+        el = [elements.Error("Numerics Plots", "Missing data")]
 
-    result = elements.Page(case, config['description'], elements=[el])
-    summary = _summarize_result(m, analysis_data, config)
+    conv = _convergence(m, analysis_data, config)
+    if conv is not None:
+        el.append(conv)
+
+    result = elements.Page(case, config['description'], elements=el)
+    summary = _summarize_result(m, analysis_data, config, *shared)
 
     _print_summary(m, case, summary)
 
-    functions.create_page_from_template(
-        "numerics.html", os.path.join(livvkit.index_dir, "numerics", case + ".html")
-    )
-    with open(os.path.join(livvkit.output_dir, "numerics", case + ".json"), 'w') as f:
-        f.write(result._repr_json())
+    functions.write_page(result, "numerics", case)
 
     return summary
 
 
+def _read_case(get_data, subcase, args):
+    """ Read the data of a resolution (subcase), tagging its log records with it """
+    with logs.tagged(subcase=subcase):
+        return get_data(*args)
+
+
 def _print_summary(module, case, summary):
     try:
         module.print_summary(case, summary)
@@ -93,9 +117,19 @@ def _print_summary(module, case, summary):
         print("")
 
 
-def _summarize_result(module, data, config):
+def _convergence(module, data, config):
+    try:
+        el = module.convergence(config, data)
+    except (NotImplementedError, AttributeError):
+        el = None
+    except KeyError:
+        el = elements.Error("Convergence analysis", "Missing data")
+    return el
+
+
+def _summarize_result(module, data, config, *shared):
     try:
-        summary = module.summarize_result(data, config)
+        summary = module.summarize_result(data, config, *shared)
     except (NotImplementedError, AttributeError):
         status = "Could not retrieve summary, open page for statistics"
         summary = {"": {"Test mean % error": status,
@@ -0,0 +1,297 @@
+# coding=utf-8
+# Copyright (c) 2015-2017, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Utilities to provide numerical verification against analytic (or manufactured)
+solutions over a sequence of grid resolutions.
+
+An analytic solution is a vectorized numpy function of the form
+``solution(x, y, t, **params)`` which is registered by name with the
+``register_solution`` decorator. A convergence study is then just an entry in a
+bundle's numerics configuration file; for example, to compare CISM's Halfar
+test to the Halfar similarity solution:
+
+.. code-block:: json
+
+    "halfar" : {
+        "description" : "Convergence of the Halfar test to the Halfar solution",
+        "module" : "livvkit.components.numerics_tests.analytic",
+        "data_dir" : "halfar",
+        "output_ext" : ".out.nc",
+        "variable" : "thk",
+        "solution" : "halfar",
+        "solution_params" : {"H0": 2000.0, "R0": 750000.0,
+                             "x_center": 0.0, "y_center": 0.0}
+    }
+
+The solution parameters must describe the initial dome of the runs being
+compared (e.g., the CISM dome verification test is not a Halfar setup, so it
+can't be compared to this solution).
+
+Solutions not registered in this module can be given as an import path of the
+form ``"package.module:function"``.
+"""
+
+import os
+import importlib
+import collections
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from livvkit import elements
+from livvkit.util import functions
+from livvkit.util import imagestore
+from livvkit.util.LIVVDict import LIVVDict
+# NOTE: the numerics component calls a test module's convergence function, if
+#       it has one, so the convergence utilities aren't imported by that name
+from livvkit.util.convergence import error_norms, observed_order
+
+SOLUTIONS = {}
+
+case_color = {'bench': '#d7191c',
+              'test':  '#fc8d59'}
+
+# The name of the bundle function used to read the model data
+data_hook = 'get_field_data'
+
+# NOTE: Everything needed is in the case configuration, so there is no
+#       additional setup for any case.
+setup = collections.defaultdict(dict)
+
+
+def set_up():
+    pass
+
+
+def register_solution(name):
+    """
+    Register an analytic solution under a name that can be used in a
+    configuration file.
+
+    Args:
+        name: The name of the solution
+    """
+    def decorator(func):
+        SOLUTIONS[name] = func
+        return func
+    return decorator
+
+
+def get_solution(name):
+    """
+    Get an analytic solution function from the registry or an import path.
+
+    Args:
+        name: A registered solution name, or an import path of the form
+            ``"package.module:function"``
+
+    Returns:
+        The solution function
+    """
+    if name in SOLUTIONS:
+        return SOLUTIONS[name]
+    module, _, func = name.partition(':')
+    if not func:
+        raise KeyError('Unknown analytic solution {}; registered solutions are: {}'.format(
+            name, ', '.join(sorted(SOLUTIONS))))
+    return getattr(importlib.import_module(module), func)
+
+
+@register_solution('halfar')
+def halfar(x, y, t, H0, R0, A=1.0e-16, n=3, rho=910.0, g=9.81,
+           t_offset=None, x_center=0.0, y_center=0.0):
+    """
+    The Halfar similarity solution for the thickness of an isothermal dome of
+    ice spreading on a flat bed (Halfar, 1981; Bueler et al., 2005).
+
+    Args:
+        x: The x coordinates (m)
+        y: The y coordinates (m)
+        t: The model time (a)
+        H0: The dome height (m) at the characteristic time
+        R0: The dome radius (m) at the characteristic time
+        A: The flow rate factor (Pa^-n a^-1)
+        n: The flow law exponent; the similarity solution requires n = 3
+        rho: The density of ice (kg m^-3)
+        g: The gravitational acceleration (m s^-2)
+        t_offset: The time (a) of the solution at model time zero. If None, the
+            characteristic time is used so the model begins with a dome of
+            height H0 and radius R0.
+        x_center: The x coordinate (m) of the dome center
+        y_center: The y coordinate (m) of the dome center
+
+    Returns:
+        The ice thickness (m)
+    """
+    gamma = 2.0 * A * (rho * g)**n / (n + 2)
+    t0 = (1.0 / (18.0 * gamma)) * (7.0 / 4.0)**3 * R0**4 / H0**7
+    if t_offset is None:
+        t_offset = t0
+    ratio = t0 / (t + t_offset)
+
+    r = np.hypot(np.asarray(x) - x_center, np.asarray(y) - y_center)
+    inner = 1.0 - (ratio**(1.0 / 18.0) * r / R0)**(4.0 / 3.0)
+    return H0 * ratio**(1.0 / 9.0) * np.maximum(inner, 0.0)**(3.0 / 7.0)
+
+
+def _resolution_ladder(cases):
+    """ Order the cases by resolution, and then processor count """
+    def key(case):
+        parts = case.split('-')
+        procs = functions.sort_processor_counts(parts[1]) if len(parts) > 1 else 0
+        return functions.sort_scale(parts[0]), procs
+    return sorted(cases, key=key)
+
+
+def compute_errors(config, analysis_data):
+    """
+    Compare each case to the analytic solution and compute the error norms and
+    the observed order of convergence.
+
+    Args:
+        config: The numerics configuration for the case
+        analysis_data: The data returned by the bundle's get_field_data for
+            each case
+
+    Returns:
+        A dictionary keyed by model ('test' or 'bench') with the ordered case
+        names, grid spacings, error norms of each case, the cases which make
+        up the resolution ladder (one case per resolution) and the observed
+        orders of convergence between successive rungs of the ladder
+    """
+    solution = get_solution(config['solution'])
+    params = config.get('solution_params', {})
+    var = config['variable']
+
+    results = {}
+    for model in ['test', 'bench']:
+        cases = [c for c in _resolution_ladder(analysis_data) if model in analysis_data[c]]
+        if not cases:
+            continue
+
+        errors = []
+        weights = []
+        for case in cases:
+            data = analysis_data[case][model]
+            x, y = np.meshgrid(data['x'], data['y'])
+            errors.append(data[var] - solution(x, y, data['time'], **params))
+            weights.append(abs(data['dx'] * data['dy']))
+        norms = error_norms(errors, weights)
+        spacing = np.array([abs(analysis_data[c][model]['dx']) for c in cases])
+
+        # NOTE: the solution shouldn't depend on the processor count, so the
+        #       first (lowest) processor count is used for each resolution
+        rungs = []
+        for ii, case in enumerate(cases):
+            if not rungs or case.split('-')[0] != cases[rungs[-1]].split('-')[0]:
+                rungs.append(ii)
+        orders = observed_order(
+                spacing[rungs], np.column_stack([norms[n][rungs] for n in ['L1', 'L2', 'Linf']]))
+
+        results[model] = {'cases': cases,
+                          'dx': spacing,
+                          'norms': norms,
+                          'ladder': [cases[r] for r in rungs],
+                          'orders': {n: orders[:, ii] for ii, n in enumerate(['L1', 'L2', 'Linf'])}}
+    return results
+
+
+# NOTE: the numerics component computes the errors once, with this function,
+#       and passes them on to run and summarize_result
+analyze = compute_errors
+
+
+def run(config, analysis_data, results):
+    norms_table = collections.OrderedDict(
+            [('Case', []), ('Model', []), ('dx', []), ('L1', []), ('L2', []), ('Linf', [])])
+    orders_table = collections.OrderedDict(
+            [('Resolutions', []), ('Model', []), ('L1 order', []), ('L2 order', []), ('Linf order', [])])
+    for model, result in results.items():
+        for ii, case in enumerate(result['cases']):
+            norms_table['Case'].append(case)
+            norms_table['Model'].append(model)
+            norms_table['dx'].append('{:.4g}'.format(result['dx'][ii]))
+            for norm in ['L1', 'L2', 'Linf']:
+                norms_table[norm].append('{:.4e}'.format(result['norms'][norm][ii]))
+        for ii, (coarse, fine) in enumerate(zip(result['ladder'][:-1], result['ladder'][1:])):
+            orders_table['Resolutions'].append(coarse.split('-')[0] + ' to ' + fine.split('-')[0])
+            orders_table['Model'].append(model)
+            for norm in ['L1', 'L2', 'Linf']:
+                orders_table[norm + ' order'].append('{:.2f}'.format(result['orders'][norm][ii]))
+
+    el = [elements.Table('Error norms', norms_table)]
+    if orders_table['Resolutions']:
+        el.append(elements.Table('Observed order of convergence', orders_table))
+    el.append(elements.Gallery('Convergence Plots', [plot_convergence(config, results)]))
+
+    return elements.Section('Convergence to the {} solution'.format(config['solution']), el)
+
+
+def plot_convergence(config, results):
+    """ Plot the L2 error norm against the grid spacing """
+    plot_file = os.path.join(config['plot_dir'], config['name'] + '_convergence.png')
+
+    plt.figure(figsize=(10, 8), dpi=150)
+    plt.title(config['name'] + ' ' + config['variable'])
+    plt.xlabel('Grid spacing')
+    plt.ylabel('L2 error norm')
+    for model, result in results.items():
+        plt.loglog(result['dx'], result['norms']['L2'], 'o-',
+                   color=case_color[model], linewidth=2, label=model)
+    plt.legend(loc='best')
+    plot_file = imagestore.save_figure(plt.gcf(), plot_file)
+    plt.close()
+
+    return elements.Image('Convergence of ' + config['variable'],
+                          'L2 norm of the error relative to the {} solution'.format(config['solution']),
+                          plot_file)
+
+
+def summarize_result(data, config, results):
+    summary = LIVVDict()
+    for model, result in results.items():
+        for ii, case in enumerate(result['cases']):
+            summary[case][model.capitalize() + ' L2 error'] = \
+                '{:.4e}'.format(result['norms']['L2'][ii])
+        for ii, case in enumerate(result['ladder'][1:]):
+            summary[case][model.capitalize() + ' L2 order'] = \
+                '{:.2f}'.format(result['orders']['L2'][ii])
+    return summary
+
+
+def print_summary(case, summary):
+    """ Show some statistics from the run """
+    for subcase in summary:
+        message = case + " " + subcase
+        print("    " + message)
+        print("    " + "-"*len(message))
+        for key, val in summary[subcase].items():
+            print(" "*4 + key.ljust(25) + ":" + val.rjust(11))
+        print("")
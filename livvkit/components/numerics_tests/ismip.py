@@ -32,6 +32,7 @@ Utilities to provide numerical verification for the ISMIP test cases
 """
 
 import os
+import collections
 
 import numpy as np
 import matplotlib.pyplot as plt
@@ -39,7 +40,10 @@ import matplotlib.pyplot as plt
 import livvkit
 from livvkit.util.LIVVDict import LIVVDict
 from livvkit import elements
+from livvkit import scheduler
 from livvkit.util import functions
+from livvkit.util import imagestore
+from livvkit.util import convergence as conv
 
 
 case_color = {'bench': '#d7191c',
@@ -80,60 +84,143 @@ def run(config, analysis_data):
         [get_case_length(d) for d in analysis_data]
         ))
 
-    plot_list = []
+    plot_args = []
     for p, pattern in enumerate(sorted(setup[case]['pattern'])):
-        fig_label = pattern.split('_')[1]
-        description = ''
-
         for l in sorted(lengths):
-            plt.figure(figsize=(10, 8), dpi=150)
-            plt.xlabel(setup[case]['xlabel'][p])
-            plt.ylabel(setup[case]['ylabel'][p])
-
-            if case in ['ismip-hom-a', 'ismip-hom-c']:
-                plt.title(str(int(l))+' km')
-                title = fig_label[0:-1]+'. '+fig_label[-1]+': '+str(int(l))+' km'
-            else:
-                plt.title('No-Slip Bed')
-                title = fig_label[0:-2]+'. '+fig_label[-2:]+': No-Slip Bed'
-
-            plot_file = os.path.join(config["plot_dir"], config['name']+'_'+fig_label+'_'+l+'.png')
-            recreate_file = os.path.join(
-                    livvkit.__path__[0], setup[case]["data_dir"], pattern
-                    ).replace('???', l)
-            axis, fs_amin, fs_amax, fs_mean, fs_std, ho_amin, ho_amax, ho_mean, ho_std = \
-                np.genfromtxt(recreate_file, delimiter=',', missing_values='nan', unpack=True)
-
-            if case in ['ismip-hom-f']:
-                axis = axis*100.0 - 50.0
-
-            plt.fill_between(axis, ho_amin, ho_amax, facecolor='green', alpha=0.5)
-            plt.fill_between(axis, fs_amin, fs_amax, facecolor='blue', alpha=0.5)
-            plt.plot(axis, fs_mean, 'b-', linewidth=2, label='Full stokes')
-            plt.plot(axis, ho_mean, 'g-', linewidth=2, label='Higher order')
-
             analysis = {}
             for a in analysis_data:
                 if int(l) == int(a.split('-')[-1][1:]):
                     analysis[a] = analysis_data[a]
+            plot_args.append((config, setup[case], coord, p, pattern, l, analysis))
 
-            for a in analysis:
-                for model in sorted(analysis[a]):
-                    plt.plot(analysis[a][model][coord],
-                             analysis[a][model][config['plot_vars'][p]],
-                             line_style[model],
-                             color=case_color[model],
-                             linewidth=2,
-                             label=a+'-'+model)
+    plot_list = scheduler.pool_map(plot_length, plot_args)
 
-            plt.legend(loc='best')
-            plt.savefig(plot_file)
-            plt.close()
+    return elements.Gallery("Numerics Plots", plot_list)
 
-            image = elements.Image(title, description, plot_file)
-            plot_list.append(image)
 
-    return elements.Gallery("Numerics Plots", plot_list)
+def plot_length(config, case_setup, coord, p, pattern, l, analysis):
+    """
+    Plot a single ISMIP-HOM figure for one domain length.
+
+    Args:
+        config: The numerics configuration for the case
+        case_setup: The ISMIP-HOM setup for the case (``setup[case]``)
+        coord: The analysis data coordinate to plot along
+        p: The index of the pattern
+        pattern: The ISMIP-HOM reference data file pattern
+        l: The domain length, as a zero-padded string
+        analysis: The analysis data for this domain length
+
+    Returns:
+        An Image element of the plot
+    """
+    case = config['name']
+    fig_label = pattern.split('_')[1]
+    description = ''
+
+    plt.figure(figsize=(10, 8), dpi=150)
+    plt.xlabel(case_setup['xlabel'][p])
+    plt.ylabel(case_setup['ylabel'][p])
+
+    if case in ['ismip-hom-a', 'ismip-hom-c']:
+        plt.title(str(int(l))+' km')
+        title = fig_label[0:-1]+'. '+fig_label[-1]+': '+str(int(l))+' km'
+    else:
+        plt.title('No-Slip Bed')
+        title = fig_label[0:-2]+'. '+fig_label[-2:]+': No-Slip Bed'
+
+    plot_file = os.path.join(config["plot_dir"], config['name']+'_'+fig_label+'_'+l+'.png')
+    recreate_file = os.path.join(
+            livvkit.__path__[0], case_setup["data_dir"], pattern
+            ).replace('???', l)
+    axis, fs_amin, fs_amax, fs_mean, fs_std, ho_amin, ho_amax, ho_mean, ho_std = \
+        np.genfromtxt(recreate_file, delimiter=',', missing_values='nan', unpack=True)
+
+    if case in ['ismip-hom-f']:
+        axis = axis*100.0 - 50.0
+
+    plt.fill_between(axis, ho_amin, ho_amax, facecolor='green', alpha=0.5)
+    plt.fill_between(axis, fs_amin, fs_amax, facecolor='blue', alpha=0.5)
+    plt.plot(axis, fs_mean, 'b-', linewidth=2, label='Full stokes')
+    plt.plot(axis, ho_mean, 'g-', linewidth=2, label='Higher order')
+
+    for a in analysis:
+        for model in sorted(analysis[a]):
+            plt.plot(analysis[a][model][coord],
+                     analysis[a][model][config['plot_vars'][p]],
+                     line_style[model],
+                     color=case_color[model],
+                     linewidth=2,
+                     label=a+'-'+model)
+
+    plt.legend(loc='best')
+    plot_file = imagestore.save_figure(plt.gcf(), plot_file)
+    plt.close()
+
+    return elements.Image(title, description, plot_file)
+
+
+def convergence(config, analysis_data):
+    """
+    Relate the resolutions of each domain length to each other by computing the
+    observed order of accuracy, the Richardson-extrapolated solution, and the
+    grid convergence index (GCI) for every three successive resolutions.
+
+    The analysis data is already interpolated to the ISMIP-HOM transect, so the
+    resolutions can be compared point-wise without any further interpolation.
+
+    Args:
+        config: The numerics configuration for the case
+        analysis_data: The data returned by the bundle's get_plot_data for
+            each case
+
+    Returns:
+        A Table element of the convergence analysis, or None if no domain
+        length was run at three or more resolutions
+    """
+    table = collections.OrderedDict(
+            [('Length', []), ('Variable', []), ('Model', []), ('Resolutions', []),
+             ('Observed order', []), ('Fine GCI', []), ('Medium GCI', []),
+             ('Asymptotic ratio', []), ('Max extrapolated change', [])])
+
+    lengths = sorted(set([get_case_length(d) for d in analysis_data]))
+    for l in lengths:
+        # NOTE: the solution shouldn't depend on the processor count, so the
+        #       lowest processor count is used for each resolution
+        rungs = {}
+        for a in sorted(analysis_data, key=lambda c: functions.sort_processor_counts(c.split('-')[1])):
+            if int(l) == int(a.split('-')[-1][1:]):
+                rungs.setdefault(a.split('-')[0], a)
+
+        for model in ['test', 'bench']:
+            cases = [c for c in rungs.values() if model in analysis_data[c]]
+            cases.sort(key=lambda c: analysis_data[c][model]['dx'], reverse=True)
+            spacing = np.array([analysis_data[c][model]['dx'] for c in cases])
+
+            for var in config['plot_vars']:
+                for ii in range(len(cases) - 2):
+                    triplet = cases[ii:ii+3]
+                    result = conv.richardson_extrapolation(
+                            spacing[ii:ii+3], [analysis_data[c][model][var] for c in triplet])
+
+                    r21 = spacing[ii+1] / spacing[ii+2]
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        asymptotic = result['gci_medium'] / (r21**result['order'] * result['gci_fine'])
+                        change = np.abs(result['extrapolated'] - analysis_data[triplet[-1]][model][var])
+
+                    table['Length'].append(str(int(l)))
+                    table['Variable'].append(var)
+                    table['Model'].append(model)
+                    table['Resolutions'].append(', '.join([c.split('-')[0] for c in triplet]))
+                    table['Observed order'].append('{:.2f}'.format(np.nanmedian(result['order'])))
+                    table['Fine GCI'].append('{:3.2%}'.format(np.nanmean(result['gci_fine'])))
+                    table['Medium GCI'].append('{:3.2%}'.format(np.nanmean(result['gci_medium'])))
+                    table['Asymptotic ratio'].append('{:.3f}'.format(np.nanmedian(asymptotic)))
+                    table['Max extrapolated change'].append('{:.4g}'.format(np.nanmax(change)))
+
+    if not table['Length']:
+        return None
+    return elements.Table('Convergence analysis', table)
 
 
 def summarize_result(data, config):
@@ -38,12 +38,16 @@ import matplotlib.pyplot as plt
 import livvkit
 from livvkit import elements
 from livvkit.util import functions
+from livvkit.util import imagestore
+from livvkit.util import logs
+from livvkit.util import profiling
 from livvkit.util import colormaps
 from livvkit.util.LIVVDict import LIVVDict
 
 SEC_PER_DAY = 86400.0
 
 
+@profiling.timed
 def run_suite(case, config):
     """ Run the full suite of performance tests """
     config["name"] = case
@@ -64,7 +68,8 @@ def run_suite(case, config):
             bpath = (os.path.join(bench_dir, subcase, mcase.replace("-", os.path.sep))
                      if mcase in bench_subcases else None)
             mpath = os.path.join(model_dir, subcase, mcase.replace("-", os.path.sep))
-            timing_data[subcase][mcase] = _analyze_case(mpath, bpath, config)
+            with logs.tagged(subcase=config["case"]):
+                timing_data[subcase][mcase] = _analyze_case(mpath, bpath, config)
 
     # Create scaling and timing breakdown plots
     weak_data = weak_scaling(timing_data, config['scaling_var'],
@@ -114,15 +119,12 @@ def run_suite(case, config):
 
     _print_result(case, summary)
 
-    functions.create_page_from_template("performance.html",
-                                        os.path.join(livvkit.index_dir, "performance",
-                                                     case + ".html"))
-    with open(os.path.join(livvkit.output_dir, "performance", case + ".json"), 'w') as f:
-        f.write(result._repr_json())
+    functions.write_page(result, "performance", case)
 
     return summary
 
 
+@profiling.timed
 def _analyze_case(model_dir, bench_dir, config):
     """ Generates statistics from the timing summaries """
     model_timings = set(glob.glob(os.path.join(model_dir, "*" + config["timing_ext"])))
@@ -346,7 +348,7 @@ def generate_scaling_plot(timing_data, title, ylabel, description, plot_file):
         plt.text(0.0, 0.44, "To generate this data rerun BATS with the")
         plt.text(0.0, 0.36, "performance option enabled.")
 
-    plt.savefig(plot_file)
+    plot_file = imagestore.save_figure(plt.gcf(), plot_file)
     plt.close()
 
     image = elements.Image(title, description, plot_file)
@@ -416,7 +418,7 @@ def generate_timing_breakdown_plot(timing_stats, scaling_var, title, description
     Returns:
         an image element containing the plot file and metadata
     """
-    cmap_data = colormaps._viridis_data
+    cmap_data = colormaps.colormap_data('viridis')
     n_subplots = len(timing_stats)
     fig, ax = plt.subplots(1, n_subplots+1, figsize=(3*(n_subplots+2), 5))
     for plot_num, p_count in enumerate(
@@ -460,7 +462,7 @@ def generate_timing_breakdown_plot(timing_stats, scaling_var, title, description
             group.set_visible(False)
     sub_ax.set_visible(False)
 
-    plt.savefig(plot_file)
+    plot_file = imagestore.save_figure(plt.gcf(), plot_file)
     plt.close()
 
     image = elements.Image(title, description, plot_file)
@@ -35,6 +35,7 @@ import importlib
 
 import livvkit
 from livvkit.util import functions
+from livvkit.util import profiling
 
 ERR_MISSING_MOD_MSG = """
 !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -109,6 +110,7 @@ def _load_case_module(case, config):
     return m
 
 
+@profiling.timed
 def run_suite(case, config):
     """ Run the full suite of validation tests """
     m = _load_case_module(case, config)
@@ -118,10 +120,7 @@ def run_suite(case, config):
     _print_summary(m, case, summary)
 
 
-    functions.create_page_from_template("validation.html",
-                                        os.path.join(livvkit.index_dir, "validation", case + ".html"))
-    with open(os.path.join(livvkit.output_dir, "validation", case + ".json"), 'w') as f:
-        f.write(result._repr_json())
+    functions.write_page(result, "validation", case)
 
     return summary
 
@@ -40,10 +40,15 @@ from netCDF4 import Dataset
 import livvkit
 from livvkit import elements
 from livvkit.util import functions
+from livvkit.util import imagestore
+from livvkit.util import logs
 from livvkit.util import colormaps
+from livvkit.util import progress
+from livvkit.util import profiling
 from livvkit.util.LIVVDict import LIVVDict
 
 
+@profiling.timed
 def run_suite(case, config):
     """ Run the full suite of verification tests """
     config["name"] = case
@@ -61,7 +66,8 @@ def run_suite(case, config):
             bpath = (os.path.join(bench_dir, subcase, mcase.replace("-", os.path.sep))
                      if mcase in bench_subcases else "")
             mpath = os.path.join(model_dir, subcase, mcase.replace("-", os.path.sep))
-            case_result = _analyze_case(mpath, bpath, config)
+            with logs.tagged(subcase='-'.join([subcase, mcase])):
+                case_result = _analyze_case(mpath, bpath, config)
             case_sections.append(elements.Section(mcase, case_result))
             summary[subcase] = _summarize_result(case_result, summary[subcase])
         tabs[subcase] = case_sections
@@ -70,15 +76,12 @@ def run_suite(case, config):
 
     _print_summary(case, summary)
 
-    functions.create_page_from_template(
-        "verification.html", os.path.join(livvkit.index_dir, "verification", case + ".html")
-    )
-    with open(os.path.join(livvkit.output_dir, "verification", case+".json"), 'w') as f:
-        f.write(result._repr_json())
+    functions.write_page(result, "verification", case)
 
     return summary
 
 
+@profiling.timed
 def _analyze_case(test_dir, ref_dir, config):
     """ Runs all of the verification checks on a particular case """
     bundle = livvkit.verification_model_module
@@ -169,6 +172,7 @@ def populate_metadata(case, config):
             "Headers": ["Bit for Bit", "Configurations", "Std. Out Files"]}
 
 
+@profiling.timed
 def bit_for_bit(model_path, bench_path, config):
     """
     Checks whether the given files have bit for bit solution matches
@@ -197,6 +201,8 @@ def bit_for_bit(model_path, bench_path, config):
     if not (len(model_data.dimensions['time']) > 0 and len(bench_data.dimensions['time']) > 0):
         return elements.Error("Bit for Bit",
                               "File named " + fname + " could not be read!")
+    progress.read_netcdf(model_path)
+    progress.read_netcdf(bench_path)
 
     # Begin bit for bit analysis
     plot_elements = []
@@ -233,6 +239,7 @@ def bit_for_bit(model_path, bench_path, config):
     return elements.BitForBit("Bit for Bit", table_data, imgs=plot_elements)
 
 
+@profiling.timed
 def plot_bit_for_bit(case, var_name, model_data, bench_data, diff_data):
     """ Create a bit for bit plot """
     plot_title = ""
@@ -289,7 +296,7 @@ def plot_bit_for_bit(case, var_name, model_data, bench_data, diff_data):
     plt.suptitle(plot_title)
 
     plot_file = os.path.sep.join([plot_path, plot_name])
-    plt.savefig(plot_file)
+    plot_file = imagestore.save_figure(plt.gcf(), plot_file)
     plt.close()
 
     # NOTE: If you don't include a title, you must include a group for the image
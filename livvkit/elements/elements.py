@@ -40,26 +40,59 @@ BaseElement abstract class.
 """
 
 import os
+import sys
 import abc
 import glob
-import difflib
+import functools
+import contextlib
 import collections
 
 from pathlib import Path
 
 import jinja2
 import json_tricks
-import pandas as pd
+import numpy as np
 
 import livvkit
 import livvkit.data
-from livvkit.util import bib
+from livvkit.util import json_backend
+from livvkit.util import profiling
+from livvkit.util import sidecar
+from livvkit.util import textdiff
 
 _HERE = os.path.dirname(__file__)
 
+
+def _bytecode_cache(kind):
+    """A cache of the compiled templates, shared by every LIVVkit process
+
+    The compiled templates are stored in the directory given by the
+    ``LIVVKIT_TEMPLATE_CACHE`` environment variable, or a private (per-user)
+    temporary directory by default, so that each (worker) process loads the
+    compiled templates instead of compiling them again. A cached template is
+    only used if its source is unchanged.
+
+    Args:
+        kind: The kind of templates cached (html or latex), which is used to
+            name the cache files
+
+    Returns:
+        A ``jinja2.FileSystemBytecodeCache``, or None if the cache directory
+        can't be used
+    """
+    try:
+        return jinja2.FileSystemBytecodeCache(os.environ.get('LIVVKIT_TEMPLATE_CACHE'),
+                                              pattern='__livvkit_{}_%s.cache'.format(kind))
+    except (OSError, RuntimeError):
+        return None
+
+
+# NOTE: templates are compiled once per process, and aren't checked for updates
 # skipcq: BAN-B701
 _html_env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(os.path.join(_HERE, 'templates')))
+        loader=jinja2.FileSystemLoader(os.path.join(_HERE, 'templates')),
+        bytecode_cache=_bytecode_cache('html'),
+        auto_reload=False)
 
 # skipcq: BAN-B701
 _latex_env = jinja2.Environment(
@@ -70,7 +103,76 @@ _latex_env = jinja2.Environment(
         comment_start_string=r'\#{',      # default: {#
         comment_end_string=r'}',          # default: #}
         trim_blocks=True,
-        loader=jinja2.FileSystemLoader(os.path.join(_HERE, 'templates')))
+        loader=jinja2.FileSystemLoader(os.path.join(_HERE, 'templates')),
+        bytecode_cache=_bytecode_cache('latex'),
+        auto_reload=False)
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_memoized(env, template_name, data):
+    """Render a template, reusing the result for identical data
+
+    Args:
+        env: The jinja2 environment of the template
+        template_name: The name of the template
+        data: The element's data, as a (hashable) tuple of (name, value) pairs
+
+    Returns:
+        str: The rendered template
+    """
+    return env.get_template(template_name).render(data=dict(data))
+
+
+def _streamed(jsn):
+    """Mark an element's dictionary representation to be streamed item by item
+
+    Args:
+        jsn: The dictionary representation of a (composite) element
+
+    Returns:
+        The representation as a ``json_backend.StreamedDict``
+    """
+    return json_backend.StreamedDict(
+            (name, json_backend.StreamedDict(attrs)) for name, attrs in jsn.items())
+
+
+def _element_dict(element):
+    """Get the dictionary representation of a (possibly third-party) element
+
+    Elements which implement the LIVVkit element interface, but don't derive from
+    BaseElement, may not provide ``_to_dict``; those are represented by parsing
+    their ``_repr_json``.
+    """
+    if hasattr(element, '_to_dict'):
+        return element._to_dict()
+    return json_tricks.loads(element._repr_json())
+
+
+def _is_dataframe(data):
+    """Check if data is a pandas DataFrame, without importing pandas
+
+    NOTE: pandas is slow to import, and if it hasn't been imported, data can't
+    be a DataFrame.
+    """
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(data, pd.DataFrame)
+
+
+def _finite_or_none(values):
+    """Replace the non-finite floats (which aren't valid JSON) in a list with None"""
+    return [None if isinstance(v, float) and not np.isfinite(v) else v for v in values]
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_names(cls):
+    """The names of the attributes stored in the ``__slots__`` of a class and its bases"""
+    names = []
+    for base in reversed(cls.__mro__):
+        slots = base.__dict__.get('__slots__', ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            if name not in ('__dict__', '__weakref__') and name not in names:
+                names.append(name)
+    return tuple(names)
 
 
 class BaseElement(abc.ABC):
@@ -80,6 +182,11 @@ class BaseElement(abc.ABC):
     expected by LIVVkit. All LIVVkit elements should either derive from this
     class or implement the same interface.
     """
+    # NOTE: A report may contain tens of thousands of elements, so elements
+    #       store their attributes in __slots__ where they can, instead of an
+    #       instance __dict__. Subclasses which don't define __slots__ (e.g., Page,
+    #       Table, and third-party elements) still have an instance __dict__.
+    __slots__ = ()
 
     # FIXME: There's got to be a better way.
     #  We want _html_template (_latex_template) to be required and act like:
@@ -92,6 +199,13 @@ class BaseElement(abc.ABC):
     #  Unfortunately, the chained @property and @abc.abstractmethod doesn't enforce
     #  an attribute/property like action and can be satisfied by defining a method,
     #  so we make sure that if it's not a property, it's also not callable (a method)
+
+    # NOTE: Leaf elements whose attributes are all hashable, and aren't changed
+    #       once they're initialized, can set this to reuse the rendered
+    #       HTML (LaTeX) of identical elements, e.g. the many B4BImage elements
+    #       of a verification report
+    _memoize = False
+
     def __init__(self):
         """Initialize a LIVVkit element
         """
@@ -126,6 +240,43 @@ class BaseElement(abc.ABC):
         """
         raise NotImplementedError
 
+    def _attrs(self):
+        """The attributes of this element
+
+        Collect the attributes of this element, whether they're stored in
+        ``__slots__`` or the instance ``__dict__``, in the order they are
+        declared (and then assigned).
+
+        Returns:
+            dict: The attributes of this element
+        """
+        attrs = {}
+        for name in _slot_names(type(self)):
+            try:
+                attrs[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        attrs.update(getattr(self, '__dict__', {}))
+        return attrs
+
+    def _to_dict(self):
+        """Represent this element as a dictionary
+
+        Return the plain-Python (dictionary) representation of this element
+        which is encoded by ``self._repr_json``. Composite elements include the
+        dictionary representations of the elements they contain, so an entire
+        report can be encoded in a single pass.
+
+        Returns:
+            dict: The dictionary representation of this element
+        """
+        jsn = {type(self).__name__: self._attrs()}
+        jsn[type(self).__name__].update({'__module__': type(self).__module__,
+                                         '_html_template': self._html_template,
+                                         '_latex_template': self._latex_template})
+        return jsn
+
+    @profiling.timed
     def _repr_json(self):
         """Represent this element as JSON
 
@@ -135,11 +286,26 @@ class BaseElement(abc.ABC):
         Returns:
             str: The JSON representation of this element
         """
-        jsn = {type(self).__name__: self.__dict__.copy()}
-        jsn[type(self).__name__].update({'__module__': type(self).__module__,
-                                         '_html_template': self._html_template,
-                                         '_latex_template': self._latex_template})
-        return json_tricks.dumps(jsn, indent=4, primitives=True, allow_nan=True)
+        jsn = json_backend.tricks_encoder().encode(self._to_dict())
+        profiling.add_bytes(len(jsn))
+        return jsn
+
+    @profiling.timed
+    def _write_json(self, fp, compact=False):
+        """Write the JSON representation of this element to a file
+
+        The JSON is encoded incrementally, using the fastest available JSON
+        backend (see ``livvkit.util.json_backend``), and streamed to ``fp`` so
+        that the full JSON representation of a (large) report is never held in
+        memory.
+
+        Args:
+            fp: A file-like object opened for writing text with
+                ``encoding='utf-8'``
+            compact: If True, write the JSON without any indentation or
+                whitespace between items (default: False)
+        """
+        json_backend.dump(self._to_dict(), fp, compact=compact)
 
     def _repr_html(self):
         """Represent this element as HTML
@@ -150,8 +316,10 @@ class BaseElement(abc.ABC):
         Returns:
             str: The HTML representation of this element
         """
+        if self._memoize:
+            return _render_memoized(_html_env, self._html_template, tuple(sorted(self._attrs().items())))
         template = _html_env.get_template(self._html_template)
-        return template.render(data=self.__dict__)
+        return template.render(data=self._attrs())
 
     def _repr_latex(self):
         """Represent this element as LaTeX
@@ -162,8 +330,10 @@ class BaseElement(abc.ABC):
         Returns:
             str: The LaTeX representation of this element
         """
+        if self._memoize:
+            return _render_memoized(_latex_env, self._latex_template, tuple(sorted(self._attrs().items())))
         template = _latex_env.get_template(self._latex_template)
-        return template.render(data=self.__dict__)
+        return template.render(data=self._attrs())
 
 
 class CompositeElement(BaseElement, abc.ABC):
@@ -174,6 +344,8 @@ class CompositeElement(BaseElement, abc.ABC):
     elements should either be derived from the LIVVkit BaseElement or implement
     the same interface.
     """
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         """Initialize a composite LIVVkit element
 
@@ -183,24 +355,19 @@ class CompositeElement(BaseElement, abc.ABC):
         super(CompositeElement, self).__init__()
         self.elements = elements
 
-    def _repr_json(self):
-        """Represent this element as JSON
+    def _to_dict(self):
+        """Represent this element as a dictionary
 
-        Using the internal dictionary representation of this element, return a
-        JSON representation of this element
+        Return the plain-Python (dictionary) representation of this element,
+        including the dictionary representations of the contained elements.
 
         Returns:
-            str: The JSON representation of this element
+            dict: The dictionary representation of this element
         """
-        jsn = {type(self).__name__: self.__dict__.copy()}
-        jsn[type(self).__name__].update({'__module__': type(self).__module__,
-                                         '_html_template': self._html_template,
-                                         '_latex_template': self._latex_template})
-
-        elem_repr = [json_tricks.loads(elem._repr_json()) for elem in self.elements]
-        jsn[type(self).__name__]['elements'] = elem_repr
-
-        return json_tricks.dumps(jsn, indent=4, primitives=True, allow_nan=True)
+        jsn = _streamed(super(CompositeElement, self)._to_dict())
+        jsn[type(self).__name__]['elements'] = json_backend.StreamedList(
+                _element_dict(elem) for elem in self.elements)
+        return jsn
 
     def _repr_html(self):
         """Represent this element as HTML
@@ -213,7 +380,7 @@ class CompositeElement(BaseElement, abc.ABC):
         """
         elem_repr = [elem._repr_html() for elem in self.elements]
         template = _html_env.get_template(self._html_template)
-        return template.render(data=self.__dict__, elements=elem_repr)
+        return template.render(data=self._attrs(), elements=elem_repr)
 
     def _repr_latex(self):
         """Represent this element as LaTeX
@@ -226,7 +393,7 @@ class CompositeElement(BaseElement, abc.ABC):
         """
         template = _latex_env.get_template(self._latex_template)
         elem_repr = [elem._repr_latex() for elem in self.elements]
-        return template.render(data=self.__dict__, elements=elem_repr)
+        return template.render(data=self._attrs(), elements=elem_repr)
 
 
 class NamedCompositeElement(BaseElement, abc.ABC):
@@ -237,6 +404,8 @@ class NamedCompositeElement(BaseElement, abc.ABC):
     interface expected by LIVVkit. All LIVVkit elements should either be derived
     from the LIVVkit BaseElement or implement the same interface.
     """
+    __slots__ = ('elements_dict',)
+
     def __init__(self, elements_dict):
         """Initialize  a multi-composite LIVVkit element
 
@@ -248,27 +417,23 @@ class NamedCompositeElement(BaseElement, abc.ABC):
         super(NamedCompositeElement, self).__init__()
         self.elements_dict = elements_dict
 
-    def _repr_json(self):
-        """Represent this element as JSON
+    def _to_dict(self):
+        """Represent this element as a dictionary
 
-        Using the internal dictionary representation of this element, return a
-        JSON representation of this element
+        Return the plain-Python (dictionary) representation of this element,
+        including the dictionary representations of the contained elements.
 
         Returns:
-            str: The JSON representation of this element
+            dict: The dictionary representation of this element
         """
-        jsn = {type(self).__name__: self.__dict__.copy()}
-        jsn[type(self).__name__].update({'__module__': type(self).__module__,
-                                         '_html_template': self._html_template,
-                                         '_latex_template': self._latex_template})
+        jsn = _streamed(super(NamedCompositeElement, self)._to_dict())
 
-        elem_repr = {}
+        elem_repr = json_backend.StreamedDict()
         for title, elements in self.elements_dict.items():
-            elem_repr[title] = [json_tricks.loads(elem._repr_json()) for elem in elements]
+            elem_repr[title] = json_backend.StreamedList(_element_dict(elem) for elem in elements)
 
         jsn[type(self).__name__]['elements_dict'] = elem_repr
-
-        return json_tricks.dumps(jsn, indent=4, primitives=True, allow_nan=True)
+        return jsn
 
     def _repr_html(self):
         """Represent this element as HTML
@@ -284,7 +449,7 @@ class NamedCompositeElement(BaseElement, abc.ABC):
             elem_repr[title] = [elem._repr_html() for elem in elements]
 
         template = _html_env.get_template(self._html_template)
-        return template.render(data=self.__dict__, elements_dict=elem_repr)
+        return template.render(data=self._attrs(), elements_dict=elem_repr)
 
     def _repr_latex(self):
         """Represent this element as LaTeX
@@ -300,7 +465,7 @@ class NamedCompositeElement(BaseElement, abc.ABC):
             elem_repr[title] = [elem._repr_latex() for elem in elements]
 
         template = _latex_env.get_template(self._latex_template)
-        return template.render(data=self.__dict__, elements_dict=elem_repr)
+        return template.render(data=self._attrs(), elements_dict=elem_repr)
 
 
 class Page(CompositeElement):
@@ -383,8 +548,9 @@ class Page(CompositeElement):
         """
         template = _html_env.get_template(self._html_template)
         elem_repr = [elem._repr_html() for elem in self.elements]
-        rendered_html = template.render(data=self.__dict__, elements=elem_repr)
+        rendered_html = template.render(data=self._attrs(), elements=elem_repr)
         if self._ref_list is not None:
+            from livvkit.util import bib
             rendered_html += bib.bib2html(self._ref_list)
 
         return rendered_html
@@ -400,11 +566,12 @@ class Page(CompositeElement):
         """
         template = _latex_env.get_template(self._latex_template)
         elem_repr = [elem._repr_latex() for elem in self.elements]
-        rendered_tex = template.render(data=self.__dict__, elements=elem_repr)
+        rendered_tex = template.render(data=self._attrs(), elements=elem_repr)
 
         # FIXME: This is hacky! We're cheating the livvkit.util.bib.bib2html
         #  functionality to actually return latex... See the LatexBackend class
         if self._ref_list is not None:
+            from livvkit.util import bib
             rendered_tex += bib.bib2html(self._ref_list, backend=bib.LatexBackend())
 
         return rendered_tex
@@ -418,6 +585,7 @@ class Tabs(NamedCompositeElement):
     generation of other (experimental!) Report types (e.g., LaTeX), where the
     "tabs" meaning might be better interpreted as a "subsection".
     """
+    __slots__ = ()
     _html_template = 'tabs.html'
     _latex_template = 'tabs.tex'
 
@@ -440,6 +608,7 @@ class Section(CompositeElement):
     (experimental!) Report types (e.g., LaTeX), where the "section" meaning might
     be better interpreted as a "subsection".
     """
+    __slots__ = ('title',)
     _html_template = 'section.html'
     _latex_template = 'section.tex'
 
@@ -458,11 +627,25 @@ class Table(BaseElement):
     """A LIVVkit Table element
 
     The Table element will produce a table in the analysis report.
+
+    Large tables can write their columns to sidecar files (see
+    ``livvkit.util.sidecar``) instead of expanding them into the report's JSON
+    and HTML: numeric columns are written as binary arrays, and the others as
+    chunks of rows. The browser will then fetch the columns and only draw the
+    rows scrolled into view. The analyses LIVVkit runs write the large tables
+    of their (JSON) report pages to sidecars by default (see ``sidecar_tables``).
     """
     _html_template = 'table.html'
     _latex_template = 'table.tex'
 
-    def __init__(self, title, data, index=False, transpose=False):
+    # The minimum number of rows for which the columns are written to sidecars
+    sidecar_min_rows = 1000
+    # The sidecar directory of the tables not given one (see ``sidecar_tables``)
+    default_sidecar_dir = None
+    # The number of rows in each chunk of a non-numeric sidecar column
+    sidecar_chunk_rows = 500
+
+    def __init__(self, title, data, index=False, transpose=False, sidecar_dir=None, relative_to=None):
         """Initialize a Section element
 
                 Args:
@@ -480,11 +663,19 @@ class Table(BaseElement):
                         will be used to label the rows.
                     transpose: A boolean (default: False) which will flip the
                         table (headers become the index, index becomes the header).
+                    sidecar_dir: If the table has at least ``Table.sidecar_min_rows``
+                        rows, write the columns to sidecar files in this directory
+                        (default: None, ``Table.default_sidecar_dir`` if set,
+                        otherwise no sidecars). Note: this should resolve to a
+                        path inside the report output directory
+                    relative_to: Make the sidecar paths relative to this directory.
+                        By default, the sidecar directory is assumed to be a
+                        subdirectory of the page the table is displayed on.
                 """
         super(Table, self).__init__()
         self.title = title
 
-        if isinstance(data, pd.DataFrame):
+        if _is_dataframe(data):
             self.data = data.to_dict(orient='list')
             self.index = data.index.to_list()
         else:
@@ -505,6 +696,48 @@ class Table(BaseElement):
             self._html_template = 'table_transposed.html'
             self._latex_template = 'table_transposed.tex'
 
+        self._columns = {}
+        if sidecar_dir is None:
+            sidecar_dir = self.default_sidecar_dir
+        if sidecar_dir is not None and self.rows >= self.sidecar_min_rows:
+            self._write_sidecars(sidecar_dir, relative_to)
+
+    def _write_sidecars(self, sidecar_dir, relative_to):
+        """Replace the columns with pointers to binary, or chunked JSON, sidecar files"""
+        data = {}
+        for column, values in self.data.items():
+            array = np.asarray(values)
+            pointer = sidecar.write_array(array, sidecar_dir, relative_to)
+            if pointer is None:
+                values = list(values)
+                pointer = sidecar.write_chunks(values, sidecar_dir, relative_to,
+                                               chunk_rows=self.sidecar_chunk_rows)
+                array = values
+            data[column] = pointer
+            self._columns[column] = array
+
+        self.data = data
+        self._html_template = 'table_sidecar.html'
+
+    def _full_data(self):
+        """The table data, with any sidecar columns in full"""
+        if not self._columns:
+            return self.data
+        return {column: self._columns.get(column, values) for column, values in self.data.items()}
+
+    def _to_dict(self):
+        """Represent this element as a dictionary
+
+        Return the plain-Python (dictionary) representation of this element.
+        Sidecar columns are represented by their sidecar pointers.
+
+        Returns:
+            dict: The dictionary representation of this element
+        """
+        jsn = super(Table, self)._to_dict()
+        del jsn[type(self).__name__]['_columns']
+        return jsn
+
     def _repr_html(self):
         """Represent this element as HTML
 
@@ -515,7 +748,19 @@ class Table(BaseElement):
             str: The HTML representation of this element
         """
         template = _html_env.get_template(self._html_template)
-        return template.render(data=self.__dict__, rows=self.rows, index=self.index)
+        if self._columns:
+            # NOTE: the browser draws the table from the sidecars as it scrolls into view
+            if isinstance(self.index, range):
+                index = 'numbered'
+            else:
+                index = None if self.index is None else _finite_or_none(list(self.index))
+            table_json = json_tricks.dumps(
+                    {'data': self.data, 'index': index, 'rows': self.rows,
+                     'transpose': self._latex_template == 'table_transposed.tex'},
+                    primitives=True).replace('</', '<\\/')
+            return template.render(data=self._attrs(), rows=self.rows, index=self.index,
+                                   table_json=table_json)
+        return template.render(data=self._attrs(), rows=self.rows, index=self.index)
 
     def _repr_latex(self):
         """Represent this element as LaTeX
@@ -527,7 +772,29 @@ class Table(BaseElement):
             str: The LaTeX representation of this element
         """
         template = _latex_env.get_template(self._latex_template)
-        return template.render(data=self.__dict__, rows=self.rows, index=self.index)
+        data = dict(self._attrs(), data=self._full_data())
+        return template.render(data=data, rows=self.rows, index=self.index)
+
+
+@contextlib.contextmanager
+def sidecar_tables(sidecar_dir):
+    """Write the large tables created in this context to sidecars by default
+
+    Sets ``Table.default_sidecar_dir``, so the large tables an analysis (or a
+    LIVVkit extension) creates have their columns written to sidecar files,
+    without passing a ``sidecar_dir`` to each Table.
+
+    Args:
+        sidecar_dir: The sidecar directory, which should be a subdirectory of
+            the directory of the page the tables are displayed on; if None,
+            tables aren't written to sidecars by default
+    """
+    previous = Table.default_sidecar_dir
+    Table.default_sidecar_dir = sidecar_dir
+    try:
+        yield
+    finally:
+        Table.default_sidecar_dir = previous
 
 
 class BitForBit(CompositeElement):
@@ -537,6 +804,7 @@ class BitForBit(CompositeElement):
     bit-for-bit statuses with a difference image shown in the final column of
     the table.
     """
+    __slots__ = ('title', 'data', 'rows')
     _html_template = 'bit4bit.html'
     _latex_template = 'bit4bit.tex'
 
@@ -558,7 +826,7 @@ class BitForBit(CompositeElement):
         super(BitForBit, self).__init__(imgs)
         self.title = title
 
-        if isinstance(data, pd.DataFrame):
+        if _is_dataframe(data):
             self.data = data.to_dict(orient='list')
         else:
             self.data = data
@@ -579,7 +847,7 @@ class BitForBit(CompositeElement):
         """
         imgs_repr = [img._repr_html() for img in self.elements]
         template = _html_env.get_template(self._html_template)
-        return template.render(data=self.__dict__, rows=self.rows, b4b_imgs=imgs_repr)
+        return template.render(data=self._attrs(), rows=self.rows, b4b_imgs=imgs_repr)
 
     def _repr_latex(self):
         """Represent this element as LaTeX
@@ -592,7 +860,7 @@ class BitForBit(CompositeElement):
         """
         imgs_repr = [img._repr_latex() for img in self.elements]
         template = _latex_env.get_template(self._latex_template)
-        return template.render(data=self.__dict__, rows=self.rows, b4b_imgs=imgs_repr)
+        return template.render(data=self._attrs(), rows=self.rows, b4b_imgs=imgs_repr)
 
 
 class Gallery(CompositeElement):
@@ -603,6 +871,7 @@ class Gallery(CompositeElement):
     (experimental!) Report types (e.g., LaTeX), where the "Gallery" meaning
     might be better interpreted as a figure "subsection".
     """
+    __slots__ = ('title',)
     _html_template = 'gallery.html'
     _latex_template = 'gallery.tex'
 
@@ -623,8 +892,10 @@ class Image(BaseElement):
 
     The Image element produces an image/figure in the report.
     """
+    __slots__ = ('title', 'desc', 'path', 'name', 'group', 'height')
     _html_template = 'image.html'
     _latex_template = 'image.tex'
+    _memoize = True
 
     def __init__(self, title, desc, image_file, group=None, height=None, relative_to=None):
         """Initialize a Section element
@@ -656,18 +927,38 @@ class Image(BaseElement):
         self.height = height
 
     def _repr_latex(self):
-        template = _latex_env.get_template(self._latex_template)
-        data = self.__dict__
+        data = self._attrs()
         data['path'] = self.path.lstrip('/')
-        return template.render(data=data)
+        return _render_memoized(_latex_env, self._latex_template, tuple(sorted(data.items())))
 
 
-class B4BImage(Image):
+class _PlaceholderImage(Image):
+    """An abstract dummy Image element
+
+    Dummy images are identical apart from their title and description, and a
+    large report may contain tens of thousands of them, so they only store
+    their attributes in ``__slots__``, and their rendered HTML (LaTeX) is
+    shared (see ``BaseElement._memoize``).
+    """
+    __slots__ = ()
+
+    def _placeholder_init(self, title, description, image_name, page_path):
+        """Initialize a placeholder displaying one of LIVVkit's images"""
+        image_file = os.path.join(livvkit.output_dir, 'imgs', image_name)
+        super(_PlaceholderImage, self).__init__(title, description,
+                                                image_file=image_file,
+                                                relative_to=page_path,
+                                                height=50, group=os.path.splitext(image_name)[0])
+
+
+class B4BImage(_PlaceholderImage):
     """A B4BImage element
 
     A dummy Image that can be used by the BitForBit element indicating a
     bit-for-bit verification result.
     """
+    __slots__ = ()
+
     def __init__(self, title, description, page_path):
         """Initialize a dummy B4BImage element
 
@@ -678,19 +969,16 @@ class B4BImage(Image):
             page_path: The path to the page on which the dummy image will be
                 displayed
         """
-        image_file = os.path.join(livvkit.output_dir, 'imgs', 'b4b.png')
+        self._placeholder_init(title, description, 'b4b.png', page_path)
 
-        super(B4BImage, self).__init__(title, description,
-                                       image_file=image_file,
-                                       relative_to=page_path,
-                                       height=50, group='b4b')
 
-
-class NAImage(Image):
+class NAImage(_PlaceholderImage):
     """A NAImage element
 
     A dummy Image that can be used to indicate a missing image
     """
+    __slots__ = ()
+
     def __init__(self, title, description, page_path):
         """Initialize a dummy NAImage element
 
@@ -701,12 +989,7 @@ class NAImage(Image):
             page_path: The path to the page on which the dummy image will be
                 displayed
         """
-        image_file = os.path.join(livvkit.output_dir, 'imgs', 'na.png')
-
-        super(NAImage, self).__init__(title, description,
-                                      image_file=image_file,
-                                      relative_to=page_path,
-                                      height=50, group='na')
+        self._placeholder_init(title, description, 'na.png', page_path)
 
 
 class FileDiff(BaseElement):
@@ -715,10 +998,14 @@ class FileDiff(BaseElement):
     The FilleDiff element will compare two text files and produce a git-diff
     style diff of the files.
     """
+    __slots__ = ('title', 'from_file', 'to_file', 'diff', 'diff_status', 'digest', 'lines')
     _html_template = 'diff.html'
     _latex_template = 'diff.tex'
 
-    def __init__(self, title, from_file, to_file, context=3):
+    # NOTE: files larger than this (in bytes) are compared by their digests only
+    max_size = 10 * 2**20
+
+    def __init__(self, title, from_file, to_file, context=3, max_size=None):
         """Initialize a FileDiff element
 
         Args:
@@ -727,42 +1014,63 @@ class FileDiff(BaseElement):
             to_file: A path to the file which which to compare
             context: An positive int indicating the number of lines of context
                 to display on either side of each difference found
+            max_size: The size (in bytes) of the largest file which will be
+                diffed line-by-line. By default, ``FileDiff.max_size``.
         """
         super(FileDiff, self).__init__()
         self.title = title
         self.from_file = from_file
         self.to_file = to_file
-        self.diff, self.diff_status = self.diff_files(context=context)
+        self.digest = None
+        self.lines = None
+        self.diff, self.diff_status = self.diff_files(context=context, max_size=max_size)
 
-    def diff_files(self, context=3):
+    def diff_files(self, context=3, max_size=None):
         """Perform the file diff
 
+        Identical files are found by their digests, without reading them
+        line-by-line, and are only summarized by their digest and number of
+        lines (``self.digest`` and ``self.lines``).
+
         Args:
             context: An positive int indicating the number of lines of context
                 to display on either side of each difference found
+            max_size: The size (in bytes) of the largest file which will be
+                diffed line-by-line. By default, ``FileDiff.max_size``.
 
         Returns:
             (tuple): Tuple containing:
-                difference: A str containing either a git-style diff of the
-                    files if a difference was found or the original file in
-                    full
+                difference: A list of the lines of a git-style diff of the
+                    files if a difference was found, or an empty list
                 diff_status: A boolean indicating whether any differences were
                     found
         """
+        from_digest, from_count = textdiff.digest_file(self.from_file)
+        to_digest, _ = textdiff.digest_file(self.to_file)
+        if from_digest == to_digest:
+            self.digest, self.lines = from_digest, from_count
+            return [], False
+
+        if max_size is None:
+            max_size = self.max_size
+        sizes = (os.path.getsize(self.from_file), os.path.getsize(self.to_file))
+        if max_size is not None and max(sizes) > max_size:
+            return ['Files differ, but are too large to compare line-by-line '
+                    '({} and {} bytes; the limit is {} bytes)'.format(*sizes, max_size)], True
+
         with open(self.from_file) as from_, open(self.to_file) as to_:
             fromlines = from_.read().splitlines()
             tolines = to_.read().splitlines()
 
-            if context is None:
-                context = max(len(fromlines), len(tolines))
+        if context is None:
+            context = max(len(fromlines), len(tolines))
 
-            diff = list(difflib.unified_diff(fromlines, tolines,
-                                             n=context,  lineterm=''))
-            diff_status = True
-            if not diff:
-                diff_status = False
-                diff = fromlines
-            return diff, diff_status
+        diff = list(textdiff.unified_diff(fromlines, tolines, n=context, lineterm=''))
+        if not diff:
+            # NOTE: e.g., the files only differ by their line endings
+            self.digest, self.lines = from_digest, len(fromlines)
+            return [], False
+        return diff, True
 
 
 class Error(BaseElement):
@@ -770,6 +1078,7 @@ class Error(BaseElement):
 
     The Error element will produce an error message in the analysis report.
     """
+    __slots__ = ('title', 'message')
     _html_template = 'err.html'
     _latex_template = 'err.tex'
 
@@ -794,6 +1103,7 @@ class RawHTML(BaseElement):
     experimental report types (e.g., LaTeX) the contained HTML will be written to
     report in a code display block or as a raw string.
     """
+    __slots__ = ('html',)
     _html_template = 'raw.html'
     _latex_template = 'raw.tex'
 
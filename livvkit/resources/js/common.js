@@ -33,13 +33,53 @@
  * When the page is loaded, do some stuff
  */
 $(document).ready(function() {
-    drawNav();
-    drawContent();
+    // NOTE: static reports have their content (and navigation) rendered in the page
+    if (typeof staticReport !== "undefined" && staticReport) {
+        $("#tabs").tabs();
+        drawCaptions();
+        drawSidecarTables();
+    } else {
+        drawProgress();
+        drawNav();
+        drawContent();
+    }
 });
 
-$(window).load(function() {
-    $('img.caption').captionjs();
-});
+
+/**
+ * The number of milliseconds between polls of the progress of a running analysis
+ */
+var progressInterval = 2000;
+
+
+/**
+ * Draws the progress of a running analysis at the top of the navigation sidebar,
+ * by polling the progress.json file until the run is done.
+ */
+function drawProgress() {
+    var getUrl = window.location.href.substr(0,window.location.href.lastIndexOf('/')+1);
+    var div = $("<div id='progress'></div>");
+    $("#nav").prepend(div);
+    var poll = function() {
+        loadJSON(getUrl + indexPath + '/progress.json').then(function(progress) {
+            if (progress["done"]) {
+                div.remove();
+                return;
+            }
+            var html = "<p>" + progress["completed"] + "/" + progress["total"] + " tasks done (" +
+                       progress["failed"] + " failed, " + progress["running"] + " running)</br>" +
+                       progress["netcdf_mb_per_s"] + " MB/s NetCDF, " + progress["plots_per_s"] + " plots/s";
+            if (progress["eta"] !== null) {
+                html += "</br>ETA " + Math.round(progress["eta"]) + " s";
+            }
+            div.html(html + "</p>");
+            setTimeout(poll, progressInterval);
+        }, function() {
+            div.remove();
+        });
+    };
+    poll();
+}
 
 
 /**
@@ -48,22 +88,25 @@ $(window).load(function() {
  */
 function drawNav() {
     // Get the dataset, to do so the html page must have the `indexPath` variable defined
-    var html = "";
     var getUrl = window.location.href.substr(0,window.location.href.lastIndexOf('/')+1);
-    var data = loadJSON(getUrl + indexPath + '/index.json');
-    data = data["Page"];
-    // Go through each category: numerics, verification, performance, and validation
-    for (var el_idx in data["elements"]) {
-        if (data["elements"][el_idx] != null && Object.keys(data["elements"][el_idx]["Table"]["data"]).length > 0) {
-            html += "<h3>" + data["elements"][el_idx]["Table"]["title"] + "</h3>\n";
-            var testList = Array.from(new Set( data["elements"][el_idx]["Table"]["index"])).sort();
-            for (var idx in testList) {
-                html += "<a href=" + indexPath + "/" + data["elements"][el_idx]["Table"]["title"].toLowerCase() +
-                        "/" + testList[idx] + ".html>" + testList[idx] + "</a></br>";
+    return loadJSON(getUrl + indexPath + '/index.json').then(function(data) {
+        var html = "";
+        data = data["Page"];
+        // Go through each category: numerics, verification, performance, and validation
+        for (var el_idx in data["elements"]) {
+            // NOTE: analyses which failed are listed as Error elements, without any pages
+            if (data["elements"][el_idx] != null && "Table" in data["elements"][el_idx] &&
+                    Object.keys(data["elements"][el_idx]["Table"]["data"]).length > 0) {
+                html += "<h3>" + data["elements"][el_idx]["Table"]["title"] + "</h3>\n";
+                var testList = Array.from(new Set( data["elements"][el_idx]["Table"]["index"])).sort();
+                for (var idx in testList) {
+                    html += "<a href=" + indexPath + "/" + data["elements"][el_idx]["Table"]["title"].toLowerCase() +
+                            "/" + testList[idx] + ".html>" + testList[idx] + "</a></br>";
+                }
             }
         }
-    }
-    $("#nav").append(html);
+        $("#nav").append(html);
+    });
 }
 
 
@@ -79,26 +122,305 @@ function drawContent() {
     if (html_file === "") {
         html_file = "index";
     }
-    var data = loadJSON('./' + html_file + ".json");
-    var html = data["Page"]["Data"];
-    $("#content").append(html);
-    $("#tabs").tabs();
+    return loadJSON('./' + html_file + ".json").then(function(data) {
+        var html = data["Page"]["Data"];
+        $("#content").append(html);
+        $("#tabs").tabs();
+        drawCaptions();
+        drawSidecarTables();
+    });
 }
 
+
 /**
- * Load a json file into a variable
+ * Add the captions to the images once they are loaded, which, because images
+ * are loaded lazily, may not be until they are scrolled into view.
  */
-function loadJSON(path) {
-    var data;
-    $.ajax({
-        'async': false,
-        'global': false,
-        'url': path,
-        'dataType': "json",
-        'success': function(json) {
-            data = json;
+function drawCaptions() {
+    $("img.caption").each(function() {
+        if (this.complete && this.naturalWidth > 0) {
+            $(this).captionjs();
+        } else {
+            $(this).one("load", function() {
+                $(this).captionjs();
+            });
+        }
+    });
+}
+
+
+/**
+ * TypedArray constructors for each of the dtypes stored in binary sidecar files
+ */
+var typedArrays = {
+    "int8": Int8Array, "uint8": Uint8Array, "int16": Int16Array, "uint16": Uint16Array,
+    "int32": Int32Array, "uint32": Uint32Array, "float32": Float32Array, "float64": Float64Array
+};
+
+/**
+ * The number of table rows drawn above and below the rows in view of a sidecar table
+ */
+var tableOverscanRows = 50;
+
+
+/**
+ * Draws the tables whose columns were written to sidecar files. Binary columns
+ * are fetched in full, but only the rows in view are drawn; the rows (and the
+ * chunks of the JSON columns they need) are replaced as the table is scrolled.
+ */
+function drawSidecarTables() {
+    $(".sidecar-table").each(function() {
+        var div = $(this);
+        var table = JSON.parse(div.children("script.sidecar-data").text());
+        table["chunks"] = {};
+
+        var loads = Object.keys(table["data"]).map(function(column) {
+            var pointer = table["data"][column];
+            if (pointer !== null && typeof pointer === "object" && "sidecar" in pointer) {
+                return loadSidecar(pointer).then(function(array) {
+                    table["data"][column] = array;
+                });
+            }
+            return Promise.resolve();
+        });
+
+        Promise.all(loads).then(function() {
+            if (table["transpose"]) {
+                return loadRows(table, 0, table["rows"]).then(function() {
+                    drawTransposedTable(div, table);
+                });
+            }
+            drawTable(div, table);
+        });
+    });
+}
+
+
+/**
+ * Fetch a binary sidecar file as an ArrayBuffer, and resolve it as a TypedArray.
+ * Note: sidecars are little-endian, like every browser platform.
+ */
+function loadSidecar(pointer) {
+    return new Promise(function(resolve, reject) {
+        var request = new XMLHttpRequest();
+        request.open("GET", pointer["sidecar"], true);
+        request.responseType = "arraybuffer";
+        request.onload = function() {
+            resolve(new typedArrays[pointer["dtype"]](request.response, 0, pointer["length"]));
+        };
+        request.onerror = reject;
+        request.send();
+    });
+}
+
+
+/**
+ * Load the chunks of the JSON sidecar columns needed to draw rows [start, stop)
+ */
+function loadRows(table, start, stop) {
+    var loads = [];
+    Object.keys(table["data"]).forEach(function(column) {
+        var pointer = table["data"][column];
+        if (pointer === null || typeof pointer !== "object" || !("chunks" in pointer)) {
+            return;
+        }
+        var chunks = table["chunks"][column] = table["chunks"][column] || {};
+        var last = Math.min(Math.ceil(stop / pointer["chunk_rows"]), pointer["count"]);
+        for (var k = Math.floor(start / pointer["chunk_rows"]); k < last; k++) {
+            if (!(k in chunks)) {
+                chunks[k] = loadChunk(chunks, pointer, k);
+            }
+            loads.push(chunks[k]);
+        }
+    });
+    return Promise.all(loads);
+}
+
+
+/**
+ * Load a chunk of a JSON sidecar column; the promise is replaced by the chunk's values once loaded
+ */
+function loadChunk(chunks, pointer, k) {
+    return loadJSON(pointer["chunks"] + "." + k + ".json").then(function(values) {
+        chunks[k] = values;
+    });
+}
+
+
+/**
+ * Get a table value from its column, which was either fetched in full or in (loaded) chunks
+ */
+function tableValue(table, column, row) {
+    var values = table["data"][column];
+    if (values !== null && typeof values === "object" && "chunks" in values) {
+        return table["chunks"][column][Math.floor(row / values["chunk_rows"])][row % values["chunk_rows"]];
+    }
+    return values[row];
+}
+
+
+/**
+ * Get a table index label
+ */
+function tableIndex(table, row) {
+    return table["index"] === "numbered" ? row : table["index"][row];
+}
+
+
+/**
+ * Escape a value for display in HTML
+ */
+function escapeHTML(value) {
+    return String(value).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;")
+                        .replace(/"/g, "&quot;").replace(/'/g, "&#39;");
+}
+
+
+/**
+ * Draw a table cell
+ */
+function tableCell(tag, value) {
+    return "<" + tag + ">" + (value === null ? "None" : escapeHTML(value)) + "</" + tag + ">";
+}
+
+
+/**
+ * Draw the table rows [start, stop)
+ */
+function tableRows(table, columns, start, stop) {
+    var html = [];
+    for (var row = start; row < stop; row++) {
+        var tr = "<tr>" + (table["index"] !== null ? tableCell("th", tableIndex(table, row)) : "");
+        for (var col = 0; col < columns.length; col++) {
+            tr += tableCell("td", tableValue(table, columns[col], row));
         }
+        html.push(tr + "</tr>");
+    }
+    return html.join("\n");
+}
+
+
+/**
+ * Draw an empty table row of a height (in pixels), which stands in for the rows not drawn
+ */
+function tableSpacer(columns, height) {
+    return height > 0 ? "<tr class='table-spacer' style='height: " + height + "px'>" +
+                        "<td colspan='" + (columns.length + 1) + "'></td></tr>" : "";
+}
+
+
+/**
+ * Call a function once an element is (first) displayed, e.g. once its tab is shown
+ */
+function whenVisible(element, callback) {
+    if (!("IntersectionObserver" in window)) {
+        callback();
+        return;
+    }
+    var observer = new IntersectionObserver(function(entries) {
+        if (entries.some(function(entry) { return entry.isIntersecting; })) {
+            observer.disconnect();
+            callback();
+        }
+    });
+    observer.observe(element);
+}
+
+
+/**
+ * Draw a sidecar table into its (placeholder) table element, in a scrolling
+ * viewport. Only the rows in view (and a margin of tableOverscanRows rows) are
+ * drawn, between spacer rows standing in for the others, and they are
+ * redrawn as the viewport is scrolled. Note: the rows are assumed to be of
+ * the same height, the height of the first row.
+ */
+function drawTable(div, table) {
+    var columns = Object.keys(table["data"]);
+    var header = "<tr>" + (table["index"] !== null ? "<th>&nbsp;</th>" : "");
+    for (var col = 0; col < columns.length; col++) {
+        header += tableCell("th", columns[col]);
+    }
+    var tableElement = div.children("table");
+    tableElement.html("<thead>" + header + "</tr></thead><tbody></tbody>");
+    tableElement.wrap("<div class='table-viewport'></div>");
+    var viewport = tableElement.parent();
+    var body = tableElement.children("tbody");
+
+    var rowHeight = 0;
+    var drawn = null;
+    var draw = function() {
+        var top = viewport.scrollTop();
+        var start = Math.max(Math.floor(top / rowHeight) - tableOverscanRows, 0);
+        var stop = Math.min(Math.ceil((top + viewport.height()) / rowHeight) + tableOverscanRows,
+                            table["rows"]);
+        if (drawn !== null && drawn[0] === start && drawn[1] === stop) {
+            return;
+        }
+        drawn = [start, stop];
+        loadRows(table, start, stop).then(function() {
+            // NOTE: the viewport may have been scrolled further while the rows loaded
+            if (drawn[0] === start && drawn[1] === stop) {
+                body.html(tableSpacer(columns, start * rowHeight) +
+                          tableRows(table, columns, start, stop) +
+                          tableSpacer(columns, (table["rows"] - stop) * rowHeight));
+            }
+        });
+    };
+
+    whenVisible(viewport[0], function() {
+        loadRows(table, 0, 1).then(function() {
+            body.html(tableRows(table, columns, 0, 1));
+            rowHeight = body.children("tr").first().outerHeight() || 20;
+            draw();
+            var scheduled = false;
+            viewport.on("scroll", function() {
+                if (!scheduled) {
+                    scheduled = true;
+                    window.requestAnimationFrame(function() {
+                        scheduled = false;
+                        draw();
+                    });
+                }
+            });
+        });
     });
-    return data;
 }
 
+
+/**
+ * Draw a transposed sidecar table (one table row per column) in full
+ */
+function drawTransposedTable(div, table) {
+    var columns = Object.keys(table["data"]);
+    var html = [];
+    var row, tr;
+    if (table["index"] !== null) {
+        tr = "<tr><th>&nbsp;</th>";
+        for (row = 0; row < table["rows"]; row++) {
+            tr += tableCell("th", tableIndex(table, row));
+        }
+        html.push(tr + "</tr>");
+    }
+    for (var col = 0; col < columns.length; col++) {
+        tr = "<tr>" + tableCell("th", columns[col]);
+        for (row = 0; row < table["rows"]; row++) {
+            tr += tableCell("td", tableValue(table, columns[col], row));
+        }
+        html.push(tr + "</tr>");
+    }
+    div.children("table").html(html.join("\n"));
+}
+
+
+/**
+ * Load a json file asynchronously
+ *
+ * Returns a Promise of the json data
+ */
+function loadJSON(path) {
+    return Promise.resolve($.ajax({
+        'global': false,
+        'url': path,
+        'dataType': "json"
+    }));
+}
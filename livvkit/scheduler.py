@@ -32,31 +32,173 @@ Provides functions for scheduling the runs of tests.
 """
 
 import os
-import sys
+import time
+import logging
+import threading
+import warnings
+import importlib
 import multiprocessing as mp
-
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor, FIRST_COMPLETED, wait
+from multiprocessing.connection import wait as wait_for_processes
 
 import livvkit
 from livvkit import elements
+from livvkit.util import logs
+from livvkit.util import progress
+from livvkit.util import profiling
+from livvkit.util import memory
+from livvkit.util import journal
 
+# The LIVVkit globals (set by the options module) which are passed on to the
+# worker processes, as they aren't inherited by spawned (or forkserver) workers
+WORKER_GLOBALS = ['cwd', 'timestamp', 'comment', 'output_dir', 'index_dir',
+                  'previous_output_dir', 'model_dir', 'bench_dir', 'model_bundle',
+                  'bench_bundle', 'numerics_model_config', 'verification_model_config',
+                  'performance_model_config', 'validation_model_configs', 'verify',
+                  'validate', 'pool_size', 'start_method', 'compact_json', 'report_format',
+                  'profile', 'track_memory', 'memory_budget']
 
-def pool_worker(run_type, run_suite, test, config):
-    sys.stdout = open(
-        os.path.join(livvkit.index_dir, 'logs', '{}-{}.stdout'.format(run_type, test)),
-        'a',
-    )
-    sys.stderr = open(
-        os.path.join(livvkit.index_dir, 'logs', '{}-{}.stderr'.format(run_type, test)),
-        'a',
-    )
+# The LIVVkit globals which hold (bundle) modules, which are passed on by name
+WORKER_MODULES = ['numerics_model_module', 'verification_model_module',
+                  'performance_model_module']
 
-    summary = run_suite(test, config)
+# The slow to import modules needed by (most) analyses, which are imported
+# once, when a worker starts, or by the forkserver, so that workers forked
+# from it start with them already imported
+WARM_IMPORTS = ['numpy', 'pandas', 'matplotlib.pyplot', 'netCDF4', 'livvkit.elements',
+                'livvkit.components.numerics', 'livvkit.components.verification',
+                'livvkit.components.performance', 'livvkit.components.validation']
 
-    sys.stdout.flush()
-    sys.stderr.flush()
+# Whether this process is a worker process (see ``init_worker``)
+_in_worker = False
 
-    return summary
+# The semaphore counting the free process slots of the worker pool, shared by
+# its workers (see ``pool_map``)
+_process_slots = None
+
+# The statuses of the tasks run by run_tasks
+DONE = 'done'
+FAILED = 'failed'
+TIMED_OUT = 'timed out'
+CRASHED = 'crashed'
+CANCELLED = 'cancelled'
+
+# The number of seconds between checks for tasks which have timed out
+POLL_INTERVAL = 1.0
+
+
+def _warm_imports():
+    for module in WARM_IMPORTS:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def _worker_state(process_slots):
+    """ The state of the main process which the worker processes need """
+    state = {name: getattr(livvkit, name, None) for name in WORKER_GLOBALS}
+    state['process_slots'] = process_slots
+    state['nested'] = _in_worker
+    for name in WORKER_MODULES:
+        module = getattr(livvkit, name, None)
+        state[name] = module.__name__ if module is not None else None
+    state['warnings'] = list(warnings.filters)
+    state['log_queue'] = logs.queue()
+    state['log_tags'] = logs.tags()
+    return state
+
+
+def init_worker(state):
+    """
+    Initialize a worker process: restore the LIVVkit globals, send its log
+    records to the main process, set up plotting to files, and import the
+    modules the analyses need.
+
+    Args:
+        state: The state of the main process, from ``_worker_state``
+    """
+    global _in_worker, _process_slots
+    _in_worker = True
+    _process_slots = state['process_slots']
+    for name in WORKER_GLOBALS:
+        setattr(livvkit, name, state[name])
+    for name in WORKER_MODULES:
+        module = state[name]
+        setattr(livvkit, name, importlib.import_module(module) if module is not None else None)
+    warnings.filters[:] = state['warnings']
+    logs.init_worker(state['log_queue'])
+    logs.set_tags(**state['log_tags'])
+
+    os.environ['MPLBACKEND'] = 'agg'
+    _warm_imports()
+
+    if state['nested']:
+        # NOTE: the workers of an analysis' own pool (see ``pool_map``) wait on
+        #       their call queue forever if the analysis' worker is terminated
+        #       (e.g., it timed out), so they exit once their parent has
+        threading.Thread(target=_exit_with_parent, daemon=True).start()
+
+
+def _exit_with_parent():
+    wait_for_processes([mp.parent_process().sentinel])
+    os._exit(1)
+
+
+def _executor(max_workers):
+    """
+    Create a process pool executor whose workers are started with the
+    ``livvkit.start_method`` and initialized by ``init_worker``. The pool of a
+    worker process (see ``pool_map``) shares the process slots of its pool,
+    otherwise the pool has a slot for each of its workers.
+
+    Args:
+        max_workers: The number of worker processes
+
+    Returns:
+        A ProcessPoolExecutor
+    """
+    ctx = mp.get_context(livvkit.start_method)
+    if ctx.get_start_method() == 'forkserver':
+        # NOTE: this only has an effect before the server is started
+        ctx.set_forkserver_preload(['livvkit.scheduler'] + WARM_IMPORTS)
+    process_slots = _process_slots if _in_worker else ctx.Semaphore(max_workers)
+    return ProcessPoolExecutor(max_workers, mp_context=ctx, initializer=init_worker,
+                               initargs=(_worker_state(process_slots),))
+
+
+def _slotted(func, *args):
+    """ Run a task in a worker process, holding one of the pool's process slots """
+    with _process_slots:
+        return func(*args)
+
+
+def _sidecar_dir(run_type):
+    """
+    The directory the large tables of an analysis' pages are written to, which
+    is only used for JSON reports, as the browser loads them (see
+    ``livvkit.elements.sidecar_tables``)
+    """
+    if livvkit.report_format != 'json' or livvkit.output_dir is None:
+        return None
+    return os.path.join(livvkit.output_dir, run_type, 'data')
+
+
+def pool_worker(run_type, run_suite, test, config):
+    with logs.capture(run_type, test), memory.tracked(), \
+            elements.sidecar_tables(_sidecar_dir(run_type)):
+        try:
+            summary = progress.tracked(run_suite, test, config)
+        except Exception:
+            logging.getLogger(logs.LOGGER).exception('%s failed', test)
+            raise
+        journal.record(run_type, test, summary)
+        return summary
+
+
+def collect_tests(config):
+    """ Collect the analysis cases (the dictionary entries) of a configuration """
+    return [t for t in config if isinstance(config[t], dict)]
 
 
 def run(run_type, module, config):
@@ -68,6 +210,9 @@ def run(run_type, module, config):
         run_type: A string representation of the run type (eg. verification)
         module: The module corresponding to the run.  Must have a run_suite function
         config: The configuration for the module
+
+    Returns:
+        A list of the summary elements (see ``run_quiet``)
     """
     print(" -----------------------------------------------------------------")
     print("   Beginning " + run_type.lower() + " test suite ")
@@ -81,30 +226,52 @@ def run(run_type, module, config):
     return summary
 
 
+@profiling.timed
 def run_quiet(run_type, module, config, group=True):
-    tests = [t for t in config if isinstance(config[t], dict)]
+    """
+    Run the analyses of a configuration and summarize them. The analyses
+    completed by a resumed run are skipped, and their journaled summaries are
+    used instead (see ``livvkit.util.journal``).
+
+    Args:
+        run_type: A string representation of the run type (eg. verification)
+        module: The module corresponding to the run.  Must have a run_suite function
+        config: The configuration for the module
+        group: If True, the analyses are summarized in a single table,
+            otherwise each analysis is summarized in its own table
+
+    Returns:
+        A list of the summary tables, followed by an Error element for each
+        analysis which failed
+    """
+    tests = collect_tests(config)
+    remaining = [t for t in tests if not journal.completed(run_type, t)]
+    if len(remaining) < len(tests):
+        print('    Skipping {} of {} analyses completed by the previous run'.format(
+            len(tests) - len(remaining), len(tests)))
     if livvkit.pool_size == 0:
-        test_summaries = {}
-        for test in tests:
-            test_summaries[test] = module.run_suite(test, config[test])
+        summaries, failures = run_serial(run_type, remaining, module, config)
     else:
-        test_summaries = launch_processes(run_type, tests, module, config)
+        summaries, failures = launch_processes(run_type, remaining, module, config)
+    logs.flush()
+    test_summaries = {t: summaries[t] if t in summaries else journal.summary(run_type, t)
+                      for t in tests if t in summaries or t not in remaining}
 
-        for t in tests:
-            with open(os.path.join(livvkit.index_dir, 'logs', '{}-{}.stdout'.format(run_type, t))) as log:
-                stdout = log.read()
-            print(stdout)
+    # NOTE: pandas is slow to import, so it's only imported once it's needed
+    import pandas as pd
 
-    if group:
+    summary = []
+    if group and test_summaries:
         meta = module.populate_metadata(tests[0], config[tests[0]])
         df = pd.concat(
             {k: pd.DataFrame.from_dict(v, orient='index') for k, v, in test_summaries.items()},
             names=['case', 'scale']
         ).reset_index()
-        summary = elements.Table(meta['Title'], df.set_index('case'))
-    else:
-        summary = []
-        for ii, t in enumerate(tests):
+        summary.append(elements.Table(meta['Title'], df.set_index('case')))
+    elif not group:
+        for t in tests:
+            if t not in test_summaries:
+                continue
             meta = module.populate_metadata(t, config[t])
             df = pd.DataFrame.from_dict(test_summaries[t], orient='index')
             # Set the index so that navigation in HTML page links correctly
@@ -112,18 +279,236 @@ def run_quiet(run_type, module, config, group=True):
                 df = df.set_index("Case")
             summary.append(elements.Table(meta['Title'], df))
 
+    for t in tests:
+        if t in failures:
+            summary.append(elements.Error('{} {}'.format(run_type.capitalize(), t), failures[t]))
+
     return summary
 
 
+def _failure(exception):
+    return '{}: {}'.format(type(exception).__name__, exception)
+
+
+def run_serial(run_type, tests, run_module, config):
+    """
+    Run the analyses in this process, retrying each failed analysis up to
+    ``livvkit.task_retries`` times.
+
+    Returns:
+        A dictionary of the summaries of the analyses which succeeded, and a
+        dictionary of the reasons the others failed
+    """
+    test_summaries = {}
+    failures = {}
+    for test in tests:
+        for attempt in range(livvkit.task_retries + 1):
+            try:
+                test_summaries[test] = pool_worker(run_type, run_module.run_suite, test, config[test])
+            except Exception as e:
+                failures[test] = _failure(e)
+            else:
+                failures.pop(test, None)
+                break
+    return test_summaries, failures
+
+
 def launch_processes(run_type, tests, run_module, config):
-    """ Helper method to launch processes and sync output """
+    """
+    Helper method to launch processes and sync output.
+
+    Each analysis which fails, runs for longer than ``livvkit.task_timeout``
+    seconds, or is running when a worker process crashes, is retried (in a new
+    pool of workers) up to ``livvkit.task_retries`` times.
+
+    Returns:
+        A dictionary of the summaries of the analyses which succeeded, and a
+        dictionary of the reasons the others failed
+    """
     test_summaries = {}
-    with mp.Pool(livvkit.pool_size) as pool:
-        results = [
-            pool.apply_async(pool_worker, (run_type, run_module.run_suite, t, config[t])) for t in tests
-        ]
+    failures = {}
+    attempts = dict.fromkeys(tests, 0)
+    budget = livvkit.memory_budget * 2**20 if livvkit.memory_budget else None
+    footprints = {t: memory.estimate_footprint(t, config[t]) if budget else 0 for t in tests}
+
+    remaining = list(tests)
+    while remaining:
+        with _executor(livvkit.pool_size) as executor:
+            outcomes = run_tasks(executor,
+                                 [(_slotted, pool_worker, run_type, run_module.run_suite, t, config[t])
+                                  for t in remaining],
+                                 [footprints[t] for t in remaining], budget, livvkit.task_timeout)
+
+        # NOTE: tasks are only cancelled because another task hung or crashed
+        #       the workers, unless none of them could be run at all
+        stalled = all(status == CANCELLED for status, _ in outcomes)
+        retry = []
+        for test, (status, value) in zip(remaining, outcomes):
+            if status == DONE:
+                test_summaries[test] = value
+                failures.pop(test, None)
+                continue
+            if status != CANCELLED or stalled:
+                attempts[test] += 1
+                failures[test] = value or 'The analysis could not be run'
+                print('    {} {} ({} of {} attempts): {}'.format(
+                    test, status, attempts[test], livvkit.task_retries + 1, failures[test]))
+            if attempts[test] <= livvkit.task_retries:
+                retry.append(test)
+        remaining = retry
+
+    return test_summaries, failures
+
+
+def _outcome(future):
+    if future.cancelled():
+        return CANCELLED, None
+    try:
+        return DONE, future.result()
+    except BrokenExecutor:
+        return CRASHED, 'A worker process died unexpectedly while running this analysis ' \
+                        '(e.g., it was killed for running out of memory)'
+    except Exception as e:
+        return FAILED, _failure(e)
+
+
+def _terminate(executor):
+    """ Terminate the worker processes of an executor, and cancel its queued tasks """
+    # NOTE: there is no public way to stop a task once it is running, so the
+    #       (private) worker processes of the executor are terminated
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_tasks(executor, tasks, footprints=None, budget=None, timeout=None):
+    """
+    Run tasks on an executor, optionally within a budget and a time limit.
+
+    When a budget is given, tasks are submitted so that the total footprint of
+    the tasks submitted, but not yet done, stays within it. Tasks are
+    submitted largest first, and smaller tasks are packed around the larger
+    ones; a task larger than the budget is run alone.
+
+    When a timeout is given and a task runs for longer, the executor's
+    workers are terminated, and the tasks which haven't finished are
+    cancelled. A task is timed from when a worker starts running it, which
+    the worker records in a shared (``multiprocessing.Manager``) dictionary;
+    the executor marks tasks waiting in its queue as running too. Likewise,
+    if a worker process crashes, the tasks running on the (now broken)
+    executor have crashed, and the rest are cancelled.
+
+    Args:
+        executor: A concurrent.futures executor
+        tasks: A list of tuples of a function and its positional arguments
+        footprints: The (estimated) footprint of each task
+        budget: The total footprint the running tasks may have, or None
+        timeout: The number of seconds a task may run for, or None
+
+    Returns:
+        A list of the outcome of each task, in the same order as tasks, as a
+        (status, value) tuple. The value of a ``DONE`` task is its result,
+        and otherwise it's the reason the task failed, timed out, or crashed
+        (or None for a ``CANCELLED`` task).
+    """
+    if timeout:
+        with mp.get_context(livvkit.start_method).Manager() as manager:
+            return _run_tasks(executor, tasks, footprints, budget, timeout, manager.dict())
+    return _run_tasks(executor, tasks, footprints, budget)
+
+
+def _started(started, ii, func, *args):
+    """ Record when a task starts running, and run it """
+    started[ii] = time.time()
+    return func(*args)
+
+
+def _run_tasks(executor, tasks, footprints, budget, timeout=None, started=None):
+    footprints = footprints or [0] * len(tasks)
+    outcomes = [(CANCELLED, None)] * len(tasks)
+    pending = sorted(range(len(tasks)), key=lambda ii: footprints[ii], reverse=True)
+    running = {}
+    used = 0
+    while pending or running:
+        for ii in list(pending):
+            if running and budget is not None and used + footprints[ii] > budget:
+                continue
+            task = tasks[ii] if started is None else (_started, started, ii) + tuple(tasks[ii])
+            try:
+                future = executor.submit(*task)
+            except (BrokenExecutor, RuntimeError):
+                # NOTE: the executor is broken or has been shut down
+                pending = []
+                break
+            running[future] = ii
+            used += footprints[ii]
+            pending.remove(ii)
+        if not running:
+            break
+
+        done, _ = wait(running, timeout=POLL_INTERVAL if timeout else None,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            ii = running.pop(future)
+            used -= footprints[ii]
+            outcomes[ii] = _outcome(future)
+
+        if timeout:
+            now = time.time()
+            starts = started.copy()
+            hung = [future for future, ii in running.items()
+                    if ii in starts and now - starts[ii] > timeout]
+            if hung:
+                for future in hung:
+                    outcomes[running.pop(future)] = \
+                        TIMED_OUT, 'The analysis did not finish within {} seconds'.format(timeout)
+                _terminate(executor)
+                break
+
+    return outcomes
+
+
+def pool_map(func, arg_list):
+    """
+    Call a function for each set of arguments using a pool of processes.
+
+    Tasks are run serially if LIVVkit is running serially (pool size of zero),
+    there is only one task, or the calling process is not allowed to start
+    children (e.g., it is a daemonic process).
+
+    Each task run by a worker process holds one of the pool's process slots.
+    A worker process (i.e., an analysis) runs its tasks in a pool of its own
+    using the slots which are free, e.g., those of the workers left idle once
+    there are fewer analyses than workers, and the slot it holds itself; if no
+    slot is free, its tasks are run serially. So the pool size is the total
+    number of processes running tasks. A task waiting for a slot is counted as
+    running by the ``livvkit.task_timeout`` (see ``run_tasks``).
+
+    Args:
+        func: A picklable (module level) function
+        arg_list: A list of tuples of the positional arguments for each call
+
+    Returns:
+        A list of the results of each call, in the same order as arg_list
+    """
+    arg_list = list(arg_list)
+    if not livvkit.pool_size or len(arg_list) < 2 or mp.current_process().daemon:
+        return [func(*args) for args in arg_list]
 
-        for t, r in zip(tests, results):
-            test_summaries[t] = r.get()
+    if not _in_worker:
+        with _executor(min(livvkit.pool_size, len(arg_list))) as executor:
+            futures = [executor.submit(_slotted, func, *args) for args in arg_list]
+            return [f.result() for f in futures]
 
-    return test_summaries
+    borrowed = 0
+    while borrowed < len(arg_list) - 1 and _process_slots.acquire(block=False):
+        borrowed += 1
+    try:
+        if not borrowed:
+            return [func(*args) for args in arg_list]
+        with _executor(borrowed + 1) as executor:
+            futures = [executor.submit(func, *args) for args in arg_list]
+            return [f.result() for f in futures]
+    finally:
+        for _ in range(borrowed):
+            _process_slots.release()
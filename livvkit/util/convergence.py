@@ -0,0 +1,175 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides vectorized error norms and convergence rate estimates for numerical
+verification over a sequence of grid resolutions.
+"""
+
+import numpy as np
+
+
+def error_norms(errors, weights=None):
+    """
+    Compute the L1, L2, and L-infinity norms of several error fields at once.
+
+    Each of the error fields may have a different size (e.g., one per grid
+    resolution), so they are concatenated and reduced as segments of a single
+    array rather than norm-by-norm.
+
+    Args:
+        errors: A list of error arrays (e.g., model - solution), one per field
+        weights: A list of the quadrature weights (e.g., cell areas) for each
+            field; scalars or arrays broadcastable to the error field. If None,
+            every point is given a weight of one.
+
+    Returns:
+        A dictionary with 'L1', 'L2', and 'Linf' keys whose values are arrays
+        of the norm of each error field. NaNs are ignored.
+    """
+    if weights is None:
+        weights = [1.0] * len(errors)
+
+    weights = [np.broadcast_to(np.asarray(w, dtype=float), np.shape(e)).ravel()
+               for w, e in zip(weights, errors)]
+    errors = [np.ma.filled(np.ma.asarray(e, dtype=float), np.nan).ravel() for e in errors]
+
+    sizes = np.array([e.size for e in errors])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    flat = np.abs(np.concatenate(errors))
+    flat_weights = np.concatenate(weights)
+    valid = np.isfinite(flat)
+    flat = np.where(valid, flat, 0.0)
+    flat_weights = np.where(valid, flat_weights, 0.0)
+
+    # NOTE: reduceat doesn't handle empty segments, so we give them one
+    #       (ignored) element and mask the result afterwards.
+    empty = sizes == 0
+    flat = np.append(flat, 0.0)
+    flat_weights = np.append(flat_weights, 0.0)
+    offsets = np.minimum(offsets, flat.size - 1)
+
+    norms = {'L1': np.add.reduceat(flat * flat_weights, offsets),
+             'L2': np.sqrt(np.add.reduceat(flat**2 * flat_weights, offsets)),
+             'Linf': np.maximum.reduceat(flat, offsets)}
+    for norm in norms.values():
+        norm[empty] = np.nan
+    return norms
+
+
+def observed_order(spacing, errors):
+    """
+    Compute the observed order of convergence between successive resolutions.
+
+    For successive grid spacings h_i and h_{i+1} with errors E_i and E_{i+1},
+    the observed order is p = log(E_i/E_{i+1}) / log(h_i/h_{i+1}).
+
+    Args:
+        spacing: A 1D array of the grid spacings, ordered from coarsest to finest
+        errors: An array of the error norms at each spacing. Multiple norms can
+            be handled at once by stacking them along the last axis
+            (shape (len(spacing), n_norms))
+
+    Returns:
+        An array of length len(spacing) - 1 (along the first axis) of the
+        observed orders of convergence
+    """
+    spacing = np.asarray(spacing, dtype=float)
+    errors = np.asarray(errors, dtype=float)
+    if errors.ndim > 1:
+        spacing = spacing.reshape((-1,) + (1,) * (errors.ndim - 1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.diff(np.log(errors), axis=0) / np.diff(np.log(spacing), axis=0)
+
+
+def richardson_extrapolation(spacing, solutions, safety_factor=1.25, max_iter=100, tol=1.0e-6):
+    """
+    Estimate the observed order of accuracy, the Richardson-extrapolated
+    solution, and the grid convergence index (GCI) from three solutions.
+
+    This follows the procedure of Celik et al. (2008), "Procedure for
+    Estimation and Reporting of Uncertainty Due to Discretization in CFD
+    Applications", J. Fluids Eng. 130(7), which allows for non-constant grid
+    refinement ratios by solving for the order iteratively. All quantities are
+    computed point-wise, so the solutions must be on a common set of points.
+
+    Args:
+        spacing: The grid spacings of the three solutions, ordered from
+            coarsest to finest
+        solutions: The three solutions (arrays of the same shape), ordered from
+            coarsest to finest
+        safety_factor: The GCI safety factor; 1.25 is recommended for
+            three-grid studies
+        max_iter: The maximum number of fixed-point iterations used to find
+            the order when the refinement ratio isn't constant
+        tol: The absolute tolerance on the order for the fixed-point iteration
+
+    Returns:
+        A dictionary with the point-wise observed 'order', the 'extrapolated'
+        solution, the fine grid's approximate relative error 'relative_error',
+        and the 'gci_fine' and 'gci_medium' grid convergence indices (as
+        fractions of the fine and medium solutions, respectively). Points
+        where the solutions don't change between grids are NaN.
+    """
+    h3, h2, h1 = np.asarray(spacing, dtype=float)
+    phi3, phi2, phi1 = [np.ma.filled(np.ma.asarray(s, dtype=float), np.nan) for s in solutions]
+    r21 = h2 / h1
+    r32 = h3 / h2
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        eps21 = phi2 - phi1
+        eps32 = phi3 - phi2
+        ratio = eps32 / eps21
+        sign = np.sign(ratio)
+        log_ratio = np.log(np.abs(ratio))
+
+        order = np.abs(log_ratio) / np.log(r21)
+        if not np.isclose(r21, r32):
+            for _ in range(max_iter):
+                q = np.log((r21**order - sign) / (r32**order - sign))
+                new_order = np.abs(log_ratio + q) / np.log(r21)
+                converged = np.all(~(np.abs(new_order - order) > tol))
+                order = new_order
+                if converged:
+                    break
+
+        r21_p = r21**order
+        r32_p = r32**order
+        extrapolated = (r21_p * phi1 - phi2) / (r21_p - 1.0)
+        relative_error = np.abs(eps21 / phi1)
+        gci_fine = safety_factor * relative_error / (r21_p - 1.0)
+        gci_medium = safety_factor * np.abs(eps32 / phi2) / (r32_p - 1.0)
+
+    return {'order': order,
+            'extrapolated': extrapolated,
+            'relative_error': relative_error,
+            'gci_fine': gci_fine,
+            'gci_medium': gci_medium}
@@ -37,9 +37,11 @@ import shutil
 import fnmatch
 from datetime import datetime
 
-import json_tricks
+import jinja2
 
 import livvkit
+from livvkit.util import json_backend
+from livvkit.util import profiling
 
 
 class TempSysPath(object):
@@ -74,6 +76,7 @@ def merge_dicts(dict1, dict2):
     return tmp
 
 
+@profiling.timed
 def parse_gptl(file_path, var_list):
     """
     Read a GPTL timing file and extract some data.
@@ -88,6 +91,7 @@ def parse_gptl(file_path, var_list):
     """
     timing_result = dict()
     if os.path.isfile(file_path):
+        profiling.add_bytes(os.path.getsize(file_path))
         with open(file_path, 'r') as f:
             for var in var_list:
                 for line in f:
@@ -133,11 +137,88 @@ def create_page_from_template(template_file, output_path):
     shutil.copy(os.path.join(livvkit.resource_dir, template_file), output_path)
 
 
+# NOTE: templates are compiled once per process; the report's resources don't
+#       change while LIVVkit is running, so there's no need to check them for updates
+# skipcq: BAN-B701
+_static_env = jinja2.Environment(loader=jinja2.FileSystemLoader(livvkit.resource_dir), auto_reload=False)
+
+
+def write_page(page, run_type, case):
+    """
+    Write out an analysis page in the report format (``livvkit.report_format``).
+
+    For the (default) ``json`` format, the page's JSON is written next to a copy
+    of the run type's HTML template, which loads and displays it. For the
+    ``html`` format, the page is rendered to a static HTML page, and for the
+    ``latex`` format, to a LaTeX file which is included by the report's
+    ``index.tex`` (see ``write_index``).
+
+    Args:
+        page: The LIVVkit Page element to write
+        run_type: The analysis type (e.g., verification), which is also the
+            output subdirectory
+        case: The name of the analysis case, which is the page's file name
+    """
+    page_dir = os.path.join(livvkit.output_dir, run_type)
+    mkdir_p(page_dir)
+    if livvkit.report_format == 'html':
+        with open(os.path.join(page_dir, case + '.html'), 'w', encoding='utf-8') as f:
+            f.write(_static_env.get_template('static.html').render(
+                root='..', vv_type=run_type, content=page.Data))
+    elif livvkit.report_format == 'latex':
+        with open(os.path.join(page_dir, case + '.tex'), 'w', encoding='utf-8') as f:
+            f.write(page._repr_latex())
+    else:
+        create_page_from_template(run_type + '.html', os.path.join(livvkit.index_dir, run_type, case + '.html'))
+        with open(os.path.join(page_dir, case + '.json'), 'w', encoding='utf-8') as f:
+            page._write_json(f, compact=livvkit.compact_json)
+
+
+def _report_pages(summary):
+    """ The (run type, [cases]) of the pages listed in a summary page's tables """
+    pages = []
+    for table in summary.elements:
+        # NOTE: analyses which failed are listed as Error elements, without any pages
+        if getattr(table, 'data', None):
+            pages.append((table.title, sorted(set(table.index))))
+    return pages
+
+
+def write_index(summary):
+    """
+    Write out the report's summary page, index.json, in the report format.
+
+    For the ``html`` format, the summary page (index.html) and the navigation
+    (nav.html) are also rendered statically and for the ``latex`` format, the
+    summary page and all the analysis pages are combined into index.tex.
+
+    Args:
+        summary: The LIVVkit Page element summarizing the analyses
+    """
+    with open(os.path.join(livvkit.output_dir, 'index.json'), 'w', encoding='utf-8') as f:
+        summary._write_json(f, compact=livvkit.compact_json)
+
+    if livvkit.report_format == 'html':
+        with open(os.path.join(livvkit.output_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(_static_env.get_template('static.html').render(
+                root='.', vv_type='index', content=summary.Data))
+        with open(os.path.join(livvkit.output_dir, 'nav.html'), 'w', encoding='utf-8') as f:
+            f.write(_static_env.get_template('static_nav.html').render(nav=_report_pages(summary)))
+    elif livvkit.report_format == 'latex':
+        from livvkit.elements import elements
+        body = [summary._repr_latex()]
+        for title, cases in _report_pages(summary):
+            body.extend(['\\input{{{}/{}}}'.format(title.lower(), case) for case in cases])
+        with open(os.path.join(livvkit.output_dir, 'index.tex'), 'w', encoding='utf-8') as f:
+            f.write(elements._latex_env.get_template('document.tex').render(
+                data={'doc_body': '\n\n'.join(body)}))
+
+
 def read_json(file_path):
     """ Read in a json file and return a dictionary representation """
     try:
-        with open(file_path, 'r') as f:
-            config = json_tricks.load(f)
+        with open(file_path, 'r', encoding='utf-8') as f:
+            config = json_backend.load(f)
     except ValueError:
         print('    '+'!'*58)
         print('    Woops! Looks the JSON syntax is not valid in:')
@@ -162,8 +243,8 @@ def write_json(data, path, file_name):
         return
     elif not os.path.exists(path):
         mkdir_p(path)
-    with open(os.path.join(path, file_name), 'w') as f:
-        json_tricks.dump(data, f, indent=4, primitives=True, allow_nan=True)
+    with open(os.path.join(path, file_name), 'w', encoding='utf-8') as f:
+        json_backend.dump(data, f)
 
 
 def collect_cases(data_dir):
@@ -181,10 +262,16 @@ def collect_cases(data_dir):
 def setup_output(cssd=None, jsd=None, imgd=None):
     """
     Set up the directory structure for the output.  Copies old run
-    data into a timestamped directory and sets up the new directory
+    data into a timestamped directory and sets up the new directory,
+    unless the old run is being resumed (see ``livvkit.util.journal``)
     """
+    resume = livvkit.resume and os.path.isdir(livvkit.index_dir)
     # Check if we need to back up an old run
-    if os.path.isdir(livvkit.index_dir):
+    if resume:
+        print("-------------------------------------------------------------------")
+        print('  Resuming the previous run in the output directory')
+        print("-------------------------------------------------------------------")
+    elif os.path.isdir(livvkit.index_dir):
         print("-------------------------------------------------------------------")
         print('  Previous output data found in output directory!')
         try:
@@ -197,25 +284,17 @@ def setup_output(cssd=None, jsd=None, imgd=None):
         print('   ' + livvkit.index_dir + "_" + prev_time)
         print("-------------------------------------------------------------------")
         shutil.move(livvkit.index_dir, livvkit.index_dir + "_" + prev_time)
+        livvkit.previous_output_dir = livvkit.index_dir + "_" + prev_time
     else:
         print("-------------------------------------------------------------------")
 
     # Copy over js, css, & imgs directories from source
-    if cssd:
-        shutil.copytree(cssd, os.path.join(livvkit.index_dir, "css"))
-    else:
-        shutil.copytree(os.path.join(livvkit.resource_dir, "css"),
-                        os.path.join(livvkit.index_dir, "css"))
-    if jsd:
-        shutil.copytree(jsd, os.path.join(livvkit.index_dir, "js"))
-    else:
-        shutil.copytree(os.path.join(livvkit.resource_dir, "js"),
-                        os.path.join(livvkit.index_dir, "js"))
-    if imgd:
-        shutil.copytree(imgd, os.path.join(livvkit.index_dir, "js"))
-    else:
-        shutil.copytree(os.path.join(livvkit.resource_dir, "imgs"),
-                        os.path.join(livvkit.index_dir, "imgs"))
+    for src, dst in [(cssd or os.path.join(livvkit.resource_dir, "css"), "css"),
+                     (jsd or os.path.join(livvkit.resource_dir, "js"), "js"),
+                     (imgd or os.path.join(livvkit.resource_dir, "imgs"), "imgs")]:
+        # NOTE: a resumed run already has them
+        if not (resume and os.path.isdir(os.path.join(livvkit.index_dir, dst))):
+            shutil.copytree(src, os.path.join(livvkit.index_dir, dst))
 
     # Get the index template from the resource directory
     shutil.copy(os.path.join(livvkit.resource_dir, "index.html"),
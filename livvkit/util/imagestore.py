@@ -0,0 +1,145 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides a content-addressed store for the images in a report.
+
+Instead of writing each image to the file it's named for (e.g.,
+``verification/imgs/dome_thk.png``), the image is written to a file named by
+the SHA-256 digest of its content in the same directory, so identical images
+(e.g., the same plot for different cases) are only written once. The
+requested names are recorded in a ``manifest.jsonl`` file in the directory,
+with one JSON object per line of the form::
+
+    {"name": "dome_thk.png", "file": "<digest>.png", "digest": "<digest>"}
+
+Images that are identical to one in the previous run (which ``setup_output``
+backed up to ``livvkit.previous_output_dir``) are hard linked to the
+previous run's file instead of written, so a history of nightly reports only
+stores each distinct image once.
+"""
+
+import os
+import io
+import json
+import hashlib
+import tempfile
+
+import livvkit
+from livvkit.util import progress
+from livvkit.util import profiling
+
+MANIFEST = 'manifest.jsonl'
+
+
+def _previous_file(stored):
+    """ The path a stored image would have in the previous run's output """
+    if livvkit.previous_output_dir is None or livvkit.output_dir is None:
+        return None
+    relative = os.path.relpath(stored, livvkit.output_dir)
+    if relative.startswith(os.pardir):
+        return None
+    return os.path.join(livvkit.previous_output_dir, relative)
+
+
+def _link_previous(stored):
+    """ Hard link a stored image to the previous run's copy, if there is one """
+    previous = _previous_file(stored)
+    if previous is None or not os.path.isfile(previous):
+        return False
+    try:
+        os.link(previous, stored)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    return True
+
+
+def _write(data, stored):
+    """ Write an image atomically, as other processes may be storing it too """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(stored), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, stored)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def store_bytes(data, image_file):
+    """
+    Store an image in the content-addressed store of the directory it's named
+    for.
+
+    Args:
+        data: The bytes of the image
+        image_file: The path the image is named for; the image is stored in
+            the same directory, with the same extension
+
+    Returns:
+        The path to the stored image, which should be used to display it
+    """
+    image_dir, name = os.path.split(os.path.abspath(image_file))
+    os.makedirs(image_dir, exist_ok=True)
+    digest = hashlib.sha256(data).hexdigest()
+    stored = os.path.join(image_dir, digest + os.path.splitext(name)[1])
+
+    if not os.path.exists(stored) and not _link_previous(stored):
+        _write(data, stored)
+
+    # NOTE: each record is a single, small, append, which concurrent processes
+    #       won't interleave
+    record = json.dumps({'name': name, 'file': os.path.basename(stored), 'digest': digest})
+    with open(os.path.join(image_dir, MANIFEST), 'a', encoding='utf-8') as f:
+        f.write(record + '\n')
+    return stored
+
+
+def save_figure(figure, image_file, **kwargs):
+    """
+    Save a matplotlib figure in the content-addressed store of the directory
+    it's named for.
+
+    Args:
+        figure: The matplotlib figure to save (e.g., ``plt.gcf()``)
+        image_file: The path the image is named for; the image format is
+            determined by its extension
+        **kwargs: Any additional keyword arguments to ``figure.savefig``
+
+    Returns:
+        The path to the stored image, which should be used to display it
+    """
+    buf = io.BytesIO()
+    fmt = os.path.splitext(image_file)[1].lstrip('.') or None
+    figure.savefig(buf, format=fmt, **kwargs)
+    progress.rendered_plot()
+    profiling.add_bytes(buf.tell())
+    return store_bytes(buf.getvalue(), image_file)
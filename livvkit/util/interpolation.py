@@ -0,0 +1,160 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides cached linear interpolation operators for regularly structured grids.
+
+A bilinear interpolation from a rectilinear grid onto a fixed set of points is
+a linear map, so it can be expressed as a sparse weight matrix with (at most)
+four non-zero entries per point. Building that matrix once per grid geometry
+allows every variable defined on the grid to be interpolated with a single
+sparse matrix product instead of constructing a new spline per variable.
+"""
+
+import hashlib
+import collections
+
+import numpy as np
+from scipy import sparse
+
+# Maximum number of operators kept in the cache
+CACHE_SIZE = 32
+
+_operator_cache = collections.OrderedDict()
+
+
+def _interval_weights(coords, points):
+    """
+    Locate each point within a monotonically increasing coordinate array.
+
+    Points outside of the coordinate range are clamped to the nearest edge of
+    the grid, which matches the behavior of a degree one
+    scipy.interpolate.RectBivariateSpline.
+
+    Args:
+        coords: A 1D, monotonically increasing, array of grid coordinates
+        points: A 1D array of locations to interpolate to
+
+    Returns:
+        A tuple containing the index of the lower bound of the interval each
+        point falls in and the fractional distance of each point through that
+        interval
+    """
+    coords = np.asarray(coords, dtype=float)
+    points = np.clip(np.asarray(points, dtype=float), coords[0], coords[-1])
+    if coords.size == 1:
+        return np.zeros(points.shape, dtype=int), np.zeros(points.shape)
+
+    lower = np.clip(np.searchsorted(coords, points, side='right') - 1, 0, coords.size - 2)
+    fraction = (points - coords[lower]) / (coords[lower + 1] - coords[lower])
+    return lower, fraction
+
+
+def _geometry_key(row_coords, col_coords, row_points, col_points):
+    """Create a hashable key which uniquely identifies an interpolation geometry"""
+    digest = hashlib.sha1()
+    for array in (row_coords, col_coords, row_points, col_points):
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def bilinear_operator(row_coords, col_coords, row_points, col_points):
+    """
+    Build (or retrieve from the cache) a bilinear interpolation operator.
+
+    The operator maps a field of shape ``(len(row_coords), len(col_coords))``,
+    flattened in C order, onto the points ``(row_points[i], col_points[i])``.
+
+    Args:
+        row_coords: A 1D, monotonically increasing, array of the coordinates
+            along the first (row) axis of the grid
+        col_coords: A 1D, monotonically increasing, array of the coordinates
+            along the second (column) axis of the grid
+        row_points: A 1D array of the row coordinates of the interpolation points
+        col_points: A 1D array of the column coordinates of the interpolation points
+
+    Returns:
+        A scipy.sparse.csr_matrix of shape
+        ``(len(row_points), len(row_coords)*len(col_coords))``
+    """
+    key = _geometry_key(row_coords, col_coords, row_points, col_points)
+    if key in _operator_cache:
+        _operator_cache.move_to_end(key)
+        return _operator_cache[key]
+
+    n_rows = np.size(row_coords)
+    n_cols = np.size(col_coords)
+    row_points, col_points = np.broadcast_arrays(np.asarray(row_points, dtype=float),
+                                                 np.asarray(col_points, dtype=float))
+    n_points = row_points.size
+
+    r0, tr = _interval_weights(row_coords, row_points.ravel())
+    c0, tc = _interval_weights(col_coords, col_points.ravel())
+    r1 = np.minimum(r0 + 1, n_rows - 1)
+    c1 = np.minimum(c0 + 1, n_cols - 1)
+
+    rows = np.tile(np.arange(n_points), 4)
+    cols = np.concatenate([r0*n_cols + c0, r0*n_cols + c1, r1*n_cols + c0, r1*n_cols + c1])
+    weights = np.concatenate([(1 - tr)*(1 - tc), (1 - tr)*tc, tr*(1 - tc), tr*tc])
+
+    operator = sparse.csr_matrix((weights, (rows, cols)), shape=(n_points, n_rows*n_cols))
+
+    _operator_cache[key] = operator
+    if len(_operator_cache) > CACHE_SIZE:
+        _operator_cache.popitem(last=False)
+    return operator
+
+
+def interpolate_fields(operator, fields):
+    """
+    Apply an interpolation operator to several fields at once.
+
+    Args:
+        operator: An operator created by bilinear_operator
+        fields: A dictionary of 2D arrays, all of which are defined on the
+            grid the operator was built for
+
+    Returns:
+        A dictionary with the same keys as fields whose values are the 1D
+        arrays of the fields interpolated onto the operator's points
+    """
+    names = list(fields)
+    if not names:
+        return {}
+    stacked = np.column_stack([np.asarray(fields[name], dtype=float).ravel()
+                               for name in names])
+    interpolated = operator @ stacked
+    return {name: interpolated[:, ii] for ii, name in enumerate(names)}
+
+
+def clear_cache():
+    """Remove all cached interpolation operators"""
+    _operator_cache.clear()
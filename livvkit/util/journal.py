@@ -0,0 +1,146 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+Provides the run journal, which makes an interrupted LIVVkit run resumable.
+
+The summary of each analysis is sent to the main process along with the log
+records (see ``livvkit.util.logs``) as soon as the analysis is done. There, a
+``JournalHandler`` appends it to ``journal.jsonl`` in the output directory, as
+one JSON object per line, and syncs it to disk:
+
+.. code-block:: json
+
+    {"component": "verification", "case": "dome", "summary": {"s0": {...}}}
+
+If the run is killed (e.g., by a batch system's walltime), running LIVVkit
+again with the same arguments and the ``--resume`` option skips the analyses
+in the journal, and the summary page (index.json) is built from their
+journaled summaries instead. Analyses which failed aren't journaled, so they
+are run again.
+"""
+
+import os
+import logging
+
+from livvkit.util import logs
+from livvkit.util import json_backend
+
+LOGGER = logs.LOGGER + '.journal'
+JOURNAL_FILE = 'journal.jsonl'
+
+# The summaries of the analyses completed by a previous run, by component and case
+_completed = {}
+
+
+def record(component, case, summary):
+    """
+    Journal a completed analysis.
+
+    Args:
+        component: The component of the analysis (e.g., verification)
+        case: The case of the analysis
+        summary: The summary of the analysis
+    """
+    if logs.queue() is not None:
+        logging.getLogger(LOGGER).info('journal', extra={
+            'journal': {'component': component, 'case': case, 'summary': summary}})
+
+
+def load(path):
+    """
+    Load the analyses completed by a previous run from its journal.
+
+    Args:
+        path: The path to the journal
+
+    Returns:
+        The number of completed analyses
+    """
+    _completed.clear()
+    if os.path.isfile(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json_backend.loads(line)
+                except ValueError:
+                    # NOTE: the last line is incomplete if the run was killed
+                    #       while writing it
+                    continue
+                _completed[(entry['component'], entry['case'])] = entry['summary']
+    return len(_completed)
+
+
+def completed(component, case):
+    """ Check if an analysis was completed by a previous run """
+    return (component, case) in _completed
+
+
+def summary(component, case):
+    """ The summary of an analysis completed by a previous run """
+    return _completed[(component, case)]
+
+
+def _ends_line(path):
+    """ Check if a file is empty or ends with a newline """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if not f.tell():
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+class JournalHandler(logging.Handler):
+    """ Append each completed analysis to the journal """
+    def __init__(self, path):
+        """
+        Args:
+            path: The path to the journal
+        """
+        super(JournalHandler, self).__init__()
+        self.addFilter(lambda record: getattr(record, 'journal', None) is not None)
+        self.path = path
+        self._file = None
+
+    def emit(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # NOTE: an incomplete last line (see ``load``) is ended, so it
+            #       doesn't corrupt the next entry
+            if not _ends_line(self.path):
+                self._file.write('\n')
+        self._file.write(json_backend.dumps(record.journal, compact=True) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super(JournalHandler, self).close()
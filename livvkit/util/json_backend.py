@@ -0,0 +1,255 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides the JSON encoding and decoding backend used to write LIVVkit's output
+and read its configuration files.
+
+`orjson <https://github.com/ijl/orjson>`_ is used when it's installed, which
+serializes numpy arrays and scalars natively, and is significantly faster than
+json_tricks. Otherwise, json_tricks (a LIVVkit requirement) is used. The
+backend can be chosen explicitly with the ``LIVVKIT_JSON_BACKEND`` environment
+variable or the ``set_backend`` function.
+
+Note: The orjson backend indents by two spaces (the only indentation orjson
+supports), writes non-ASCII characters as UTF-8 instead of escaping them, and
+writes non-finite floats (NaN, Infinity) as ``null``; files written with it
+must be opened with ``encoding='utf-8'``.
+"""
+
+import os
+
+import numpy as np
+import json_tricks
+import json_tricks.nonp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ('orjson', 'json_tricks')
+
+backend = None
+
+
+def set_backend(name=None):
+    """
+    Set the JSON backend.
+
+    Args:
+        name: The name of the backend to use, either 'orjson' or 'json_tricks'.
+            If None, the ``LIVVKIT_JSON_BACKEND`` environment variable is used
+            if set, otherwise orjson is used if it's installed.
+
+    Returns:
+        The name of the backend in use
+    """
+    global backend
+    if name is None:
+        name = os.environ.get('LIVVKIT_JSON_BACKEND', 'orjson' if orjson is not None else 'json_tricks')
+
+    if name not in BACKENDS:
+        raise ValueError('Unknown JSON backend {}; must be one of: {}'.format(name, ', '.join(BACKENDS)))
+    if name == 'orjson' and orjson is None:
+        raise ImportError('The orjson JSON backend was requested, but orjson is not installed')
+
+    backend = name
+    return backend
+
+
+def tricks_encoder(compact=False):
+    """
+    Get the json_tricks encoder used by LIVVkit.
+
+    Args:
+        compact: If True, the JSON will be written without any indentation or
+            whitespace between items, otherwise it will be indented by four
+            spaces per level
+
+    Returns:
+        A json_tricks.TricksEncoder configured like
+        ``json_tricks.dumps(..., indent=4, primitives=True, allow_nan=True)``
+    """
+    if compact:
+        layout = {'separators': (',', ':')}
+    else:
+        layout = {'indent': 4}
+    return json_tricks.TricksEncoder(obj_encoders=json_tricks.nonp.DEFAULT_ENCODERS,
+                                     primitives=True, allow_nan=True, **layout)
+
+
+def _orjson_default(obj):
+    """ Convert the objects orjson doesn't natively handle """
+    if isinstance(obj, np.ndarray):
+        # NOTE: e.g., masked arrays and non-native dtypes; masked values become null
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, range)):
+        return list(obj)
+    if isinstance(obj, os.PathLike):
+        return os.fspath(obj)
+    return json_tricks.loads(json_tricks.dumps(obj, primitives=True, allow_nan=True))
+
+
+def _orjson_dumps(obj, compact):
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_orjson_default, option=option).decode('utf-8')
+
+
+class StreamedDict(dict):
+    """A dictionary whose items are encoded, and streamed, one at a time
+
+    By default, the orjson backend encodes each value with a single (fast) call
+    to orjson; the items of a StreamedDict are instead encoded individually so
+    that large documents (e.g., element trees) can be streamed without holding
+    their full JSON representation in memory.
+    """
+
+
+class StreamedList(list):
+    """A list whose items are encoded, and streamed, one at a time
+
+    See StreamedDict.
+    """
+
+
+def _orjson_iterencode(obj, compact, level=0):
+    if isinstance(obj, StreamedDict) and obj:
+        items = obj.items()
+        opening, closing = '{', '}'
+    elif isinstance(obj, StreamedList) and obj:
+        items = ((None, v) for v in obj)
+        opening, closing = '[', ']'
+    else:
+        text = _orjson_dumps(obj, compact)
+        if not compact and level:
+            text = text.replace('\n', '\n' + '  ' * level)
+        yield text
+        return
+
+    inner = '' if compact else '\n' + '  ' * (level + 1)
+    yield opening
+    for ii, (key, value) in enumerate(items):
+        chunk = inner if not ii else ',' + inner
+        if key is not None:
+            key = key if isinstance(key, str) else str(key)
+            chunk += _orjson_dumps(key, True) + (':' if compact else ': ')
+        yield chunk
+        yield from _orjson_iterencode(value, compact, level + 1)
+    yield ('' if compact else '\n' + '  ' * level) + closing
+
+
+def iterencode(obj, compact=False):
+    """
+    Encode an object as JSON, piece by piece.
+
+    With the orjson backend, only StreamedDict and StreamedList containers are
+    split into pieces; everything else is encoded in one piece.
+
+    Args:
+        obj: The (plain-Python, or numpy) object to encode
+        compact: If True, encode without any indentation or whitespace between
+            items
+
+    Returns:
+        A generator of the JSON text chunks
+    """
+    if backend == 'orjson':
+        return _orjson_iterencode(obj, compact)
+    return tricks_encoder(compact).iterencode(obj)
+
+
+def dumps(obj, compact=False):
+    """
+    Encode an object as a JSON string.
+
+    Args:
+        obj: The (plain-Python, or numpy) object to encode
+        compact: If True, encode without any indentation or whitespace between
+            items
+
+    Returns:
+        The JSON string
+    """
+    return ''.join(iterencode(obj, compact))
+
+
+def dump(obj, fp, compact=False):
+    """
+    Encode an object as JSON and stream it to a file.
+
+    Args:
+        obj: The (plain-Python, or numpy) object to encode
+        fp: A file-like object opened for writing text; to support every
+            backend, it should be opened with ``encoding='utf-8'``
+        compact: If True, encode without any indentation or whitespace between
+            items
+    """
+    fp.writelines(iterencode(obj, compact))
+
+
+def loads(text):
+    """
+    Decode a JSON string.
+
+    Strict JSON is decoded by the backend. Otherwise, the text is decoded by
+    json_tricks, which also understands comments, NaN, and Infinity.
+
+    Args:
+        text: The JSON string
+
+    Returns:
+        The decoded object
+    """
+    if backend == 'orjson':
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json_tricks.loads(text)
+
+
+def load(fp):
+    """
+    Decode JSON from a file.
+
+    Args:
+        fp: A file-like object opened for reading text
+
+    Returns:
+        The decoded object
+    """
+    return loads(fp.read())
+
+
+set_backend()
@@ -0,0 +1,255 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides LIVVkit's logging, which collects the output of the analyses, which
+are run in worker processes, in the main process as it is produced.
+
+Everything an analysis prints (or logs to the ``livvkit`` logger) is turned
+into log records, which are tagged with the analysis' component (e.g.,
+verification), case, and (optionally) subcase, and sent through a queue to
+the main process. There, a listener streams them to the console as they
+arrive, and writes them to ``livvkit.jsonl`` in the log directory, as one
+JSON object per line:
+
+.. code-block:: json
+
+    {"time": 1553893424.3, "level": "INFO", "component": "verification",
+     "case": "dome", "subcase": null, "process": 4242, "message": "Ran dome!"}
+"""
+
+import io
+import os
+import sys
+import json
+import logging
+import contextlib
+import logging.handlers
+import multiprocessing as mp
+
+LOGGER = 'livvkit'
+LOG_FILE = 'livvkit.jsonl'
+TAGS = ('component', 'case', 'subcase')
+# The attributes which mark a record as an event, rather than a message
+EVENTS = ('progress', 'profile', 'memory', 'journal')
+
+_queue = None
+_listener = None
+_tags = dict.fromkeys(TAGS)
+
+
+class _TagFilter(logging.Filter):
+    """ Tag each record with the component, case, and subcase being run """
+    def filter(self, record):
+        for tag in TAGS:
+            if not hasattr(record, tag):
+                setattr(record, tag, _tags[tag])
+        return True
+
+
+def _is_message(record):
+    """
+    Check if a record is a message, and not an event (see ``livvkit.util.progress``,
+    ``livvkit.util.profiling``, ``livvkit.util.memory``, and ``livvkit.util.journal``)
+    """
+    return all(getattr(record, event, None) is None for event in EVENTS)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """ Stream records to the console, keeping the status line (if any) below them """
+    def __init__(self, stream=None, status=None):
+        super(ConsoleHandler, self).__init__(stream)
+        self.status = status
+
+    def emit(self, record):
+        if self.status is not None:
+            self.status.clear()
+        super(ConsoleHandler, self).emit(record)
+        if self.status is not None:
+            self.status.draw()
+
+
+class ConsoleFormatter(logging.Formatter):
+    """ Format a record as its message, prefixed by its tags """
+    def format(self, record):
+        tag = '/'.join(str(getattr(record, t)) for t in TAGS if getattr(record, t, None))
+        message = record.getMessage()
+        return '[{}] {}'.format(tag, message) if tag else message
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """ Format a record as a single line of JSON """
+    def format(self, record):
+        entry = {'time': record.created, 'level': record.levelname}
+        entry.update({tag: getattr(record, tag, None) for tag in TAGS})
+        entry.update({'process': record.process, 'message': record.getMessage()})
+        return json.dumps(entry)
+
+
+class LogStream(io.TextIOBase):
+    """ A text stream which logs each (non-blank) line written to it """
+    def __init__(self, level=logging.INFO):
+        super(LogStream, self).__init__()
+        self.level = level
+        self._buffer = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer += text
+        lines = self._buffer.split('\n')
+        self._buffer = lines.pop()
+        for line in lines:
+            self._log(line)
+        return len(text)
+
+    def flush(self):
+        self._log(self._buffer)
+        self._buffer = ''
+
+    def _log(self, line):
+        if line.strip():
+            logging.getLogger(LOGGER).log(self.level, line.rstrip())
+
+
+def queue():
+    """ The queue log records are sent through, or None if logging hasn't been started """
+    return _queue
+
+
+def tags():
+    """ The current tags """
+    return dict(_tags)
+
+
+def set_tags(**kwargs):
+    """ Set the tags of the records logged by this process """
+    _tags.update(kwargs)
+
+
+@contextlib.contextmanager
+def tagged(**kwargs):
+    """ Temporarily set the tags of the records logged by this process """
+    previous = tags()
+    set_tags(**kwargs)
+    try:
+        yield
+    finally:
+        set_tags(**previous)
+
+
+def init_worker(log_queue):
+    """
+    Send the records logged by this process through the log queue; this is
+    done once by each worker process.
+
+    Args:
+        log_queue: The queue from ``queue()`` in the main process
+    """
+    global _queue
+    _queue = log_queue
+    logger = logging.getLogger(LOGGER)
+    if log_queue is None:
+        logger.handlers = []
+        return
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(_TagFilter())
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def start(log_dir, start_method=None, status=None, handlers=()):
+    """
+    Start collecting the log records from this and any worker processes.
+
+    Args:
+        log_dir: The directory to write the JSON-lines log to
+        start_method: The multiprocessing start method used for the workers
+        status: A handler for the progress events, which may draw a status
+            line on the console (see ``livvkit.util.progress.ProgressHandler``)
+        handlers: Any additional handlers for the records (e.g., the events)
+    """
+    global _listener
+    stop()
+    console = ConsoleHandler(sys.stdout, status)
+    console.setFormatter(ConsoleFormatter())
+    console.addFilter(_is_message)
+    jsonl = logging.FileHandler(os.path.join(log_dir, LOG_FILE), encoding='utf-8')
+    jsonl.setFormatter(JSONLinesFormatter())
+    jsonl.addFilter(_is_message)
+    handlers = [console, jsonl] + ([status] if status is not None else []) + list(handlers)
+
+    log_queue = mp.get_context(start_method).Queue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    init_worker(log_queue)
+
+
+def stop():
+    """ Stop collecting log records, once all the records sent have been handled """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    init_worker(None)
+
+
+def flush():
+    """ Wait until all the records sent so far have been handled """
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+@contextlib.contextmanager
+def capture(component, case):
+    """
+    Log everything printed while running an analysis, tagged with the
+    analysis' component and case. If logging hasn't been started, the output
+    is left as is.
+
+    Args:
+        component: The component of the analysis (e.g., verification)
+        case: The case being run
+    """
+    with tagged(component=component, case=case):
+        if _queue is None:
+            yield
+            return
+        stdout, stderr = LogStream(logging.INFO), LogStream(logging.WARNING)
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                yield
+        finally:
+            stdout.flush()
+            stderr.flush()
@@ -0,0 +1,193 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides memory tracking for LIVVkit's analyses, and estimates of their
+memory footprint for the memory budgeted scheduling of the analyses (see the
+``--memory-budget`` option).
+
+The peak resident set size (RSS) of the process running each analysis is
+measured and, with the ``--track-memory`` option, the peak memory allocated
+by the analysis is traced with ``tracemalloc``. The measurements are sent to
+the main process along with the log records (see ``livvkit.util.logs``), where
+a ``MemoryHandler`` collects them and summarizes them once the run is done.
+
+Note: A worker process runs many analyses, and its peak RSS is the peak of
+all the analyses it has run so far; the RSS growth of an analysis is how much
+it raised that peak.
+"""
+
+import os
+import sys
+import glob
+import json
+import logging
+import contextlib
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import livvkit
+from livvkit.util import logs
+
+LOGGER = logs.LOGGER + '.memory'
+MEMORY_FILE = 'memory.json'
+
+# The (estimated) memory used by a worker process before it runs an analysis
+BASE_FOOTPRINT = 200 * 2**20
+
+# The number of copies of the largest variable an analysis holds at once: the
+# test and benchmark data, their difference, and a temporary (e.g., its
+# absolute value) in a bit-for-bit comparison
+VARIABLE_COPIES = 4
+
+
+def peak_rss():
+    """ The peak resident set size of this process in bytes, or None if it's unknown """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # NOTE: ru_maxrss is in bytes on macOS, and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@contextlib.contextmanager
+def tracked():
+    """
+    Measure the memory used by an analysis, and send the measurements to the
+    main process. Allocations are only traced if ``livvkit.track_memory``.
+    """
+    trace = livvkit.track_memory and not tracemalloc.is_tracing()
+    if trace:
+        tracemalloc.start()
+    start_rss = peak_rss()
+    try:
+        yield
+    finally:
+        usage = {'peak_rss': peak_rss(), 'rss_growth': None, 'traced_peak': None}
+        if start_rss is not None:
+            usage['rss_growth'] = usage['peak_rss'] - start_rss
+        if trace:
+            usage['traced_peak'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if logs.queue() is not None:
+            logging.getLogger(LOGGER).info('memory', extra={'memory': usage})
+
+
+def largest_variable(path):
+    """
+    Determine the size of the largest variable in a NetCDF file from its header.
+
+    Args:
+        path: The path to the NetCDF file
+
+    Returns:
+        The size in bytes, or zero if the file can't be read
+    """
+    import numpy as np
+    from netCDF4 import Dataset
+    try:
+        with Dataset(path) as data:
+            return max([int(np.prod(var.shape)) * getattr(var.dtype, 'itemsize', 8)
+                        for var in data.variables.values()] or [0])
+    except OSError:
+        return 0
+
+
+def estimate_footprint(case, config):
+    """
+    Estimate the peak memory needed to analyze a case from the headers of its
+    (test and benchmark) NetCDF output files.
+
+    Args:
+        case: The name of the case
+        config: The configuration of the case; only cases with a ``data_dir``
+            and an ``output_ext`` have NetCDF output to estimate the size of
+
+    Returns:
+        The estimated footprint in bytes
+    """
+    largest = 0
+    if 'data_dir' in config and 'output_ext' in config:
+        for data_dir in [livvkit.model_dir, livvkit.bench_dir]:
+            if data_dir is None:
+                continue
+            pattern = os.path.join(data_dir, config['data_dir'], case, '**', '*' + config['output_ext'])
+            for path in glob.glob(pattern, recursive=True):
+                largest = max(largest, largest_variable(path))
+    return BASE_FOOTPRINT + VARIABLE_COPIES * largest
+
+
+def _mb(nbytes):
+    return 'n/a' if nbytes is None else '{:.1f}'.format(nbytes / 2**20)
+
+
+def format_summary(usages):
+    """ Format the memory used by each analysis as a table """
+    width = max([len('Analysis')] + [len(task) for task in usages])
+    lines = ['{}  {:>14}  {:>16}  {:>17}'.format(
+        'Analysis'.ljust(width), 'Peak RSS (MB)', 'RSS growth (MB)', 'Traced peak (MB)')]
+    for task, usage in usages.items():
+        lines.append('{}  {:>14}  {:>16}  {:>17}'.format(
+            task.ljust(width), _mb(usage['peak_rss']), _mb(usage['rss_growth']),
+            _mb(usage['traced_peak'])))
+    return '\n'.join(lines)
+
+
+class MemoryHandler(logging.Handler):
+    """
+    Collect the memory used by each analysis and, when closed, write it to a
+    directory and print a summary of it.
+    """
+    def __init__(self, memory_dir):
+        """
+        Args:
+            memory_dir: The directory to write the memory usage to
+        """
+        super(MemoryHandler, self).__init__()
+        self.addFilter(lambda record: getattr(record, 'memory', None) is not None)
+        self.memory_dir = memory_dir
+        self.usages = {}
+
+    def emit(self, record):
+        task = '/'.join(str(getattr(record, t)) for t in logs.TAGS if getattr(record, t, None))
+        self.usages[task] = record.memory
+
+    def close(self):
+        if self.usages:
+            with open(os.path.join(self.memory_dir, MEMORY_FILE), 'w') as f:
+                json.dump(self.usages, f, indent=2)
+            print('')
+            print(format_summary(self.usages))
+            print('')
+            self.usages = {}
+        super(MemoryHandler, self).close()
@@ -33,10 +33,8 @@ import time
 import pkgutil
 import argparse
 import importlib
-import multiprocessing as mp
 
 import livvkit
-from livvkit import bundles
 
 
 def positive_int(integer):
@@ -105,11 +103,87 @@ def parse_args(args=None):
     parser.add_argument('-p', '--pool-size',
                         nargs='?',
                         type=int,
-                        default=(mp.cpu_count() - 1 or 1),
+                        default=((os.cpu_count() or 1) - 1 or 1),
                         help='The number of multiprocessing processes to run '
                              'analyses in. If zero, processes will run serially '
                              'outside of the multiprocessing module.')
 
+    parser.add_argument('--start-method',
+                        default=None,
+                        choices=['fork', 'spawn', 'forkserver'],
+                        help='The method used to start the worker processes (see the '
+                             'multiprocessing documentation). By default, the '
+                             "platform's default start method is used. The forkserver "
+                             'method starts workers from a server process which has '
+                             'already imported LIVVkit, so workers start quickly and '
+                             "don't inherit any (e.g., HDF5 library) state from the "
+                             'main process.')
+
+    parser.add_argument('--format',
+                        default='json',
+                        choices=['json', 'html', 'latex'],
+                        dest='report_format',
+                        help='The format of the report. The json report is a website '
+                             'which loads the analyses JSON data to display them, the '
+                             'html report is a static website with every page rendered '
+                             'as it is generated, and the latex report is a LaTeX '
+                             'document, index.tex, which includes every analysis.')
+
+    parser.add_argument('--compact-json',
+                        action='store_true',
+                        help='Write the output JSON files without indentation or '
+                             'whitespace between items, which reduces their size.')
+
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Profile LIVVkit itself: the time spent in (and the bytes '
+                             'read or written by) its hot paths are summarized when the '
+                             'run is done, and a timeline of them is written in the '
+                             'Chrome trace format (viewable in chrome://tracing or '
+                             'Perfetto) to the logs directory of the output.')
+
+    parser.add_argument('--track-memory',
+                        action='store_true',
+                        help='Trace the memory allocated by each analysis (with '
+                             'tracemalloc), in addition to the peak resident set size '
+                             'of the process running it, which is always reported.')
+
+    parser.add_argument('--memory-budget',
+                        type=float,
+                        default=None,
+                        metavar='MB',
+                        help='Limit the analyses run concurrently so that their total '
+                             'estimated memory footprint, determined from the headers '
+                             'of their NetCDF output, stays within MB megabytes. An '
+                             'analysis estimated to need more than the budget is run '
+                             'alone. By default, only the pool size limits them.')
+
+    parser.add_argument('--timeout',
+                        type=float,
+                        default=None,
+                        dest='task_timeout',
+                        metavar='SECONDS',
+                        help='The number of seconds each analysis may run for before it '
+                             'is stopped (by terminating the worker processes) and '
+                             'reported as failed. Only applies when analyses are run '
+                             'in a pool of processes (a non-zero pool size).')
+
+    parser.add_argument('--retries',
+                        type=positive_int,
+                        default=0,
+                        dest='task_retries',
+                        help='The number of times an analysis which fails, times out, '
+                             'or is running when a worker process crashes is retried '
+                             'before it is reported as failed.')
+
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Resume an interrupted run: the output directory is kept, '
+                             'the analyses its run journal (journal.jsonl) records as '
+                             'completed are skipped, and the summary page is built '
+                             'from their journaled summaries. Use the same arguments '
+                             'as the interrupted run.')
+
     parser.add_argument('--version',
                         action='version',
                         version='LIVVkit {}'.format(livvkit.__version__),
@@ -119,21 +193,42 @@ def parse_args(args=None):
     return init(parser.parse_args(args))
 
 
+def _plot_to_files():
+    """
+    Set matplotlib's backend so LIVVkit can plot to files. NOTE: matplotlib is
+    slow to import and isn't needed to serve a report, so the backend is set
+    through the environment, which is also inherited by any worker processes.
+    The environment has no effect once matplotlib has been imported (e.g., by
+    a program using LIVVkit), so then the backend is set directly too.
+    """
+    os.environ['MPLBACKEND'] = 'agg'
+    if 'matplotlib' in sys.modules:
+        import matplotlib
+        matplotlib.use('agg')
+
+
 def init(options):
     """ Initialize some defaults """
 
-    # Set matlplotlib's backend so LIVVkit can plot to files.
-    import matplotlib
-    matplotlib.use('agg')
+    _plot_to_files()
 
     livvkit.output_dir = os.path.abspath(options.out_dir)
     livvkit.index_dir = livvkit.output_dir
     livvkit.verify = True if options.verify is not None else False
     livvkit.validate = True if options.validate is not None else False
     livvkit.pool_size = options.pool_size
+    livvkit.start_method = options.start_method
+    livvkit.compact_json = options.compact_json
+    livvkit.report_format = options.report_format
+    livvkit.profile = options.profile
+    livvkit.track_memory = options.track_memory
+    livvkit.memory_budget = options.memory_budget
+    livvkit.task_timeout = options.task_timeout
+    livvkit.task_retries = options.task_retries
+    livvkit.resume = options.resume
 
     # Get a list of bundles that provide model specific implementations
-    available_bundles = [mod for imp, mod, ispkg in pkgutil.iter_modules(bundles.__path__)]
+    available_bundles = [mod for imp, mod, ispkg in pkgutil.iter_modules([livvkit.bundle_dir])]
 
     if options.verify is not None:
         livvkit.model_dir = os.path.normpath(options.verify[0])
@@ -0,0 +1,207 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides a low-overhead profiler for LIVVkit itself, which is enabled with the
+``--profile`` option.
+
+LIVVkit's hot paths (discovering and running the analyses, reading the model
+output, diffing, plotting, and encoding the report) are decorated with
+``timed``, which records a span for each call: when it started, how long it
+took, and how many bytes it read or wrote (see ``add_bytes``). Each process
+sends its spans to the main process along with its log records (see
+``livvkit.util.logs``), where a ``ProfileHandler`` collects them and, once the
+run is done, writes a summary table of the time spent in each function and a
+timeline of every span in the Chrome trace event format, which can be opened
+in ``chrome://tracing`` or https://ui.perfetto.dev.
+
+When profiling is disabled, a timed function only checks ``livvkit.profile``
+before it's called.
+"""
+
+import os
+import json
+import time
+import logging
+import functools
+import threading
+import contextlib
+
+import livvkit
+from livvkit.util import logs
+
+LOGGER = logs.LOGGER + '.profile'
+TRACE_FILE = 'profile.trace.json'
+SUMMARY_FILE = 'profile.txt'
+
+_local = threading.local()
+
+
+def _reset():
+    _local.stack = []
+    _local.spans = []
+
+
+def _open_spans():
+    if not hasattr(_local, 'stack'):
+        _reset()
+    return _local.stack
+
+
+# NOTE: forked (worker) processes would otherwise inherit the spans open in the
+#       main process, and never send their own spans
+os.register_at_fork(after_in_child=_reset)
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    Record a span of time; the spans sent by each process are flushed once
+    the outermost (open) span ends.
+
+    Args:
+        name: The name of the span
+    """
+    stack = _open_spans()
+    record = {'name': name, 'ts': time.time() * 1e6, 'bytes': 0, 'children': 0.0}
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['dur'] = (time.perf_counter() - start) * 1e6
+        record['pid'] = os.getpid()
+        record['tid'] = threading.get_native_id()
+        stack.pop()
+        _local.spans.append(record)
+        if stack:
+            stack[-1]['children'] += record['dur']
+        else:
+            flush()
+
+
+def timed(func):
+    """ Decorate a function so that each call is recorded as a span, if profiling """
+    name = '{}.{}'.format(func.__module__.replace('livvkit.', '', 1), func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not livvkit.profile:
+            return func(*args, **kwargs)
+        with span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def add_bytes(nbytes):
+    """ Count the bytes read (or written) in the current span, if profiling """
+    if livvkit.profile:
+        stack = _open_spans()
+        if stack:
+            stack[-1]['bytes'] += nbytes
+
+
+def flush():
+    """ Send the spans recorded by this process to the main process """
+    spans, _local.spans = _local.spans, []
+    if spans and logs.queue() is not None:
+        logging.getLogger(LOGGER).info('profile', extra={'profile': spans})
+
+
+def summarize(spans):
+    """
+    Summarize the time spent in each function.
+
+    Args:
+        spans: A list of the recorded spans
+
+    Returns:
+        A list of (name, calls, total seconds, self seconds, max milliseconds,
+        megabytes) tuples, sorted by the total time, from most to least
+    """
+    summary = {}
+    for s in spans:
+        calls, total, self_time, longest, nbytes = summary.get(s['name'], (0, 0.0, 0.0, 0.0, 0))
+        summary[s['name']] = (calls + 1, total + s['dur'], self_time + s['dur'] - s['children'],
+                              max(longest, s['dur']), nbytes + s['bytes'])
+    return sorted(((name, calls, total / 1e6, self_time / 1e6, longest / 1e3, nbytes / 2**20)
+                   for name, (calls, total, self_time, longest, nbytes) in summary.items()),
+                  key=lambda row: row[2], reverse=True)
+
+
+def format_summary(spans):
+    """ Format the summary of the time spent in each function as a table """
+    rows = summarize(spans)
+    width = max([len('Function')] + [len(row[0]) for row in rows])
+    lines = ['{}  {:>7}  {:>10}  {:>10}  {:>10}  {:>10}'.format(
+        'Function'.ljust(width), 'Calls', 'Total (s)', 'Self (s)', 'Max (ms)', 'MB')]
+    for name, calls, total, self_time, longest, mb in rows:
+        lines.append('{}  {:>7d}  {:>10.3f}  {:>10.3f}  {:>10.1f}  {:>10.1f}'.format(
+            name.ljust(width), calls, total, self_time, longest, mb))
+    return '\n'.join(lines)
+
+
+def chrome_trace(spans):
+    """ Represent the spans in the Chrome trace event format """
+    return {'traceEvents': [{'name': s['name'], 'cat': 'livvkit', 'ph': 'X',
+                             'ts': s['ts'], 'dur': s['dur'], 'pid': s['pid'], 'tid': s['tid'],
+                             'args': {'bytes': s['bytes']}} for s in spans],
+            'displayTimeUnit': 'ms'}
+
+
+class ProfileHandler(logging.Handler):
+    """
+    Collect the spans sent by every process and, when closed, write the
+    profile summary and Chrome trace to a directory and print the summary.
+    """
+    def __init__(self, profile_dir):
+        """
+        Args:
+            profile_dir: The directory to write the profile to
+        """
+        super(ProfileHandler, self).__init__()
+        self.addFilter(lambda record: getattr(record, 'profile', None) is not None)
+        self.profile_dir = profile_dir
+        self.spans = []
+
+    def emit(self, record):
+        self.spans.extend(record.profile)
+
+    def close(self):
+        if self.spans:
+            with open(os.path.join(self.profile_dir, TRACE_FILE), 'w') as f:
+                json.dump(chrome_trace(self.spans), f)
+            summary = format_summary(self.spans)
+            with open(os.path.join(self.profile_dir, SUMMARY_FILE), 'w') as f:
+                f.write(summary + '\n')
+            print('')
+            print(summary)
+            print('')
+            self.spans = []
+        super(ProfileHandler, self).close()
@@ -0,0 +1,201 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides live progress reporting for LIVVkit runs.
+
+Analyses report their progress (tasks started and finished, NetCDF files
+read, and plots rendered) as events, which are sent to the main process along
+with their log records (see ``livvkit.util.logs``). There, a ``ProgressHandler``
+counts them and reports the number of completed, failed, and running tasks,
+the throughput, and the estimated time remaining, both as a status line in
+the terminal and in ``progress.json`` in the output directory, which the
+served report can poll:
+
+.. code-block:: json
+
+    {"total": 40, "completed": 12, "failed": 1, "running": 4,
+     "elapsed": 310.2, "eta": 726.6, "netcdf_mb": 5120.0,
+     "netcdf_mb_per_s": 16.5, "plots": 96, "plots_per_s": 0.31, "done": false}
+
+If logging hasn't been started, events are ignored.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+from livvkit.util import logs
+from livvkit.util import profiling
+
+LOGGER = logs.LOGGER + '.progress'
+PROGRESS_FILE = 'progress.json'
+
+
+def event(name, value=1):
+    """
+    Report a progress event to the main process.
+
+    Args:
+        name: The event; one of ``total`` (tasks to run), ``start``, ``done``,
+            ``failed`` (tasks), ``netcdf_bytes`` (read), or ``plots`` (rendered)
+        value: The number of tasks, bytes, or plots
+    """
+    if logs.queue() is not None:
+        logging.getLogger(LOGGER).info(name, extra={'progress': (name, value)})
+
+
+def add_tasks(count):
+    """ Add tasks to the total number of tasks to run """
+    event('total', count)
+
+
+def read_netcdf(path, nbytes=None):
+    """
+    Report that (some of) a NetCDF file was read.
+
+    Args:
+        path: The path to the NetCDF file
+        nbytes: The number of bytes read; if None, the whole file was read
+    """
+    if nbytes is None:
+        try:
+            nbytes = os.path.getsize(path)
+        except OSError:
+            return
+    profiling.add_bytes(nbytes)
+    event('netcdf_bytes', nbytes)
+
+
+def rendered_plot():
+    """ Report that a plot was rendered """
+    event('plots')
+
+
+def tracked(func, *args):
+    """ Call a function with some arguments as a tracked task """
+    event('start')
+    try:
+        result = func(*args)
+    except BaseException:
+        event('failed')
+        raise
+    event('done')
+    return result
+
+
+def is_progress(record):
+    """ Check if a log record is a progress event """
+    return getattr(record, 'progress', None) is not None
+
+
+class ProgressHandler(logging.Handler):
+    """
+    Count the progress events, and report the progress in progress.json and
+    (if it's a terminal) on a status line of the console.
+    """
+    def __init__(self, path, stream=None, interval=1.0):
+        """
+        Args:
+            path: The path to write the progress.json file to
+            stream: The console stream; the status line is only shown if
+                it's a terminal
+            interval: The minimum number of seconds between updates of the
+                progress.json file
+        """
+        super(ProgressHandler, self).__init__()
+        self.addFilter(is_progress)
+        self.path = path
+        self.stream = sys.stdout if stream is None else stream
+        self.interval = interval
+        self.counts = dict.fromkeys(['total', 'start', 'done', 'failed', 'netcdf_bytes', 'plots'], 0)
+        self.started = time.time()
+        self._written = 0
+        self._shown = False
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    def emit(self, record):
+        name, value = record.progress
+        self.counts[name] = self.counts.get(name, 0) + value
+        if time.time() - self._written >= self.interval:
+            self.write()
+        self.draw()
+
+    def summary(self, done=False):
+        """ The current progress """
+        elapsed = time.time() - self.started
+        finished = self.counts['done'] + self.counts['failed']
+        remaining = max(self.counts['total'] - finished, 0)
+        netcdf_mb = self.counts['netcdf_bytes'] / 2**20
+        return {'total': self.counts['total'],
+                'completed': self.counts['done'],
+                'failed': self.counts['failed'],
+                'running': self.counts['start'] - finished,
+                'elapsed': round(elapsed, 1),
+                'eta': round(elapsed / finished * remaining, 1) if finished and not done else None,
+                'netcdf_mb': round(netcdf_mb, 1),
+                'netcdf_mb_per_s': round(netcdf_mb / elapsed, 2) if elapsed else 0.0,
+                'plots': self.counts['plots'],
+                'plots_per_s': round(self.counts['plots'] / elapsed, 2) if elapsed else 0.0,
+                'done': done}
+
+    def write(self, done=False):
+        """ Write the progress.json file (atomically, as it may be read at any time) """
+        self._written = time.time()
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.summary(done), f)
+        os.replace(tmp, self.path)
+
+    def status(self):
+        """ The status line """
+        s = self.summary()
+        line = '{completed}/{total} tasks done ({failed} failed, {running} running), ' \
+               '{netcdf_mb_per_s} MB/s NetCDF, {plots_per_s} plots/s'.format(**s)
+        return line if s['eta'] is None else line + ', ETA {:.0f}s'.format(s['eta'])
+
+    def draw(self):
+        """ Draw the status line at the bottom of the terminal """
+        if self._tty:
+            self.stream.write('\r\x1b[K' + self.status())
+            self.stream.flush()
+            self._shown = True
+
+    def clear(self):
+        """ Clear the status line, so something else can be written to the terminal """
+        if self._shown:
+            self.stream.write('\r\x1b[K')
+            self._shown = False
+
+    def close(self):
+        self.write(done=True)
+        self.clear()
+        super(ProgressHandler, self).close()
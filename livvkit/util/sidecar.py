@@ -0,0 +1,196 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides a compact binary "sidecar" format for large numeric arrays in reports.
+
+Instead of expanding large numeric arrays into JSON text, each array is
+written to its own file of raw little-endian values and referenced from the
+JSON with a small pointer of the form::
+
+    {"sidecar": "data/<digest>.bin", "dtype": "float64", "length": 100000}
+
+where the path is relative to the page displaying it. The dtypes used are
+those which map directly onto a JavaScript TypedArray (e.g., ``float64`` to
+``Float64Array``), so the browser can fetch a sidecar as an ArrayBuffer and
+view it without any parsing.
+
+Large non-numeric arrays (e.g., a table's variable names) are instead split
+into chunks of rows which are written to JSON files, and referenced by::
+
+    {"chunks": "data/<digest>", "count": 4, "chunk_rows": 500, "length": 1800}
+
+where chunk ``k`` is in the file ``data/<digest>.<k>.json``, so the browser only
+needs to fetch the chunks of the rows being displayed.
+
+Sidecar files are named by their content, so identical arrays are only written
+once.
+"""
+
+import os
+import math
+import hashlib
+
+import numpy as np
+
+from livvkit.util import functions
+from livvkit.util import json_backend
+
+# NOTE: dtypes which have a JavaScript TypedArray equivalent
+TYPED_ARRAY_DTYPES = ('int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'float32', 'float64')
+
+
+def typed_array_dtype(array):
+    """
+    Determine the little-endian dtype an array will be stored as.
+
+    Args:
+        array: A numpy array
+
+    Returns:
+        The numpy dtype to store the array as, or None if the array isn't
+        numeric (e.g., strings, objects, or booleans) and shouldn't be stored
+        in a sidecar
+    """
+    kind = array.dtype.kind
+    if kind not in 'iuf':
+        return None
+
+    name = array.dtype.name
+    if name in TYPED_ARRAY_DTYPES:
+        return np.dtype(name).newbyteorder('<')
+    if kind in 'iu' and array.size and \
+            np.iinfo(np.int32).min <= array.min() and array.max() <= np.iinfo(np.int32).max:
+        return np.dtype('<i4')
+    return np.dtype('<f8')
+
+
+def is_pointer(value):
+    """ Determine if a value is a sidecar (or chunked sidecar) pointer """
+    return isinstance(value, dict) and ('sidecar' in value or 'chunks' in value)
+
+
+def _relative_path(path, sidecar_dir, relative_to):
+    if relative_to is None:
+        relative_to = os.path.dirname(os.path.normpath(sidecar_dir))
+    return os.path.relpath(path, relative_to).replace(os.path.sep, '/')
+
+
+def write_array(array, sidecar_dir, relative_to=None):
+    """
+    Write an array to a binary sidecar file.
+
+    Args:
+        array: The (1D) numeric array to write
+        sidecar_dir: The directory to write the sidecar file in. Note: this
+            should resolve to a path inside the report output directory
+        relative_to: The directory the pointer's path should be relative to;
+            this should be the directory of the page displaying the array. By
+            default, the sidecar directory is assumed to be a subdirectory of
+            the page's directory.
+
+    Returns:
+        The pointer to the sidecar, or None if the array isn't numeric
+    """
+    array = np.ravel(np.asarray(array))
+    dtype = typed_array_dtype(array)
+    if dtype is None:
+        return None
+
+    buffer = np.ascontiguousarray(array, dtype=dtype).tobytes()
+    digest = hashlib.sha1(dtype.str.encode() + buffer).hexdigest()
+
+    functions.mkdir_p(sidecar_dir)
+    sidecar_file = os.path.join(sidecar_dir, digest + '.bin')
+    if not os.path.exists(sidecar_file):
+        with open(sidecar_file, 'wb') as f:
+            f.write(buffer)
+
+    return {'sidecar': _relative_path(sidecar_file, sidecar_dir, relative_to),
+            'dtype': dtype.name,
+            'length': int(array.size)}
+
+
+def write_chunks(values, sidecar_dir, relative_to=None, chunk_rows=500):
+    """
+    Write a list of values to chunked JSON sidecar files.
+
+    Args:
+        values: The list of (JSON serializable) values to write. Non-finite
+            floats, which aren't valid JSON, are written as null.
+        sidecar_dir: The directory to write the sidecar files in. Note: this
+            should resolve to a path inside the report output directory
+        relative_to: The directory the pointer's path should be relative to;
+            see ``write_array``
+        chunk_rows: The number of values in each chunk
+
+    Returns:
+        The pointer to the chunked sidecar
+    """
+    values = [None if isinstance(v, float) and not math.isfinite(v) else v for v in values]
+    chunks = [values[start:start + chunk_rows] for start in range(0, len(values), chunk_rows)]
+    encoded = [json_backend.dumps(chunk, compact=True) for chunk in chunks]
+    digest = hashlib.sha1('\n'.join(encoded).encode('utf-8')).hexdigest()
+
+    functions.mkdir_p(sidecar_dir)
+    for k, chunk in enumerate(encoded):
+        chunk_file = os.path.join(sidecar_dir, '{}.{}.json'.format(digest, k))
+        if not os.path.exists(chunk_file):
+            with open(chunk_file, 'w', encoding='utf-8') as f:
+                f.write(chunk)
+
+    return {'chunks': _relative_path(os.path.join(sidecar_dir, digest), sidecar_dir, relative_to),
+            'count': len(chunks),
+            'chunk_rows': chunk_rows,
+            'length': len(values)}
+
+
+def read_array(pointer, relative_to):
+    """
+    Read an array from a (chunked) sidecar file.
+
+    Args:
+        pointer: The sidecar pointer returned by ``write_array`` or
+            ``write_chunks``
+        relative_to: The directory the pointer's path is relative to
+
+    Returns:
+        The numpy array, or list for a chunked sidecar
+    """
+    if 'chunks' in pointer:
+        values = []
+        for k in range(pointer['count']):
+            chunk_file = os.path.join(relative_to, '{}.{}.json'.format(pointer['chunks'], k))
+            with open(chunk_file, 'r', encoding='utf-8') as f:
+                values.extend(json_backend.load(f))
+        return values
+
+    return np.fromfile(os.path.join(relative_to, pointer['sidecar']),
+                       dtype=np.dtype(pointer['dtype']).newbyteorder('<'),
+                       count=pointer['length'])
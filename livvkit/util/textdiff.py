@@ -0,0 +1,274 @@
+# coding=utf-8
+# Copyright (c) 2015-2018, UT-BATTELLE, LLC
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+# list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors
+# may be used to endorse or promote products derived from this software without
+# specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Provides a scalable line-by-line diff of text files.
+
+Lines are compared by (integer) identifiers instead of as strings, and the
+shortest edit script between two sequences of lines is found with Myers'
+linear-space O(ND) algorithm (Myers, 1986) instead of ``difflib``'s, which is
+quadratic in the worst case. The output of ``unified_diff`` is formatted
+exactly like ``difflib.unified_diff``.
+
+Myers' algorithm takes O((N+M)D) time for D differences, so the search for
+the shortest edit script between two (regions of) files is abandoned once it
+exceeds ``MAX_COST`` edits, and the region is reported as replaced instead.
+
+Identical files can be identified by their digest without comparing (or
+holding) any of their lines; see ``digest_file``.
+"""
+
+import hashlib
+
+MAX_COST = 1000
+
+
+def digest_file(path, blocksize=2**20):
+    """
+    Compute the digest of a file, and count its lines, without reading the
+    whole file into memory.
+
+    Args:
+        path: The path to the file
+        blocksize: The number of bytes to read at a time
+
+    Returns:
+        A tuple of the file's SHA-256 hex digest and its number of lines
+    """
+    sha = hashlib.sha256()
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(blocksize), b''):
+            sha.update(block)
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return sha.hexdigest(), lines
+
+
+def _line_ids(a, b):
+    """ Map each distinct line of the two sequences to an integer """
+    ids = {}
+    return ([ids.setdefault(line, len(ids)) for line in a],
+            [ids.setdefault(line, len(ids)) for line in b])
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, max_cost):
+    """
+    Find the middle snake of the shortest edit script between a[alo:ahi] and
+    b[blo:bhi] by searching forward from the start and backward from the end
+    until the searches overlap.
+
+    Returns:
+        The (x0, y0, x1, y1) start and end of the snake, relative to (alo, blo),
+        or None if the edit script is longer than max_cost
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta % 2
+    offset = (n + m + 1) // 2 + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+    for d in range(min(offset, max_cost // 2 + 1)):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -d < delta - k < d and x + backward[offset + delta - k] >= n:
+                return x0, y0, x, y
+
+        # NOTE: the backward search is a forward search of the reversed sequences
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return n - x, m - y, n - x0, m - y0
+    return None
+
+
+def _matching_blocks(a, alo, ahi, b, blo, bhi, blocks, max_cost):
+    """ Append the (i, j, size) blocks where a[alo:ahi] and b[blo:bhi] match """
+    prefix = 0
+    while alo + prefix < ahi and blo + prefix < bhi and a[alo + prefix] == b[blo + prefix]:
+        prefix += 1
+    if prefix:
+        blocks.append((alo, blo, prefix))
+        alo += prefix
+        blo += prefix
+
+    suffix = 0
+    while alo < ahi - suffix and blo < bhi - suffix and a[ahi - 1 - suffix] == b[bhi - 1 - suffix]:
+        suffix += 1
+    ahi -= suffix
+    bhi -= suffix
+
+    # NOTE: once the common ends are removed, any edit script is either all
+    #       inserts, all deletes, or at least two edits long, so the middle snake
+    #       splits it into two strictly shorter edit scripts
+    snake = None
+    if alo < ahi and blo < bhi:
+        snake = _middle_snake(a, alo, ahi, b, blo, bhi, max_cost)
+    if snake is not None:
+        x0, y0, x1, y1 = snake
+        _matching_blocks(a, alo, alo + x0, b, blo, blo + y0, blocks, max_cost)
+        if x1 > x0:
+            blocks.append((alo + x0, blo + y0, x1 - x0))
+        _matching_blocks(a, alo + x1, ahi, b, blo + y1, bhi, blocks, max_cost)
+
+    if suffix:
+        blocks.append((ahi, bhi, suffix))
+
+
+def get_opcodes(a, b, max_cost=MAX_COST):
+    """
+    Find the shortest edit script which transforms the sequence of lines
+    ``a`` into ``b``.
+
+    Args:
+        a: A list of lines
+        b: A list of lines
+        max_cost: The maximum number of edits searched for between any two
+            matching lines; regions which differ by more are replaced
+
+    Returns:
+        A list of (tag, i1, i2, j1, j2) tuples, like those of
+        ``difflib.SequenceMatcher.get_opcodes``, describing how to transform
+        ``a`` into ``b``
+    """
+    a_ids, b_ids = _line_ids(a, b)
+    blocks = []
+    _matching_blocks(a_ids, 0, len(a_ids), b_ids, 0, len(b_ids), blocks, max_cost)
+    blocks.append((len(a), len(b), 0))
+
+    codes = []
+    i = j = 0
+    for ai, bj, size in blocks:
+        tag = ''
+        if i < ai and j < bj:
+            tag = 'replace'
+        elif i < ai:
+            tag = 'delete'
+        elif j < bj:
+            tag = 'insert'
+        if tag:
+            codes.append((tag, i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            if codes and codes[-1][0] == 'equal':
+                codes[-1] = ('equal', codes[-1][1], i, codes[-1][3], j)
+            else:
+                codes.append(('equal', ai, i, bj, j))
+    return codes
+
+
+def _grouped_opcodes(codes, n=3):
+    """ Group the opcodes into hunks with up to n lines of context """
+    if not codes:
+        return
+    codes = list(codes)
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def _format_range(start, stop):
+    """ Format a hunk's line range like ``difflib.unified_diff`` """
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return '{}'.format(beginning)
+    if not length:
+        beginning -= 1
+    return '{},{}'.format(beginning, length)
+
+
+def unified_diff(a, b, n=3, lineterm=''):
+    """
+    Compare two sequences of lines and generate the differences in the
+    unified diff format, like ``difflib.unified_diff`` (without file names).
+
+    Args:
+        a: A list of lines
+        b: A list of lines
+        n: The number of lines of context around each difference
+        lineterm: The line terminator of the control lines
+
+    Yields:
+        The lines of the unified diff
+    """
+    for ii, group in enumerate(_grouped_opcodes(get_opcodes(a, b), n)):
+        if not ii:
+            yield '--- ' + lineterm
+            yield '+++ ' + lineterm
+        first, last = group[0], group[-1]
+        yield '@@ -{} +{} @@{}'.format(_format_range(first[1], last[2]),
+                                        _format_range(first[3], last[4]), lineterm)
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
@@ -66,9 +66,9 @@ setup(
                    'License :: OSI Approved :: BSD License',
 
                    'Programming Language :: Python :: 3',
-                   'Programming Language :: Python :: 3.6',
-                   'Programming Language :: Python :: 3.7',
-                   'Programming Language :: Python :: 3.8',
+                   'Programming Language :: Python :: 3.9',
+                   'Programming Language :: Python :: 3.10',
+                   'Programming Language :: Python :: 3.11',
                    ],
 
       install_requires=['numpy',
@@ -80,16 +80,19 @@ setup(
                         'pybtex',
                         'pandas',
                         ],
-      extras_require={'develop': ['requests',
+      extras_require={'fast': ['orjson'],
+                      'develop': ['requests',
                                   'pytest',
                                   'pytest-cov',
+                                  'pytest-benchmark',
                                   'tox',
                                   'sphinx',
                                   'sphinx-js',
                                   'sphinx-py3doc-enhanced-theme',
-                                  ]},
+                                  ],
+                      },
 
-      python_requires='>=3.6',
+      python_requires='>=3.9',
 
       packages=['livvkit',
                 'livvkit.bundles',
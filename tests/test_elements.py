@@ -2,13 +2,16 @@
 
 """Test the LIVVkit elements"""
 
+import io
 import json
 from contextlib import ContextDecorator
 
+import numpy as np
 import pytest
 
 import livvkit
 from livvkit import elements
+from livvkit.util import sidecar
 
 
 class LIVVkitOutput(ContextDecorator):
@@ -179,6 +182,45 @@ def test_el_page_json():
     assert page._repr_json() == truth
 
 
+def test_el_page_to_dict():
+    class ThirdParty:
+        """An element implementing the interface, but not deriving from BaseElement"""
+        def _repr_json(self):
+            return json.dumps({'ThirdParty': {'title': 'external'}})
+
+        def _repr_html(self):
+            return '<p>external</p>'
+
+    page = elements.Page(
+        'A Page', 'A good description',
+        [elements.Tabs({'Tab': [elements.Section('A cool table', [
+            elements.Table('title', {'h1': ['v1', 'v2'], 'h2': ['v3', 'v4']}), ThirdParty()])]})],
+        references=None,
+    )
+
+    dct = page._to_dict()
+    section = dct['Page']['elements'][0]['Tabs']['elements_dict']['Tab'][0]['Section']
+    assert section['elements'][1] == {'ThirdParty': {'title': 'external'}}
+    assert json.loads(page._repr_json()) == json.loads(json.dumps(dct))
+
+
+def test_el_page_write_json():
+    page = elements.Page(
+        'A Page', 'A good description',
+        [elements.Section('A cool table', [elements.Table('title', {'h1': ['v1', 'v2'], 'h2': ['v3', 'v4']})])],
+        references=None,
+    )
+
+    indented = io.StringIO()
+    page._write_json(indented)
+    assert json.loads(indented.getvalue()) == json.loads(page._repr_json())
+
+    compact = io.StringIO()
+    page._write_json(compact, compact=True)
+    assert '\n' not in compact.getvalue().replace('\\n', '')
+    assert json.loads(compact.getvalue()) == json.loads(page._repr_json())
+
+
 def test_el_page_html():
     truth = '<div id="A Page">\n' \
             '    <h2>A Page</h2>\n' \
@@ -655,6 +697,43 @@ def test_el_table_w_index_transposed_latex():
     assert table._repr_latex() == truth
 
 
+def test_el_table_sidecar(tmpdir):
+    rows = elements.Table.sidecar_min_rows
+    data = {'Variable': ['v{}'.format(ii) for ii in range(rows)],
+            'Max Error': np.linspace(0.0, 1.0, rows)}
+    table = elements.Table('title', data, sidecar_dir=str(tmpdir.join('data')))
+
+    jsn = json.loads(table._repr_json())['Table']
+    assert jsn['data']['Variable']['count'] == rows // elements.Table.sidecar_chunk_rows
+    assert sidecar.read_array(jsn['data']['Variable'], str(tmpdir)) == data['Variable']
+    assert jsn['data']['Max Error'] == {'sidecar': jsn['data']['Max Error']['sidecar'],
+                                        'dtype': 'float64', 'length': rows}
+    assert '_columns' not in jsn
+    assert tmpdir.join(jsn['data']['Max Error']['sidecar']).size() == rows * 8
+
+    html = table._repr_html()
+    assert 'sidecar-table' in html
+    assert '<td>0.5</td>' not in html
+    assert table._repr_latex().count('\\\\') == rows + 1
+
+    small = elements.Table('title', {'Max Error': np.linspace(0.0, 1.0, 4)}, sidecar_dir=str(tmpdir))
+    assert small._html_template == 'table.html'
+
+
+def test_el_sidecar_tables(tmpdir):
+    data = {'Max Error': np.linspace(0.0, 1.0, elements.Table.sidecar_min_rows)}
+    with elements.sidecar_tables(str(tmpdir.join('data'))):
+        table = elements.Table('title', data)
+        explicit = elements.Table('title', data, sidecar_dir=str(tmpdir.join('other')))
+    outside = elements.Table('title', data)
+
+    assert table._html_template == 'table_sidecar.html'
+    assert table.data['Max Error']['sidecar'].startswith('data/')
+    assert explicit.data['Max Error']['sidecar'].startswith('other/')
+    assert outside._html_template == 'table.html'
+    assert elements.Table.default_sidecar_dir is None
+
+
 @LIVVkitOutput()
 def test_el_b4b_json():
     truth = '{\n' \
@@ -765,6 +844,7 @@ def test_el_b4b_html():
             '        <img class="thumbnail caption"\n' \
             '             data-caption=""\n' \
             '             alt=""\n' \
+            '             loading="lazy"\n' \
             '             src="../imgs/b4b.png"\n' \
             '             style="height: 50px; overflow: hidden; position: relative;"\n' \
             '        >\n' \
@@ -786,6 +866,7 @@ def test_el_b4b_html():
             '        <img class="thumbnail caption"\n' \
             '             data-caption=""\n' \
             '             alt=""\n' \
+            '             loading="lazy"\n' \
             '             src="../imgs/b4b.png"\n' \
             '             style="height: 50px; overflow: hidden; position: relative;"\n' \
             '        >\n' \
@@ -891,6 +972,7 @@ def test_el_gallery_html():
             '        <img class="thumbnail caption"\n' \
             '             data-caption="The Image"\n' \
             '             alt="The Image"\n' \
+            '             loading="lazy"\n' \
             '             src="imgs/image.png"\n' \
             '             style="height: 200px; overflow: hidden; position: relative;"\n' \
             '        >\n' \
@@ -951,6 +1033,7 @@ def test_el_image_html():
             '        <img class="thumbnail caption"\n' \
             '             data-caption="title"\n' \
             '             alt="title"\n' \
+            '             loading="lazy"\n' \
             '             src="imgs/name.png"\n' \
             '             style="height: 300px; overflow: hidden; position: relative;"\n' \
             '        >\n' \
@@ -974,6 +1057,31 @@ def test_el_image_latex():
     assert image._repr_latex() == truth
 
 
+@LIVVkitOutput()
+def test_el_image_memoized():
+    from livvkit.elements.elements import _render_memoized
+    _render_memoized.cache_clear()
+    imgs = [elements.B4BImage('', 'desc.', page_path='vv_test/verification') for _ in range(3)]
+    html = [img._repr_html() for img in imgs]
+
+    assert html[0] == html[1] == html[2]
+    assert _render_memoized.cache_info().hits == 2
+    assert elements.NAImage('', 'desc.', page_path='vv_test/verification')._repr_html() != html[0]
+
+
+@LIVVkitOutput()
+def test_el_placeholder_image_slots():
+    import pickle
+    b4b = elements.B4BImage('', 'desc.', page_path='vv_test/verification')
+
+    assert elements.B4BImage('', 'other.', page_path='vv_test/verification').desc == 'other.'
+    assert b4b.desc == 'desc.'
+    assert not hasattr(b4b, '__dict__')
+
+    clone = pickle.loads(pickle.dumps(b4b))
+    assert clone._repr_json() == b4b._repr_json()
+
+
 def test_el_file_diff_json(diff_data):
     from_file, to_file = diff_data
 
@@ -986,8 +1094,10 @@ def test_el_file_diff_json(diff_data):
 
     if diff_diff.diff_status is not True or diff_diff.diff == fromlines:
         errors.append('Error: there was no difference between the files.')
-    if diff_same.diff_status is True or diff_same.diff != fromlines:
+    if diff_same.diff_status is True or diff_same.diff:
         errors.append('Error: Self difference showed a difference.')
+    if diff_same.lines != len(fromlines) or diff_same.digest is None:
+        errors.append('Error: Self difference did not summarize the file.')
 
     try:
         _ = json.loads(diff_diff._repr_json())
@@ -1002,6 +1112,15 @@ def test_el_file_diff_json(diff_data):
     assert not errors, 'Errors occurred:\n{}'.format('\n'.join(errors))
 
 
+def test_el_file_diff_max_size(diff_data):
+    from_file, to_file = diff_data
+
+    diff = elements.FileDiff('Test max size', from_file=from_file, to_file=to_file, max_size=10)
+
+    assert diff.diff_status is True
+    assert diff.diff[0].startswith('Files differ, but are too large')
+
+
 def test_el_file_diff_html(diff_data):
     truth = '<h3>Test HTML</h3>\n' \
             '<div class="diff">\n' \
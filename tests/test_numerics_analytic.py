@@ -0,0 +1,53 @@
+# coding=utf-8
+"""
+Tests for the numerics tests against analytic solutions
+"""
+
+import os
+
+import numpy as np
+
+import livvkit
+from livvkit.components import numerics
+from livvkit.components.numerics_tests import analytic
+
+
+def _field(n, offset):
+    x = (np.arange(n) + 0.5) / n
+    return {'x': x, 'y': x, 'dx': 1.0 / n, 'dy': 1.0 / n, 'time': 0.0,
+            'thk': np.ones((n, n)) + offset / n**2}
+
+
+class _Bundle(object):
+    """ A bundle-like module whose data has one grid resolution per scale """
+    @staticmethod
+    def get_field_data(test_file, bench_file, setup, config):
+        return {'test': _field(8 * 2**int(test_file.split(os.path.sep)[-3][1:]), 1.0)}
+
+
+def test_analytic_errors_computed_once(tmpdir, monkeypatch):
+    calls = []
+
+    def compute_errors(config, analysis_data):
+        calls.append(config['name'])
+        return analytic.compute_errors(config, analysis_data)
+
+    monkeypatch.setattr(analytic, 'analyze', compute_errors)
+    monkeypatch.setitem(analytic.SOLUTIONS, 'plateau', lambda x, y, t: np.ones_like(x))
+    for scale in ['s0', 's1']:
+        tmpdir.join('model', 'plateau', 'plateau', scale, 'p1', 'plateau.out.nc').ensure()
+    monkeypatch.setattr(livvkit, 'model_dir', str(tmpdir.join('model')))
+    monkeypatch.setattr(livvkit, 'bench_dir', str(tmpdir.join('bench')))
+    monkeypatch.setattr(livvkit, 'output_dir', str(tmpdir.join('output')))
+    monkeypatch.setattr(livvkit, 'numerics_model_module', _Bundle)
+    monkeypatch.setattr(numerics.functions, 'write_page', lambda *args: None)
+    config = {'description': '', 'module': analytic.__name__, 'data_dir': 'plateau',
+              'output_ext': '.out.nc', 'variable': 'thk', 'solution': 'plateau'}
+
+    summary = numerics.run_suite('plateau', config)
+
+    assert calls == ['plateau']
+    assert summary['s1-p1']['Test L2 order'] == '2.00'
+    assert 'errors' not in config
+    # NOTE: the analytic module has no convergence hook for the numerics component
+    assert numerics._convergence(analytic, {}, config) is None
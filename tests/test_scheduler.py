@@ -0,0 +1,176 @@
+# coding=utf-8
+"""
+Tests for the scheduling of analyses in worker processes
+"""
+
+import os
+import time
+import multiprocessing as mp
+
+import pytest
+
+import livvkit
+from livvkit import scheduler
+from livvkit.components import numerics
+
+
+def _worker_globals(name):
+    return getattr(livvkit, name), os.environ.get('MPLBACKEND')
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn', 'forkserver'])
+def test_scheduler_pool_map_start_method(start_method):
+    if start_method not in mp.get_all_start_methods():
+        pytest.skip('{} is not available on this platform'.format(start_method))
+
+    livvkit.pool_size = 2
+    livvkit.start_method = start_method
+    livvkit.output_dir = 'vv_test'
+    try:
+        results = scheduler.pool_map(_worker_globals, [('output_dir',), ('start_method',)])
+    finally:
+        livvkit.pool_size = livvkit.start_method = livvkit.output_dir = None
+
+    assert results == [('vv_test', 'agg'), (start_method, 'agg')]
+
+
+def _leaf_interval():
+    start = time.time()
+    time.sleep(0.3)
+    return start, time.time()
+
+
+def _nested_intervals(count):
+    return scheduler.pool_map(_leaf_interval, [()] * count)
+
+
+def test_scheduler_pool_map_nested():
+    livvkit.pool_size = 2
+    try:
+        results = scheduler.pool_map(_nested_intervals, [(3,), (3,)])
+    finally:
+        livvkit.pool_size = None
+
+    # NOTE: the workers' own pools share the pool's process slots, so no more
+    #       than pool_size tasks are ever running at once
+    intervals = [interval for nested in results for interval in nested]
+    assert len(intervals) == 6
+    assert max(sum(start <= t < end for start, end in intervals) for t, _ in intervals) <= 2
+
+
+def _case_pid(subcase):
+    time.sleep(0.3)
+    return os.getpid()
+
+
+def test_scheduler_pool_worker(tmpdir, capsys):
+    summary = scheduler.pool_worker('numerics', print, 'case', 'config')
+
+    assert summary is None
+    assert capsys.readouterr().out == 'case config\n'
+
+
+def _large_table(case, config):
+    from livvkit import elements
+    return elements.Table(case, {'Row': list(range(config))}).data['Row']['sidecar']
+
+
+def test_scheduler_pool_worker_sidecars(tmpdir):
+    livvkit.output_dir = str(tmpdir)
+    try:
+        pointer = scheduler.pool_worker('validation', _large_table, 'case', 1000)
+    finally:
+        livvkit.output_dir = None
+
+    # NOTE: the sidecar is relative to the validation pages
+    assert tmpdir.join('validation', pointer).check(file=True)
+
+
+class _Suite(object):
+    """ A components-like module whose analyses fail, hang, or crash their worker """
+    @staticmethod
+    def run_suite(case, config):
+        if case == 'fails':
+            raise ValueError('bad data')
+        if case == 'hangs':
+            time.sleep(60)
+        if case.startswith('slow'):
+            time.sleep(1.5)
+        if case == 'crashes':
+            os._exit(1)
+        if case == 'reads':
+            # NOTE: like numerics.run_suite, read the data of each subcase
+            pids = scheduler.pool_map(numerics._read_case, [(_case_pid, str(ii), (str(ii),))
+                                                            for ii in range(4)])
+            return {'s0': {'Result': case, 'Pid': os.getpid(), 'Readers': pids}}
+        return {'s0': {'Result': case}}
+
+    @staticmethod
+    def populate_metadata(case, config):
+        return {'Title': 'Suite'}
+
+
+@pytest.mark.parametrize('pool_size', [0, 2])
+def test_scheduler_run_failures(pool_size, capsys):
+    config = {'works': {}, 'fails': {}}
+    livvkit.pool_size = pool_size
+    livvkit.task_retries = 1
+    try:
+        summary = scheduler.run_quiet('verification', _Suite, config)
+    finally:
+        livvkit.pool_size = None
+        livvkit.task_retries = 0
+
+    assert [type(el).__name__ for el in summary] == ['Table', 'Error']
+    assert list(summary[0].index) == ['works']
+    assert summary[1].title == 'Verification fails'
+    assert summary[1].message == 'ValueError: bad data'
+
+
+@pytest.mark.parametrize('case, reason', [('hangs', 'within 2 seconds'),
+                                          ('crashes', 'worker process died')])
+def test_scheduler_run_timeout_and_crash(case, reason):
+    config = {'works': {}, case: {}}
+    livvkit.pool_size = 2
+    livvkit.task_timeout = 2
+    livvkit.task_retries = 1
+    try:
+        start = time.monotonic()
+        summaries, failures = scheduler.launch_processes('verification', list(config), _Suite, config)
+    finally:
+        livvkit.pool_size = livvkit.task_timeout = None
+        livvkit.task_retries = 0
+
+    assert time.monotonic() - start < 30
+    assert summaries == {'works': {'s0': {'Result': 'works'}}}
+    assert reason in failures[case]
+
+
+def test_scheduler_run_timeout_queued():
+    # NOTE: the tasks queued behind the running task only start once it's done
+    config = {'slow1': {}, 'slow2': {}, 'slow3': {}}
+    livvkit.pool_size = 1
+    livvkit.task_timeout = 2
+    try:
+        summaries, failures = scheduler.launch_processes('verification', list(config), _Suite, config)
+    finally:
+        livvkit.pool_size = livvkit.task_timeout = None
+
+    assert failures == {}
+    assert sorted(summaries) == sorted(config)
+
+
+def test_scheduler_run_nested_pool():
+    # NOTE: the analysis borrows the process slots of the idle workers
+    config = {'reads': {}}
+    livvkit.pool_size = 3
+    try:
+        summaries, failures = scheduler.launch_processes('numerics', list(config), _Suite, config)
+    finally:
+        livvkit.pool_size = None
+
+    assert failures == {}
+    summary = summaries['reads']['s0']
+    assert len(summary['Readers']) == 4
+    assert len(set(summary['Readers'])) > 1
+    assert summary['Pid'] not in summary['Readers']
@@ -0,0 +1,44 @@
+# coding=utf-8
+"""
+Tests for the startup time of LIVVkit's command line interface
+"""
+
+import sys
+import subprocess
+
+import pytest
+
+# NOTE: modules which are slow to import, and aren't needed to show LIVVkit's
+#       version or serve a report
+HEAVY_MODULES = ['matplotlib', 'pandas', 'numpy', 'netCDF4', 'scipy', 'pybtex', 'jinja2']
+
+# The cumulative import time budget (in microseconds) of the command line interface
+BUDGET = 100000
+
+
+def _import_times(code):
+    """ The cumulative import times (microseconds) of each module imported by some code """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize('args', [['--version'], ['-s', '8000']])
+def test_startup_lazy_imports(args):
+    code = 'import sys\n' \
+           'import livvkit.__main__\n' \
+           'from livvkit.util import options\n' \
+           'try:\n' \
+           '    options.parse_args({})\n' \
+           'except SystemExit:\n' \
+           '    pass\n'.format(args)
+    times = _import_times(code)
+
+    assert not [mod for mod in times if mod.split('.')[0] in HEAVY_MODULES]
+    assert times['livvkit.__main__'] < BUDGET
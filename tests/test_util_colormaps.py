@@ -0,0 +1,26 @@
+# coding=utf-8
+"""
+Tests for the colormaps
+"""
+
+import numpy as np
+import matplotlib
+
+from livvkit.util import colormaps
+
+
+def test_colormaps_data():
+    for name in colormaps.__all__:
+        data = colormaps.colormap_data(name)
+
+        assert data.shape == (256, 3)
+        assert np.array_equal(data, getattr(colormaps, '_{}_data'.format(name)))
+
+
+def test_colormaps_fallback(monkeypatch):
+    monkeypatch.setattr(matplotlib, 'colormaps', {})
+    viridis = colormaps.get_colormap.__wrapped__('viridis')
+
+    assert viridis.name == 'viridis'
+    assert np.array_equal(np.asarray(viridis.colors), colormaps.colormap_data('viridis'))
+    assert np.allclose(viridis(0.5), colormaps.viridis(0.5))
@@ -0,0 +1,45 @@
+# coding=utf-8
+
+"""Test the LIVVkit convergence utilities"""
+
+import numpy as np
+import pytest
+
+from livvkit.util import convergence
+
+
+def test_conv_error_norms():
+    errors = [np.array([1.0, -2.0, 2.0]), np.array([[0.5, np.nan], [-0.5, 0.5]]), np.array([])]
+    weights = [2.0, np.array([1.0, 1.0, 1.0, 4.0]).reshape(2, 2), 1.0]
+
+    norms = convergence.error_norms(errors, weights)
+
+    assert norms['L1'][:2] == pytest.approx([10.0, 3.0])
+    assert norms['L2'][:2] == pytest.approx([np.sqrt(18.0), np.sqrt(1.5)])
+    assert norms['Linf'][:2] == pytest.approx([2.0, 0.5])
+    assert np.isnan([norms['L1'][2], norms['L2'][2], norms['Linf'][2]]).all()
+
+
+def test_conv_observed_order():
+    spacing = np.array([0.4, 0.2, 0.1, 0.05])
+    errors = np.column_stack([3.0 * spacing**2, 0.1 * spacing])
+
+    orders = convergence.observed_order(spacing, errors)
+
+    assert orders.shape == (3, 2)
+    assert orders[:, 0] == pytest.approx([2.0, 2.0, 2.0])
+    assert orders[:, 1] == pytest.approx([1.0, 1.0, 1.0])
+
+
+def test_conv_richardson_extrapolation():
+    # A second order solution, f(h) = f_exact + C h**2, on non-uniformly refined grids
+    spacing = np.array([0.3, 0.2, 0.1])
+    exact = np.array([1.0, 2.0, -3.0])
+    solutions = [exact + 0.5 * h**2 for h in spacing]
+
+    result = convergence.richardson_extrapolation(spacing, solutions)
+
+    assert result['order'] == pytest.approx([2.0, 2.0, 2.0], rel=1e-4)
+    assert result['extrapolated'] == pytest.approx(exact, rel=1e-4)
+    assert result['gci_fine'] == pytest.approx(1.25 * np.abs((solutions[1] - solutions[2])
+                                                              / solutions[2]) / 3.0, rel=1e-3)
@@ -131,3 +131,29 @@ def test_fn_setup_output(tmpdir):
     test = idir.join('data.txt').readlines()[0].strip()
 
     assert test == livvkit.timestamp
+
+
+@pytest.mark.parametrize('report_format, page_file, index_file', [
+    ('html', 'case.html', 'index.html'),
+    ('latex', 'case.tex', 'index.tex'),
+])
+def test_fn_write_static_report(tmpdir, report_format, page_file, index_file):
+    from livvkit import elements as el
+    out = tmpdir.mkdir(report_format)
+    livvkit.output_dir = livvkit.index_dir = str(out)
+    livvkit.report_format = report_format
+    try:
+        page = el.Page('Case', 'A static page', [el.Table('Results', {'x': [1, 2]})])
+        functions.write_page(page, 'verification', 'case')
+        summary = el.Page('Summary', '', [el.Table('Verification', {'x': [1]}, index=['case'])])
+        functions.write_index(summary)
+    finally:
+        livvkit.report_format = 'json'
+
+    assert out.join('verification', page_file).check(file=True) is True
+    assert out.join('index.json').check(file=True) is True
+    if report_format == 'html':
+        assert 'verification/case.html' in out.join('nav.html').read()
+        assert '<td>2</td>' in out.join('verification', page_file).read()
+    else:
+        assert '\\input{verification/case}' in out.join(index_file).read()
@@ -0,0 +1,39 @@
+# coding=utf-8
+"""
+Tests for the content-addressed image store
+"""
+
+import os
+import json
+
+import livvkit
+from livvkit.util import imagestore
+
+
+def test_imagestore_deduplicates(tmpdir):
+    img_dir = tmpdir.mkdir('imgs')
+    one = imagestore.store_bytes(b'image', str(img_dir.join('one.png')))
+    two = imagestore.store_bytes(b'image', str(img_dir.join('two.png')))
+    other = imagestore.store_bytes(b'other', str(img_dir.join('other.png')))
+
+    assert one == two != other
+    assert os.path.splitext(one)[1] == '.png'
+    assert sorted(f for f in os.listdir(str(img_dir)) if f.endswith('.png')) == \
+        sorted({os.path.basename(one), os.path.basename(other)})
+    with open(str(img_dir.join(imagestore.MANIFEST))) as f:
+        manifest = {record['name']: record['file'] for record in map(json.loads, f)}
+    assert manifest == {'one.png': os.path.basename(one),
+                        'two.png': os.path.basename(one),
+                        'other.png': os.path.basename(other)}
+
+
+def test_imagestore_links_previous_run(tmpdir):
+    previous = imagestore.store_bytes(b'image', str(tmpdir.join('previous', 'imgs', 'one.png')))
+    livvkit.output_dir = str(tmpdir.join('output'))
+    livvkit.previous_output_dir = str(tmpdir.join('previous'))
+    try:
+        stored = imagestore.store_bytes(b'image', str(tmpdir.join('output', 'imgs', 'one.png')))
+    finally:
+        livvkit.output_dir = livvkit.previous_output_dir = None
+
+    assert os.path.samefile(previous, stored)
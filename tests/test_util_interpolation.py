@@ -0,0 +1,44 @@
+# coding=utf-8
+
+"""Test the LIVVkit interpolation utilities"""
+
+import numpy as np
+import pytest
+from scipy import interpolate
+
+from livvkit.util import interpolation
+
+
+@pytest.fixture
+def grid():
+    rng = np.random.default_rng(42)
+    rows = np.sort(rng.random(15))
+    cols = np.sort(rng.random(20)) * 3
+    fields = {'a': rng.random((15, 20)), 'b': rng.random((15, 20))}
+    return rows, cols, fields
+
+
+def test_interp_matches_spline(grid):
+    rows, cols, fields = grid
+    # Include points outside the grid to check the edge behavior
+    row_points = np.linspace(-0.2, 1.2, 50)
+    col_points = np.linspace(-1.0, 4.0, 50)
+
+    operator = interpolation.bilinear_operator(rows, cols, row_points, col_points)
+    test = interpolation.interpolate_fields(operator, fields)
+
+    for name, field in fields.items():
+        truth = interpolate.RectBivariateSpline(rows, cols, field, kx=1, ky=1, s=0)(
+            row_points, col_points, grid=False)
+        assert test[name] == pytest.approx(truth)
+
+
+def test_interp_operator_cached(grid):
+    rows, cols, _ = grid
+    points = np.linspace(0.1, 0.9, 10)
+    interpolation.clear_cache()
+
+    operator = interpolation.bilinear_operator(rows, cols, points, points)
+
+    assert interpolation.bilinear_operator(rows.copy(), cols.copy(), points, points) is operator
+    assert interpolation.bilinear_operator(rows, cols, points, points * 2) is not operator
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""
+Tests for the run journal, and resuming interrupted runs
+"""
+
+import livvkit
+from livvkit import scheduler
+from livvkit.util import logs
+from livvkit.util import journal
+
+
+class _Suite(object):
+    """ A components-like module which counts the analyses it runs """
+    runs = []
+
+    @staticmethod
+    def run_suite(case, config):
+        _Suite.runs.append(case)
+        return {'s0': {'Result': config['x']}}
+
+    @staticmethod
+    def populate_metadata(case, config):
+        return {'Title': 'Suite'}
+
+
+def test_journal_resume(tmpdir):
+    path = str(tmpdir.join(journal.JOURNAL_FILE))
+    config = {'one': {'x': 1.5}, 'two': {'x': 2.5}, 'three': {'x': 3.5}}
+    livvkit.pool_size = 0
+    try:
+        logs.start(str(tmpdir), handlers=[journal.JournalHandler(path)])
+        try:
+            full = scheduler.run_quiet('verification', _Suite, config)[0]
+        finally:
+            logs.stop()
+
+        # NOTE: the run is killed while journaling the last analysis
+        lines = tmpdir.join(journal.JOURNAL_FILE).readlines()
+        assert len(lines) == 3
+        tmpdir.join(journal.JOURNAL_FILE).write(lines[0] + lines[2][:10])
+        assert journal.load(path) == 1
+        assert journal.completed('verification', 'one')
+        assert not journal.completed('validation', 'one')
+
+        _Suite.runs = []
+        logs.start(str(tmpdir), handlers=[journal.JournalHandler(path)])
+        try:
+            resumed = scheduler.run_quiet('verification', _Suite, config)[0]
+        finally:
+            logs.stop()
+    finally:
+        livvkit.pool_size = None
+        journal.load(str(tmpdir.join('missing')))
+
+    assert _Suite.runs == ['two', 'three']
+    assert resumed.data == full.data
+    assert journal.load(path) == 3
@@ -0,0 +1,69 @@
+# coding=utf-8
+
+"""Test the LIVVkit JSON backends"""
+
+import io
+import json
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from livvkit.util import json_backend
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+backends = [pytest.param('orjson', marks=pytest.mark.skipif(orjson is None, reason='orjson not installed')),
+            'json_tricks']
+
+
+@pytest.fixture(params=backends)
+def backend(request):
+    previous = json_backend.backend
+    yield json_backend.set_backend(request.param)
+    json_backend.set_backend(previous)
+
+
+def test_json_backend_dump(backend):
+    data = OrderedDict([('Table', OrderedDict([('title', 'Täble'),
+                                               ('data', {'Max Error': np.array([0.5, 1.0e-12]),
+                                                         'RMS Error': [np.float64(0.25), np.int64(2)]}),
+                                               ('index', (0, 1)),
+                                               ('elements', [{'Image': {'name': 'b4b.png'}}, {}, []]),
+                                               ])),
+                        ('rows', 2)])
+    truth = {'Table': {'title': 'Täble',
+                       'data': {'Max Error': [0.5, 1.0e-12], 'RMS Error': [0.25, 2]},
+                       'index': [0, 1],
+                       'elements': [{'Image': {'name': 'b4b.png'}}, {}, []]},
+             'rows': 2}
+
+    indented = io.StringIO()
+    json_backend.dump(data, indented)
+    assert json.loads(indented.getvalue()) == truth
+    assert indented.getvalue() == json_backend.dumps(data)
+    assert '\n    ' in indented.getvalue()
+
+    compact = json_backend.dumps(data, compact=True)
+    assert json.loads(compact) == truth
+    assert '\n' not in compact and ': ' not in compact
+
+    streamed = json_backend.StreamedDict(
+            [('Table', json_backend.StreamedDict(data['Table'])), ('rows', 2)])
+    streamed['Table']['elements'] = json_backend.StreamedList(data['Table']['elements'])
+    assert json_backend.dumps(streamed) == indented.getvalue()
+    assert json_backend.dumps(streamed, compact=True) == compact
+
+
+def test_json_backend_loads(backend):
+    assert json_backend.loads('{"a": [1, 2.5, "b"]}') == {'a': [1, 2.5, 'b']}
+    # NOTE: not strict JSON, so handled by json_tricks
+    assert json_backend.loads('{"a": 1  // a comment\n}') == {'a': 1}
+
+
+def test_json_backend_unknown():
+    with pytest.raises(ValueError):
+        json_backend.set_backend('pickle')
@@ -0,0 +1,67 @@
+# coding=utf-8
+"""
+Tests for the logging of analyses run in worker processes
+"""
+
+import json
+
+import livvkit
+from livvkit import scheduler
+from livvkit.util import logs
+
+
+def _print_subcase(case, config):
+    with logs.tagged(subcase='sub'):
+        print('Running {}'.format(case))
+    return config
+
+
+def test_logs_from_workers(tmpdir, capsys):
+    logs.start(str(tmpdir))
+    livvkit.pool_size = 2
+    try:
+        results = scheduler.pool_map(scheduler.pool_worker, [('numerics', _print_subcase, 'one', 1),
+                                                             ('numerics', _print_subcase, 'two', 2)])
+        logs.flush()
+    finally:
+        livvkit.pool_size = None
+        logs.stop()
+
+    records = [json.loads(line) for line in tmpdir.join(logs.LOG_FILE).readlines()]
+    out = capsys.readouterr().out
+
+    assert results == [1, 2]
+    assert sorted((r['component'], r['case'], r['subcase'], r['message']) for r in records) == \
+        [('numerics', 'one', 'sub', 'Running one'), ('numerics', 'two', 'sub', 'Running two')]
+    assert '[numerics/one/sub] Running one' in out
+
+
+def test_logs_stream_lines():
+    stream = logs.LogStream()
+    with logs.tagged(case='case'):
+        assert stream.write('partial') == 7
+        assert stream._buffer == 'partial'
+        stream.write(' line\nnext')
+    assert stream._buffer == 'next'
+
+
+def test_logs_verification_subcases(tmpdir, monkeypatch):
+    from livvkit.components import verification
+    for model in ['test', 'bench']:
+        for subcase in ['s0/p1', 's0/p4', 's1/p1']:
+            tmpdir.join(model, 'dome', 'dome', subcase).ensure(dir=True)
+    monkeypatch.setattr(verification, '_analyze_case', lambda mpath, bpath, config: print('Analyzed') or [])
+    monkeypatch.setattr(verification.functions, 'write_page', lambda *args: None)
+    monkeypatch.setattr(livvkit, 'model_dir', str(tmpdir.join('test')))
+    monkeypatch.setattr(livvkit, 'bench_dir', str(tmpdir.join('bench')))
+
+    logs.start(str(tmpdir))
+    try:
+        scheduler.pool_worker('verification', verification.run_suite, 'dome',
+                              {'data_dir': 'dome', 'description': ''})
+    finally:
+        logs.stop()
+
+    records = [json.loads(line) for line in tmpdir.join(logs.LOG_FILE).readlines()]
+    assert [(r['case'], r['subcase']) for r in records if r['message'] == 'Analyzed'] == \
+        [('dome', 's0-p1'), ('dome', 's0-p4'), ('dome', 's1-p1')]
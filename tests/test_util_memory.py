@@ -0,0 +1,84 @@
+# coding=utf-8
+"""
+Tests for the memory tracking and memory budgeted scheduling of analyses
+"""
+
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from netCDF4 import Dataset
+
+import livvkit
+from livvkit import scheduler
+from livvkit.util import logs
+from livvkit.util import memory
+
+
+def _allocate(case, config):
+    return np.ones(config, dtype=np.uint8).sum()
+
+
+def test_memory_tracked(tmpdir, capsys):
+    handler = memory.MemoryHandler(str(tmpdir))
+    logs.start(str(tmpdir), handlers=[handler])
+    livvkit.track_memory = True
+    try:
+        assert scheduler.pool_worker('verification', _allocate, 'dome', 2**24) == 2**24
+    finally:
+        livvkit.track_memory = False
+        logs.stop()
+
+    usage = json.loads(tmpdir.join(memory.MEMORY_FILE).read())['verification/dome']
+    assert usage['traced_peak'] >= 2**24
+    assert usage['peak_rss'] >= usage['rss_growth'] >= 0
+    assert 'verification/dome' in capsys.readouterr().out
+    assert tmpdir.join(logs.LOG_FILE).read() == ''
+
+
+def test_memory_estimate_footprint(tmpdir):
+    livvkit.model_dir = str(tmpdir.join('test'))
+    livvkit.bench_dir = str(tmpdir.join('bench'))
+    run_dir = tmpdir.join('test', 'dome', 'dome', 's0', 'p1').ensure(dir=True)
+    with Dataset(str(run_dir.join('dome.out.nc')), 'w') as data:
+        data.createDimension('y', 100)
+        data.createDimension('x', 200)
+        data.createVariable('thk', 'f8', ('y', 'x'))
+        data.createVariable('topg', 'f4', ('y', 'x'))
+    try:
+        config = {'data_dir': 'dome', 'output_ext': '.out.nc'}
+        assert memory.estimate_footprint('dome', config) == \
+            memory.BASE_FOOTPRINT + memory.VARIABLE_COPIES * 100 * 200 * 8
+        assert memory.estimate_footprint('dome', {}) == memory.BASE_FOOTPRINT
+    finally:
+        livvkit.model_dir = None
+        livvkit.bench_dir = None
+
+
+def test_scheduler_run_tasks_budgeted():
+    lock = threading.Lock()
+    state = {'used': 0, 'peak': 0}
+
+    def task(footprint):
+        with lock:
+            state['used'] += footprint
+            state['peak'] = max(state['peak'], state['used'])
+        time.sleep(0.01)
+        with lock:
+            state['used'] -= footprint
+        return footprint
+
+    footprints = [5, 1, 1, 3, 12, 2, 1]
+    with ThreadPoolExecutor(4) as executor:
+        outcomes = scheduler.run_tasks(executor, [(task, f) for f in footprints], footprints, 6)
+    assert outcomes == [(scheduler.DONE, f) for f in footprints]
+    # NOTE: the task larger than the budget is run alone
+    assert state['peak'] == 12
+
+    small = [f for f in footprints if f <= 6]
+    state['peak'] = 0
+    with ThreadPoolExecutor(4) as executor:
+        scheduler.run_tasks(executor, [(task, f) for f in small], small, 6)
+    assert state['peak'] <= 6
@@ -0,0 +1,39 @@
+# coding=utf-8
+"""
+Tests for the parsing of LIVVkit's command line options
+"""
+
+import os
+import argparse
+
+import pytest
+import matplotlib
+
+from livvkit.util import options
+
+
+def test_options_positive_int():
+    assert options.positive_int('0') == 0
+    assert options.positive_int('3') == 3
+    with pytest.raises(argparse.ArgumentTypeError):
+        options.positive_int('-1')
+
+
+def test_options_retries_rejects_negative(capsys):
+    with pytest.raises(SystemExit):
+        options.parse_args(['--retries', '-1'])
+
+    assert 'Must be zero or a positive integer' in capsys.readouterr().err
+
+
+def test_options_plot_backend(monkeypatch):
+    backend = matplotlib.get_backend()
+    monkeypatch.delenv('MPLBACKEND', raising=False)
+    matplotlib.use('svg')
+    try:
+        options._plot_to_files()
+        assert matplotlib.get_backend() == 'agg'
+    finally:
+        matplotlib.use(backend)
+
+    assert os.environ['MPLBACKEND'] == 'agg'
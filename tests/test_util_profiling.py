@@ -0,0 +1,60 @@
+# coding=utf-8
+"""
+Tests for LIVVkit's profiler
+"""
+
+import json
+
+import livvkit
+from livvkit import scheduler
+from livvkit.util import logs
+from livvkit.util import profiling
+
+
+@profiling.timed
+def _read(nbytes):
+    profiling.add_bytes(nbytes)
+    return nbytes
+
+
+@profiling.timed
+def _read_twice(nbytes):
+    return _read(nbytes) + _read(nbytes)
+
+
+def test_profiling_disabled():
+    assert not livvkit.profile
+    assert _read_twice(1) == 2
+    assert not getattr(profiling._local, 'spans', [])
+
+
+def test_profiling_from_workers(tmpdir, capsys):
+    handler = profiling.ProfileHandler(str(tmpdir))
+    logs.start(str(tmpdir), handlers=[handler])
+    livvkit.profile = True
+    livvkit.pool_size = 2
+    try:
+        assert scheduler.pool_map(_read_twice, [(2**20,), (2**21,)]) == [2**21, 2**22]
+    finally:
+        livvkit.pool_size = None
+        livvkit.profile = False
+        logs.stop()
+
+    trace = json.loads(tmpdir.join(profiling.TRACE_FILE).read())['traceEvents']
+    assert sorted((e['name'].split('.')[-1], e['args']['bytes']) for e in trace) == \
+        [('_read', 2**20), ('_read', 2**20), ('_read', 2**21), ('_read', 2**21),
+         ('_read_twice', 0), ('_read_twice', 0)]
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in trace)
+
+    summary = tmpdir.join(profiling.SUMMARY_FILE).read()
+    assert 'test_util_profiling._read_twice' in summary
+    assert summary in capsys.readouterr().out
+    assert tmpdir.join(logs.LOG_FILE).read() == ''
+
+
+def test_profiling_summary():
+    spans = [{'name': 'outer', 'dur': 3e6, 'children': 2e6, 'bytes': 0},
+             {'name': 'inner', 'dur': 1e6, 'children': 0.0, 'bytes': 2**20},
+             {'name': 'inner', 'dur': 1e6, 'children': 0.0, 'bytes': 2**20}]
+    assert profiling.summarize(spans) == [('outer', 1, 3.0, 1.0, 3000.0, 0.0),
+                                          ('inner', 2, 2.0, 2.0, 1000.0, 2.0)]
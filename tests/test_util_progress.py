@@ -0,0 +1,72 @@
+# coding=utf-8
+"""
+Tests for the live progress reporting
+"""
+
+import io
+import json
+
+import pytest
+
+import livvkit
+from livvkit import scheduler
+from livvkit.util import logs
+from livvkit.util import progress
+
+
+def _plot_case(case, config):
+    progress.rendered_plot()
+    if config is None:
+        raise ValueError(case)
+    return config
+
+
+def test_progress_from_workers(tmpdir, capsys):
+    status = progress.ProgressHandler(str(tmpdir.join(progress.PROGRESS_FILE)))
+    logs.start(str(tmpdir), status=status)
+    livvkit.pool_size = 2
+    try:
+        progress.add_tasks(3)
+        results = scheduler.pool_map(scheduler.pool_worker, [('numerics', _plot_case, 'one', 1),
+                                                             ('numerics', _plot_case, 'two', 2)])
+        with pytest.raises(ValueError):
+            scheduler.pool_worker('numerics', _plot_case, 'three', None)
+        logs.flush()
+        partial = json.loads(tmpdir.join(progress.PROGRESS_FILE).read())
+    finally:
+        livvkit.pool_size = None
+        logs.stop()
+
+    final = json.loads(tmpdir.join(progress.PROGRESS_FILE).read())
+
+    assert results == [1, 2]
+    assert not partial['done']
+    assert final['done'] and final['eta'] is None
+    assert (final['total'], final['completed'], final['failed'], final['running'], final['plots']) == \
+        (3, 2, 1, 0, 3)
+    # NOTE: progress events aren't messages, so only the failure is logged
+    records = [json.loads(line) for line in tmpdir.join(logs.LOG_FILE).readlines()]
+    assert [(r['level'], r['case']) for r in records] == [('ERROR', 'three')]
+    assert capsys.readouterr().out.startswith('[numerics/three] three failed\nTraceback')
+
+
+def test_progress_status_line():
+    stream = io.StringIO()
+    stream.isatty = lambda: True
+    status = progress.ProgressHandler('unused.json', stream, interval=float('inf'))
+    status.counts.update({'total': 4, 'start': 3, 'done': 2, 'netcdf_bytes': 2**20})
+
+    summary = status.summary()
+    assert (summary['completed'], summary['running'], summary['netcdf_mb']) == (2, 1, 1.0)
+    assert summary['eta'] is not None
+
+    status.draw()
+    status.clear()
+    drawn = stream.getvalue()
+    assert drawn.startswith('\r\x1b[K2/4 tasks done (0 failed, 1 running), ')
+    assert drawn.endswith('\r\x1b[K') and ', ETA ' in drawn
+
+
+def test_progress_ignored_without_logging():
+    assert logs.queue() is None
+    assert progress.tracked(_plot_case, 'one', 1) == 1
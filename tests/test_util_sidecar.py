@@ -0,0 +1,33 @@
+# coding=utf-8
+
+"""Test the LIVVkit binary sidecar utilities"""
+
+import os
+
+import numpy as np
+
+from livvkit.util import sidecar
+
+
+def test_sidecar_write_read(tmpdir):
+    page_dir = str(tmpdir)
+    sidecar_dir = os.path.join(page_dir, 'data')
+
+    for values, dtype in [(np.linspace(0, 1, 5), 'float64'),
+                          (np.arange(5, dtype='>i8'), 'int32'),
+                          (np.array([0, 2**40]), 'float64'),
+                          (np.arange(5, dtype=np.uint8), 'uint8')]:
+        pointer = sidecar.write_array(values, sidecar_dir)
+        assert sidecar.is_pointer(pointer)
+        assert pointer['dtype'] == dtype
+        assert pointer['length'] == len(values)
+        assert pointer['sidecar'].startswith('data/')
+        np.testing.assert_array_equal(sidecar.read_array(pointer, page_dir), values)
+
+    # identical arrays are only stored once
+    assert sidecar.write_array([0.0, 0.25, 0.5, 0.75, 1.0], sidecar_dir) == \
+        sidecar.write_array(np.linspace(0, 1, 5), sidecar_dir)
+    assert len(os.listdir(sidecar_dir)) == 4
+
+    assert sidecar.write_array(['a', 'b'], sidecar_dir) is None
+    assert sidecar.write_array([True, False], sidecar_dir) is None
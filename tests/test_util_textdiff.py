@@ -0,0 +1,66 @@
+# coding=utf-8
+"""
+Tests for the line-by-line text diff
+"""
+
+import random
+import difflib
+
+from livvkit.util import textdiff
+
+
+def _apply(a, b, codes):
+    out = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+        out.extend(b[j1:j2])
+    return out
+
+
+def _cost(codes):
+    return sum(i2 - i1 + j2 - j1 for tag, i1, i2, j1, j2 in codes if tag != 'equal')
+
+
+def test_textdiff_shortest_edit_script():
+    rng = random.Random(42)
+    for _ in range(200):
+        a = [rng.choice('abc') for _ in range(rng.randint(0, 12))]
+        b = [rng.choice('abc') for _ in range(rng.randint(0, 12))]
+        codes = textdiff.get_opcodes(a, b)
+        lcs = sum(i2 - i1 for tag, i1, i2, _, _ in codes if tag == 'equal')
+        truth = difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+
+        assert _apply(a, b, codes) == b
+        assert _cost(codes) == len(a) + len(b) - 2 * lcs
+        assert _cost(codes) <= _cost(truth)
+
+
+def test_textdiff_max_cost():
+    rng = random.Random(42)
+    a = [str(rng.randint(0, 9)) for _ in range(200)]
+    b = [str(rng.randint(0, 9)) for _ in range(200)]
+
+    assert _apply(a, b, textdiff.get_opcodes(a, b, max_cost=4)) == b
+
+
+def test_textdiff_unified_diff():
+    a = ['line {}'.format(ii) for ii in range(50)]
+    b = list(a)
+    b[10] = 'changed'
+    del b[30]
+    b.insert(45, 'added')
+
+    assert list(textdiff.unified_diff(a, b)) == list(difflib.unified_diff(a, b, lineterm=''))
+    assert list(textdiff.unified_diff(a, a)) == []
+
+
+def test_textdiff_digest_file(tmpdir):
+    one = tmpdir.join('one.txt')
+    one.write('a\nb\nc')
+    two = tmpdir.join('two.txt')
+    two.write('a\nb\nc\n')
+
+    assert textdiff.digest_file(str(one))[1] == 3
+    assert textdiff.digest_file(str(two))[1] == 3
+    assert textdiff.digest_file(str(one))[0] != textdiff.digest_file(str(two))[0]